@@ -1,37 +1,138 @@
 """
 Feature 2: Supply Chain RAG
 Retrieves EVM inventory and production data.
+Documents (BEL/ECIL reports, ECI manuals, committee reports) live in the shared
+document store for ranked, filterable retrieval, and numeric facts such as
+capacity, stock, failure rates and lead times are extracted once at load time.
 """
-from typing import List, Dict
+from dataclasses import dataclass
+from typing import List, Dict, Optional
+from pathlib import Path
+import re
+
+from retrieval.document_store import Collection, Filters, document_store
+
+# Documents without a "provenance" entry; "illustrative" marks demo paraphrases
+# whose figures are not quoted from the named source
+UNSPECIFIED_PROVENANCE = {"status": "unspecified", "note": "The document does not state where its text comes from."}
+
+# Scenario defaults used only when no document states the fact
+DEFAULT_FACTS = {
+    "current_stock": 1200000,
+    "production_capacity": 500000,
+    "required_units": 2500000
+}
+
+MULTIPLIERS = {"lakh": 1e5, "lakhs": 1e5, "million": 1e6, "crore": 1e7, "cr": 1e7}
+QTY = r"(?P<num>\d+(?:\.\d+)?)\s*(?P<mult>lakhs?|million|crore|cr)?"
+
+# (metric, pattern, unit); the "num"/"mult" groups give the value
+FACT_PATTERNS = [
+    ("production_capacity", re.compile(rf"capacity (?:is|of) {QTY} units (?:per|a|each) (?:annum|year)", re.I), "units/year"),
+    ("current_stock", re.compile(rf"{QTY} units (?:in stock|in inventory|available)", re.I), "units"),
+    ("required_units", re.compile(rf"(?:requires?|needs?|needed) {QTY} units", re.I), "units"),
+    ("expansion_cost", re.compile(rf"₹\s?{QTY}", re.I), "INR"),
+    ("lead_time", re.compile(r"lead time[a-z ]*?(?P<num>\d+(?:\.\d+)?) months", re.I), "months"),
+    ("buffer_stock", re.compile(r"(?P<num>\d+(?:\.\d+)?)% buffer", re.I), "percent"),
+]
+# "VVPAT machines have a higher failure rate (2%) compared to Control Units (0.5%)"
+FAILURE_RATE_RE = re.compile(r"(?P<component>VVPAT|Control Unit|Ballot Unit)s?\b[^()]*?\((?P<num>\d+(?:\.\d+)?)%\)", re.I)
+
+def parse_quantity(match: re.Match) -> float:
+    value = float(match.group("num"))
+    mult = match.groupdict().get("mult")
+    return value * MULTIPLIERS.get(mult.lower(), 1) if mult else value
+
+def extract_facts(document: Dict) -> List[Dict]:
+    """Numeric facts stated in a document, tagged with its source, year and provenance status"""
+    facts = []
+    content = document["content"]
+    for metric, pattern, unit in FACT_PATTERNS:
+        for match in pattern.finditer(content):
+            facts.append({"metric": metric, "value": parse_quantity(match), "unit": unit})
+    for sentence in re.split(r"(?<=\.)\s+", content):
+        if "failure rate" in sentence.lower():
+            for match in FAILURE_RATE_RE.finditer(sentence):
+                facts.append({
+                    "metric": "failure_rate",
+                    "component": match.group("component").lower().replace(" ", "_"),
+                    "value": float(match.group("num")) / 100,
+                    "unit": "fraction"
+                })
+    provenance = (document.get("provenance") or UNSPECIFIED_PROVENANCE)["status"]
+    for fact in facts:
+        fact["source"] = document["source"]
+        fact["year"] = document.get("year")
+        fact["provenance"] = provenance
+    return facts
+
+@dataclass(frozen=True)
+class SupplyChainCorpus:
+    """Store collection plus the facts extracted from it, swapped as one reference on reload"""
+    collection: Collection
+    # metric -> facts, most recent first
+    facts: Dict[str, List[Dict]]
 
 class SupplyChainRAG:
     def __init__(self):
-        # Mock database of retrieved documents
-        self.documents = [
-            {
-                "source": "BEL Annual Report 2024",
-                "content": "Current EVM production capacity is 5 lakh units per annum. Expansion requires ₹500Cr investment.",
-                "year": 2024
-            },
-            {
-                "source": "ECI Logistics Manual",
-                "content": "VVPAT machines have a higher failure rate (2%) compared to Control Units (0.5%), requiring 125% buffer stock.",
-                "year": 2023
-            },
-             {
-                "source": "Parliamentary Committee Report",
-                "content": "Semiconductor shortage affects production timelines for VVPATs. Lead time increased to 18 months.",
-                "year": 2025
-            }
-        ]
-
-    def query_supply_chain(self, query: str = "EVM capacity") -> List[Dict]:
+        self.corpus: Optional[SupplyChainCorpus] = None
+        self.load_documents()
+    
+    @property
+    def documents(self) -> List[Dict]:
+        return self.corpus.collection.raw.get("documents", [])
+    
+    @property
+    def facts(self) -> Dict[str, List[Dict]]:
+        return self.corpus.facts
+
+    def load_documents(self):
+        """Load the supply-chain corpus (shared with the document store) and extract facts"""
+        self.corpus = self.build_corpus(document_store.collection("supply_chain"))
+
+    def watched_files(self) -> List[Path]:
+        return [document_store.path("supply_chain")]
+
+    def reload(self):
+        """Re-read the corpus and swap it in; raises (keeping current data) if unreadable"""
+        self.corpus = self.build_corpus(document_store.reload("supply_chain"))
+
+    def build_corpus(self, collection: Collection) -> SupplyChainCorpus:
+        facts: Dict[str, List[Dict]] = {}
+        for document in collection.documents:
+            for fact in extract_facts(document.fields):
+                facts.setdefault(fact["metric"], []).append(fact)
+        # Latest report first, so lookups take the most recent figure
+        for metric_facts in facts.values():
+            metric_facts.sort(key=lambda fact: fact["year"] or 0, reverse=True)
+        return SupplyChainCorpus(collection=collection, facts=facts)
+
+    def query_supply_chain(self, query: str = "EVM capacity", k: int = 5, year_from: int = None,
+                           year_to: int = None, source: str = None, doc_type: str = None) -> List[Dict]:
         """
-        Simulate RAG retrieval for supply chain queries.
+        Ranked top-k documents for a keyword query, optionally restricted to a
+        year range, a source (substring match) or a document type
         """
-        # In a real system, this would use vector search.
-        # Here we return all relevant docs for the demo.
-        return self.documents
+        filters = Filters(year_from=year_from, year_to=year_to, tag=doc_type, source=source)
+        hits = document_store.search("supply_chain", query, k, filters)
+        if not hits:
+            return []
+        top_score = hits[0].score or 1.0
+        return [{**hit.document.fields, "relevance_score": round(hit.score / top_score, 3)} for hit in hits]
+
+    def get_fact(self, metric: str, component: str = None) -> Optional[Dict]:
+        """Most recent extracted fact for a metric (and component, for failure rates)"""
+        for fact in self.corpus.facts.get(metric, []):
+            if component is None or fact.get("component") == component:
+                return fact
+        return None
+
+    def _fact_value(self, metric: str, used: List[Dict]) -> float:
+        fact = self.get_fact(metric)
+        if fact is None:
+            return DEFAULT_FACTS[metric]
+        used.append(fact)
+        return fact["value"]
 
     def get_risk_assessment(self, inputs: Dict = None) -> Dict:
         """
@@ -41,31 +142,33 @@ class SupplyChainRAG:
         evm_supply_percent = 100.0
         target_year = 2029
         current_year = 2026
-        
+
         if inputs:
             evm_supply_percent = float(inputs.get("evm_supply", 100.0))
             target_year = int(inputs.get("target_year", 2029))
-            
+
+        facts_used: List[Dict] = []
+
         # 1. Calculate Current Stock
-        # Base stock is 1.2M, scaled by supply % input (representing current readiness)
-        base_stock = 1200000
+        # Base stock (1.2M in the illustrative ECI inventory statement), scaled by supply % input (representing current readiness)
+        base_stock = int(self._fact_value("current_stock", facts_used))
         current_stock = int(base_stock * (evm_supply_percent / 100.0))
-        
+
         # 2. Calculate Projected Production
-        # Approx 5 lakh units/year capacity
-        base_annual_capacity = 500000 
+        # Manufacturer capacity (approx 5 lakh units/year)
+        base_annual_capacity = int(self._fact_value("production_capacity", facts_used))
         years_remaining = max(0, target_year - current_year)
-        
+
         # Production is also affected by supply chain health (evm_supply_percent)
         # If supply chain is 50%, production runs at 50% capacity
         annual_production_rate = int(base_annual_capacity * (evm_supply_percent / 100.0))
         projected_production = annual_production_rate * years_remaining
-        
+
         # 3. Total Availability vs Requirement
         total_available = current_stock + projected_production
-        required_stock = 2500000 # 2.5 million units needed total
+        required_stock = int(self._fact_value("required_units", facts_used)) # 2.5 million units needed total
         deficit = required_stock - total_available
-        
+
         # 4. Risk Calculation
         # Risk is proportional to the deficit percentage
         if total_available >= required_stock:
@@ -74,15 +177,21 @@ class SupplyChainRAG:
         else:
             deficit_percent = (deficit / required_stock) * 100
             risk_score = 20.0 + (deficit_percent * 0.8) # Base 20 + penalty
-            
+
         risk_score = min(95.0, risk_score)
-             
+
         status = "CRITICAL" if risk_score > 60 else ("HIGH" if risk_score > 40 else "MODERATE")
-        
+
         return {
             "risk_score": round(risk_score, 1),
             "status": status,
-            "evidence_count": len(self.documents),
+            "evidence_count": len({fact["source"] for fact in facts_used}),
+            "evidence": [
+                {key: fact[key] for key in ("metric", "value", "unit", "source", "year", "provenance")}
+                for fact in facts_used
+            ],
+            # Sources of figures above that are demo paraphrases, not quotations
+            "illustrative_sources": sorted({fact["source"] for fact in facts_used if fact["provenance"] == "illustrative"}),
             "key_finding": f"Projected EVM deficit of {deficit:,} units by {target_year}.",
             "evm_inventory": {
                 "current_stock": current_stock,
@@ -7,10 +7,13 @@ import os
 from dotenv import load_dotenv, find_dotenv
 from langchain_huggingface import HuggingFaceEndpoint
 from langchain_core.prompts import ChatPromptTemplate
+from llm_usage import usage_tracker
 
 # Load environment variables
 load_dotenv(find_dotenv())
 
+BOTTLENECK_MODEL = "mistralai/Mistral-7B-Instruct-v0.2"
+
 class BottleneckExplorer:
     def __init__(self):
         self.llm = self._init_llm()
@@ -25,7 +28,7 @@ class BottleneckExplorer:
         
         try:
             llm = HuggingFaceEndpoint(
-                repo_id="mistralai/Mistral-7B-Instruct-v0.2",
+                repo_id=BOTTLENECK_MODEL,
                 huggingfacehub_api_token=api_key,
                 temperature=0.7,
                 max_new_tokens=800,
@@ -53,19 +56,28 @@ class BottleneckExplorer:
         Returns:
             Dictionary with bottlenecks list and metadata
         """
+        call = usage_tracker.start("bottleneck", BOTTLENECK_MODEL)
+        
         # Try LLM analysis first
         if self.llm:
             try:
-                bottlenecks = self._llm_analyze(context)
+                bottlenecks = self._llm_analyze(context, callbacks=[call.handler])
                 if bottlenecks:
+                    usage_tracker.finish(call)
                     return {
                         "bottlenecks": bottlenecks,
                         "analysis_mode": "LLM",
                         "risk_contribution": self._calculate_overall_risk(bottlenecks),
                         "status": self._determine_status(bottlenecks)
                     }
+                call.mark_fallback("unparseable_response")
             except Exception as e:
                 print(f"LLM analysis failed: {e}")
+                call.mark_fallback("llm_error")
+        else:
+            call.mark_fallback("llm_unavailable")
+        
+        usage_tracker.finish(call)
         
         # Fallback to rule-based analysis
         bottlenecks = self._fallback_analyze(context)
@@ -76,7 +88,7 @@ class BottleneckExplorer:
             "status": self._determine_status(bottlenecks)
         }
     
-    def _llm_analyze(self, context: Dict) -> List[Dict]:
+    def _llm_analyze(self, context: Dict, callbacks: List = None) -> List[Dict]:
         """Use LLM to intelligently identify bottlenecks"""
         prompt = ChatPromptTemplate.from_template("""
 You are an expert election logistics analyst for India's One Nation One Election (ONOE) implementation.
@@ -116,7 +128,7 @@ Provide 5-7 bottlenecks, most critical first.
             "timeline_status": context.get('timeline_status', 'Unknown'),
             "months_remaining": context.get('months_remaining', 0),
             "months_needed": context.get('months_needed', 0)
-        })
+        }, config={"callbacks": callbacks or []})
         
         # Parse LLM response
         return self._parse_llm_response(response)
@@ -4,6 +4,9 @@ Aggregates risk from all 8 administrative features.
 """
 from pydantic import BaseModel
 from typing import Dict, List, Any
+from collections import OrderedDict
+import os
+import threading
 
 # Import features
 from admin_features.f1_resource_debate import resource_debate
@@ -29,6 +32,12 @@ class AdminDashboardData(BaseModel):
     overall_status: str
 
 class AdminRiskEngine:
+    def __init__(self):
+        # Bottleneck analysis (LLM) results keyed by the administrative context, least recently used first
+        self._bottleneck_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._bottleneck_cache_size = int(os.getenv("BOTTLENECK_CACHE_SIZE", "256"))
+        self._bottleneck_lock = threading.Lock()
+    
     def get_dashboard_data(self, inputs: Dict[str, Any] = None) -> AdminDashboardData:
         """
         Aggregate data for the Administrative Dashboard with dynamic inputs.
@@ -134,8 +143,21 @@ class AdminRiskEngine:
             "months_needed": f7_data["months_needed"]
         }
         
+        cache_key = tuple(sorted(context.items()))
+        with self._bottleneck_lock:
+            if cache_key in self._bottleneck_cache:
+                self._bottleneck_cache.move_to_end(cache_key)
+                return self._bottleneck_cache[cache_key]
+        
         # Use bottleneck explorer to analyze
         result = bottleneck_explorer.analyze_bottlenecks(context)
+        
+        # Rule-based fallbacks are cheap and should be retried with the LLM next time
+        if result.get("analysis_mode") == "LLM":
+            with self._bottleneck_lock:
+                self._bottleneck_cache[cache_key] = result
+                while len(self._bottleneck_cache) > self._bottleneck_cache_size:
+                    self._bottleneck_cache.popitem(last=False)
         return result
 
 admin_risk_engine = AdminRiskEngine()
@@ -0,0 +1,79 @@
+"""
+Dense Retrieval Latency Benchmark
+Times DenseIndex top-k over synthetic memory-mapped float32 embedding matrices
+at several corpus sizes and query batch sizes.
+
+Usage:
+    python bench_dense_retrieval.py
+    python bench_dense_retrieval.py --sizes 10000 100000 1000000 --dim 256 --batch 1 32 --json results.json
+"""
+from pathlib import Path
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+
+from retrieval.dense import DenseIndex, HashedTfidfVectorizer
+
+def synthetic_embeddings(path: Path, n_docs: int, dim: int, seed: int = 0, block_rows: int = 1 << 16) -> np.ndarray:
+    """Unit-norm random rows written block by block, returned memory-mapped"""
+    rng = np.random.default_rng(seed)
+    matrix = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(n_docs, dim))
+    for start in range(0, n_docs, block_rows):
+        block = rng.standard_normal((min(block_rows, n_docs - start), dim), dtype=np.float32)
+        matrix[start:start + len(block)] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    matrix.flush()
+    del matrix
+    return np.load(path, mmap_mode="r")
+
+def bench(index: DenseIndex, batch: int, k: int, repeats: int, rng: np.random.Generator) -> dict:
+    dim = index.embeddings.shape[1]
+    index.search_vectors(rng.standard_normal((batch, dim), dtype=np.float32), k=k)  # Page the matrix in
+    timings = []
+    for _ in range(repeats):
+        queries = rng.standard_normal((batch, dim), dtype=np.float32)
+        started = time.perf_counter()
+        index.search_vectors(queries, k=k)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        "p50_ms": round(float(np.percentile(timings, 50)), 3),
+        "p99_ms": round(float(np.percentile(timings, 99)), 3),
+        "per_query_ms": round(float(np.percentile(timings, 50)) / batch, 3)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dense top-k retrieval latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 32])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--json", type=Path, default=None, help="Also write results to this file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_docs in args.sizes:
+            path = Path(tmp) / f"embeddings_{n_docs}.npy"
+            started = time.perf_counter()
+            embeddings = synthetic_embeddings(path, n_docs, args.dim)
+            build_s = time.perf_counter() - started
+            index = DenseIndex(embeddings, HashedTfidfVectorizer())
+            for batch in args.batch:
+                row = {"n_docs": n_docs, "dim": args.dim, "batch": batch, "k": args.k,
+                       "build_s": round(build_s, 2), **bench(index, batch, args.k, args.repeats, rng)}
+                results.append(row)
+                print(f"{n_docs:>9} docs  batch {batch:>3}  p50 {row['p50_ms']:>9.3f} ms  "
+                      f"p99 {row['p99_ms']:>9.3f} ms  ({row['per_query_ms']:.3f} ms/query)")
+            del index, embeddings
+            path.unlink()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
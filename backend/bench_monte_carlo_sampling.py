@@ -0,0 +1,110 @@
+"""
+Monte Carlo Sampling Strategy Benchmark
+Error versus trials for every sampling strategy of MonteCarloSimulator. Each
+(article, strategy, trials) cell is repeated over independent seeds; the
+RMSE of the mean is measured against the exact mean of the risk model and the
+RMSE of the 97.5th percentile against a 2^22-point Sobol reference. The summary
+lists, per strategy, the fewest trials whose mean and 97.5th-percentile RMSE
+both match plain sampling at 1000 trials, and the time that takes.
+
+Usage:
+    python bench_monte_carlo_sampling.py
+    python bench_monte_carlo_sampling.py --articles 356 83 --replicates 200 --json results.json
+"""
+from pathlib import Path
+from typing import Dict, List
+import argparse
+import json
+import math
+import time
+
+import numpy as np
+
+from features.f4_monte_carlo import monte_carlo_simulator, simulation_rngs
+from features.sampling import SAMPLING_STRATEGIES
+
+PLAIN_TRIALS = 1000
+
+def exact_mean(article_number: int) -> float:
+    """Expected risk of each article's model, from the factor distributions"""
+    if article_number == 356:
+        capped_disruption = sum(
+            min(3 * k, 15) * math.exp(-1.7) * 1.7 ** k / math.factorial(k) for k in range(60)
+        )
+        return 35.0 + 40 * 0.80 + capped_disruption + 25 * (1 - 0.65)
+    if article_number == 83:
+        return 20.0 + 25 * 0.70 + 20 * 3 / 5
+    if article_number == 172:
+        return 25.0 + 25 * 0.70 + 22 * 3.5 / 5.5
+    return 15.0
+
+def reference_quantile(article_number: int, q: float) -> float:
+    rng, _ = simulation_rngs(article_number, "reference")
+    return float(np.percentile(monte_carlo_simulator.sample_risks(article_number, rng, 1 << 22, "sobol"), q * 100))
+
+def measure(article_number: int, strategy: str, trials: int, replicates: int,
+            mean: float, tail: float) -> Dict:
+    mean_errors, tail_errors, timings = [], [], []
+    for seed in range(replicates):
+        rng, _ = simulation_rngs(article_number, "benchmark", seed)
+        started = time.perf_counter()
+        risks = monte_carlo_simulator.sample_risks(article_number, rng, trials, strategy)
+        estimate = float(risks.mean())
+        timings.append((time.perf_counter() - started) * 1000)
+        mean_errors.append(estimate - mean)
+        tail_errors.append(float(np.percentile(risks, 97.5)) - tail)
+    return {
+        "article": article_number,
+        "strategy": strategy,
+        "trials": trials,
+        "mean_rmse": round(float(np.sqrt(np.mean(np.square(mean_errors)))), 5),
+        "p97_5_rmse": round(float(np.sqrt(np.mean(np.square(tail_errors)))), 5),
+        "p50_ms": round(float(np.percentile(timings, 50)), 4)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Monte Carlo sampling strategies by error versus trials")
+    parser.add_argument("--articles", type=int, nargs="+", default=[356, 83, 172, 85])
+    parser.add_argument("--strategies", nargs="+", default=list(SAMPLING_STRATEGIES), choices=SAMPLING_STRATEGIES)
+    parser.add_argument("--trials", type=int, nargs="+", default=[64, 128, 256, 512, 1024, 2048, 4096])
+    parser.add_argument("--replicates", type=int, default=100)
+    parser.add_argument("--json", type=Path, default=None, help="Also write results to this file")
+    args = parser.parse_args()
+
+    results: List[Dict] = []
+    summary: List[Dict] = []
+    for article_number in args.articles:
+        mean, tail = exact_mean(article_number), reference_quantile(article_number, 0.975)
+        target = measure(article_number, "plain", PLAIN_TRIALS, args.replicates, mean, tail)
+        print(f"Article {article_number}: exact mean {mean:.4f}, p97.5 {tail:.3f}; "
+              f"plain@{PLAIN_TRIALS} mean RMSE {target['mean_rmse']:.4f} ({target['p50_ms']:.3f} ms)")
+        for strategy in args.strategies:
+            rows = [measure(article_number, strategy, trials, args.replicates, mean, tail) for trials in args.trials]
+            results += rows
+            for row in rows:
+                print(f"  {strategy:<11} {row['trials']:>6} trials  mean RMSE {row['mean_rmse']:>8.5f}  "
+                      f"p97.5 RMSE {row['p97_5_rmse']:>7.4f}  p50 {row['p50_ms']:>7.3f} ms")
+            matching = [row for row in rows
+                        if row["mean_rmse"] <= target["mean_rmse"] and row["p97_5_rmse"] <= target["p97_5_rmse"]]
+            best = matching[0] if matching else None
+            summary.append({
+                "article": article_number,
+                "strategy": strategy,
+                "trials_to_match_plain_1000": best["trials"] if best else None,
+                "p50_ms": best["p50_ms"] if best else None,
+                "plain_1000_p50_ms": target["p50_ms"]
+            })
+
+    print(f"\nTrials needed to match plain sampling at {PLAIN_TRIALS} trials (mean and p97.5 RMSE):")
+    for row in summary:
+        trials = row["trials_to_match_plain_1000"]
+        print(f"  Article {row['article']:<4} {row['strategy']:<11} "
+              f"{trials if trials else '> ' + str(max(args.trials)):>7}"
+              + (f"  ({row['p50_ms']:.3f} ms vs {row['plain_1000_p50_ms']:.3f} ms)" if trials else ""))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"results": results, "summary": summary}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Precedent Query Benchmark
+Times PrecedentQueryEngine on synthetic case-law corpora against a linear scan
+of the same cases, for a mix of year-range, article-set, impact and paginated
+queries. Every indexed answer is checked against the scan.
+
+Usage:
+    python bench_precedent_queries.py
+    python bench_precedent_queries.py --sizes 10000 100000 --repeats 200 --json results.json
+"""
+from pathlib import Path
+from typing import Dict, List
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from features.f3_precedent_analysis import precedent_analyzer
+from retrieval.document_store import Collection, load_precedents
+from retrieval.precedent_query import PrecedentQuery
+
+ARTICLES = [13, 19, 21, 80, 81, 82, 83, 85, 170, 171, 172, 174, 246, 324, 326, 327, 352, 355, 356, 368]
+
+QUERIES = {
+    "post_1994_art356_impact4": PrecedentQuery(articles=(356,), year_from=1995, min_impact=4.0),
+    "art83_and_art172": PrecedentQuery(articles=(83, 172), match="all"),
+    "any_of_3_articles_1970s": PrecedentQuery(articles=(356, 174, 85), year_from=1970, year_to=1979),
+    "year_range_only_page_3": PrecedentQuery(year_from=2000, year_to=2010, sort="year", offset=40, limit=20),
+    "impact_band_good_law": PrecedentQuery(min_impact=3.0, max_impact=4.0, exclude_overruled=True),
+}
+
+def synthetic_cases(n_cases: int, seed: int = 0) -> Dict:
+    rng = random.Random(seed)
+    cases = []
+    for i in range(n_cases):
+        cases.append({
+            "case_name": f"Synthetic Case {i} v. Union of India",
+            "year": rng.randint(1950, 2025),
+            "citation": f"SYN {i}",
+            "summary": "Synthetic precedent for benchmarking.",
+            "relevant_articles": rng.sample(ARTICLES, rng.randint(1, 4)),
+            "impact_score": round(rng.uniform(1.0, 5.0), 1),
+            "relevance": "Synthetic.",
+            "cites": [f"Synthetic Case {j} v. Union of India" for j in rng.sample(range(i), min(i, 3))],
+            "overrules": [f"Synthetic Case {rng.randrange(i)} v. Union of India"] if i and rng.random() < 0.02 else []
+        })
+    return {"cases": cases}
+
+def linear_scan(cases: List[Dict], overruled: np.ndarray, query: PrecedentQuery) -> List[str]:
+    """The same query as a scan over every case dict, for reference and timing"""
+    matches = []
+    for doc_id, case in enumerate(cases):
+        if query.articles:
+            touched = [article in case["relevant_articles"] for article in query.articles]
+            if not (all(touched) if query.match == "all" else any(touched)):
+                continue
+        if query.year_from is not None and case["year"] < query.year_from:
+            continue
+        if query.year_to is not None and case["year"] > query.year_to:
+            continue
+        if query.min_impact is not None and case["impact_score"] < query.min_impact:
+            continue
+        if query.max_impact is not None and case["impact_score"] > query.max_impact:
+            continue
+        if query.exclude_overruled and overruled[doc_id]:
+            continue
+        matches.append(case)
+    if query.sort == "impact":
+        matches.sort(key=lambda case: (-case["impact_score"], -case["year"]))
+    else:
+        matches.sort(key=lambda case: (-case["year"], -case["impact_score"]))
+    return [case["case_name"] for case in matches[query.offset:query.offset + query.limit]]
+
+def timed(fn, repeats: int) -> Dict:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {"p50_ms": round(float(np.percentile(timings, 50)), 4), "p99_ms": round(float(np.percentile(timings, 99)), 4)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark indexed precedent queries against a linear scan")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--json", type=Path, default=None, help="Also write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for n_cases in args.sizes:
+        raw = synthetic_cases(n_cases)
+        started = time.perf_counter()
+        index = precedent_analyzer.build_index(Collection.from_records("precedents", raw, load_precedents(raw), 0))
+        build_s = time.perf_counter() - started
+        engine = index.queries
+        print(f"{n_cases} cases indexed in {build_s:.1f}s")
+
+        for name, query in QUERIES.items():
+            page = engine.query(query)
+            expected = linear_scan(raw["cases"], index.graph.overruled, query)
+            assert [case.case_name for case in page.cases] == expected, f"{name}: indexed result differs from scan"
+            row = {
+                "n_cases": n_cases,
+                "query": name,
+                "total": page.total,
+                "build_s": round(build_s, 2),
+                **{f"indexed_{key}": value for key, value in timed(lambda: engine.query(query), args.repeats).items()},
+                **{f"scan_{key}": value for key, value in
+                   timed(lambda: linear_scan(raw["cases"], index.graph.overruled, query), max(1, args.repeats // 20)).items()}
+            }
+            results.append(row)
+            print(f"  {name:<28} {page.total:>6} matches  indexed p50 {row['indexed_p50_ms']:>8.4f} ms  "
+                  f"p99 {row['indexed_p99_ms']:>8.4f} ms  scan p50 {row['scan_p50_ms']:>8.3f} ms")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
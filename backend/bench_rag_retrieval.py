@@ -0,0 +1,206 @@
+"""
+RAG Retrieval Benchmark
+Scores RAGSystem evidence search on the labelled query set in
+data/rag_benchmark_queries.json (recall@k, MRR, nDCG@k) and times it (p50/p99
+per query) for each search mode. The same queries are then rerun with the
+curated corpus padded by synthetic distractor chunks, ingested through the
+streaming pipeline, recording index build time, peak build memory and index
+size at every corpus size. Each index is built in a fresh child process so its
+peak resident memory is measured in isolation. Runs offline.
+
+Usage:
+    python bench_rag_retrieval.py
+    python bench_rag_retrieval.py --sizes 1000 10000 100000 --modes lexical hybrid --json results.json
+    python bench_rag_retrieval.py --baseline results.json   # exit 1 if quality regressed
+
+Also exits 1 if hybrid MRR falls below lexical MRR at any corpus size.
+"""
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List
+import argparse
+import json
+import math
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from features.f2_rag_system import SEARCH_MODES, rag_system
+from retrieval.dense import DenseIndex
+from retrieval.document_store import Collection, document_store
+from retrieval.ingest import ChunkStore, IndexWriter, load_index
+from retrieval.lexical import TOKEN_RE
+
+QUERIES_FILE = Path(__file__).parent / "data" / "rag_benchmark_queries.json"
+
+def score_query(sources: List[str], relevant: Dict[str, int], ks: List[int]) -> Dict[str, float]:
+    """recall@k, reciprocal rank and nDCG@k (gain 2^grade - 1) for one ranked source list"""
+    ranked = list(dict.fromkeys(sources))  # several chunks can share a page
+    scores = {}
+    for k in ks:
+        scores[f"recall@{k}"] = sum(1 for source in ranked[:k] if source in relevant) / len(relevant)
+        dcg = sum((2 ** relevant.get(source, 0) - 1) / math.log2(i + 2) for i, source in enumerate(ranked[:k]))
+        ideal = sorted(relevant.values(), reverse=True)[:k]
+        idcg = sum((2 ** grade - 1) / math.log2(i + 2) for i, grade in enumerate(ideal))
+        scores[f"ndcg@{k}"] = dcg / idcg
+    scores["mrr"] = next((1 / (i + 1) for i, source in enumerate(ranked) if source in relevant), 0.0)
+    return scores
+
+def evaluate(queries: List[Dict], mode: str, ks: List[int], repeats: int) -> Dict:
+    """Mean quality metrics and per-query latency over the labelled set"""
+    k = max(ks)
+    rag_system.search(queries[0]["query"], k=k, mode=mode)  # Build lazy dense indexes, page in mmaps
+    per_query, timings, misses = [], [], []
+    for item in queries:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            results = rag_system.search(item["query"], k=k, mode=mode)
+            timings.append((time.perf_counter() - started) * 1000)
+        scores = score_query([r["source"] for r in results], item["relevant"], ks)
+        if scores["mrr"] == 0:
+            misses.append(item["id"])
+        per_query.append(scores)
+
+    row = {name: round(float(np.mean([s[name] for s in per_query])), 4) for name in per_query[0]}
+    row["p50_ms"] = round(float(np.percentile(timings, 50)), 3)
+    row["p99_ms"] = round(float(np.percentile(timings, 99)), 3)
+    row["misses"] = misses
+    return row
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+def write_distractors(out_dir: Path, n_chunks: int, vocabulary: List[str], dense_dim: int = None,
+                      chunk_words: int = 200, seed: int = 0) -> Dict:
+    """
+    Ingest n_chunks of word salad drawn from the curated vocabulary (so they
+    match query terms) and report build time, peak memory growth and size.
+    Meant to run in a child process: memory is the growth of its peak RSS.
+    """
+    rng = np.random.default_rng(seed)
+    words = np.array(vocabulary)
+    baseline_mb = peak_rss_mb()
+    started = time.perf_counter()
+    writer = IndexWriter(out_dir)
+    for chunk_id in range(n_chunks):
+        text = " ".join(words[rng.integers(0, len(words), chunk_words)])
+        writer.add({"text": text, "page": 1000 + chunk_id // 4, "section": "Synthetic Annexure"})
+    writer.finalize({"corpus": "kovind", "title": "Synthetic Distractor Corpus"})
+    if dense_dim:
+        store = ChunkStore(out_dir)
+        texts = lambda: (c["text"] for c in map(store.get, range(len(store))))
+        DenseIndex.build_to_disk(texts, len(store), out_dir, dim=dense_dim)
+        del store
+    return {
+        "build_s": round(time.perf_counter() - started, 2),
+        "build_peak_mb": round(peak_rss_mb() - baseline_mb, 1),
+        "index_mb": round(sum(f.stat().st_size for f in out_dir.iterdir()) / 2 ** 20, 1)
+    }
+
+def curated_build() -> Dict:
+    """Time and memory of indexing the curated Constitution and Kovind excerpts from their records"""
+    baseline_mb = peak_rss_mb()
+    started = time.perf_counter()
+    components = [
+        Collection.from_records(name, document_store.collection(name).raw,
+                                document_store.corpora[name][1](document_store.collection(name).raw), 0)
+        for name in ("constitution", "kovind")
+    ]
+    Collection.union("constitution+kovind", components, 0)
+    return {
+        "build_s": round(time.perf_counter() - started, 3),
+        "build_peak_mb": round(peak_rss_mb() - baseline_mb, 1),
+        "index_mb": None
+    }
+
+def compare(results: List[Dict], baseline_path: Path, tolerance: float) -> List[str]:
+    """Quality metrics that dropped by more than `tolerance` against a saved run"""
+    with open(baseline_path) as f:
+        baseline = {(row["distractors"], row["mode"]): row for row in json.load(f)["results"]}
+    regressions = []
+    for row in results:
+        before = baseline.get((row["distractors"], row["mode"]))
+        if before is None:
+            continue
+        for name in row:
+            if name == "mrr" or name.startswith(("recall@", "ndcg@")):
+                if name in before and row[name] < before[name] - tolerance:
+                    regressions.append(f"{row['mode']} +{row['distractors']}: {name} {before[name]} -> {row[name]}")
+    return regressions
+
+def hybrid_below_lexical(results: List[Dict]) -> List[str]:
+    """Corpus sizes where hybrid MRR fell below lexical MRR (hybrid is the default mode)"""
+    mrr = {(row["distractors"], row["mode"]): row["mrr"] for row in results}
+    return [
+        f"hybrid +{distractors}: MRR {mrr[(distractors, 'hybrid')]} < lexical {mrr[(distractors, 'lexical')]}"
+        for distractors, mode in mrr
+        if mode == "hybrid" and (distractors, "lexical") in mrr
+        and mrr[(distractors, "hybrid")] < mrr[(distractors, "lexical")]
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RAG evidence quality and latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 1_000, 10_000, 100_000],
+                        help="Synthetic distractor chunks added to the curated corpus (0 = curated only)")
+    parser.add_argument("--modes", nargs="+", default=list(SEARCH_MODES), choices=SEARCH_MODES)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5, 10], help="Cutoffs for recall@k and nDCG@k")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs of each query")
+    parser.add_argument("--dense-dim", type=int, default=128, help="Embedding dimension of distractor indexes (0: BM25 only)")
+    parser.add_argument("--queries", type=Path, default=QUERIES_FILE)
+    parser.add_argument("--json", type=Path, default=None, help="Also write results to this file")
+    parser.add_argument("--baseline", type=Path, default=None, help="Earlier --json output to check for quality regressions")
+    parser.add_argument("--tolerance", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with open(args.queries) as f:
+        queries = json.load(f)["queries"]
+    curated = rag_system.snapshot.curated
+    vocabulary = sorted({word for text in curated.index_texts for word in TOKEN_RE.findall(text)})
+    base_snapshot = replace(rag_system.snapshot, ingested=[])
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_distractors in args.sizes:
+            if n_distractors:
+                out_dir = Path(tmp) / f"distractors_{n_distractors}"
+                with multiprocessing.get_context("spawn").Pool(1) as pool:
+                    build = pool.apply(write_distractors, (out_dir, n_distractors, vocabulary, args.dense_dim or None))
+                index, store = load_index(out_dir)
+                dense = DenseIndex.load(out_dir) if args.dense_dim else None
+                rag_system.snapshot = replace(base_snapshot, ingested=[(index, store, dense)])
+            else:
+                build = curated_build()
+                rag_system.snapshot = base_snapshot
+
+            for mode in args.modes:
+                row = {"distractors": n_distractors, "chunks": len(curated) + n_distractors, "mode": mode,
+                       **build, **evaluate(queries, mode, args.k, args.repeats)}
+                results.append(row)
+                print(f"{row['chunks']:>9} chunks  {mode:<8} MRR {row['mrr']:.3f}  "
+                      f"recall@{max(args.k)} {row[f'recall@{max(args.k)}']:.3f}  "
+                      f"nDCG@{max(args.k)} {row[f'ndcg@{max(args.k)}']:.3f}  "
+                      f"p50 {row['p50_ms']:>8.3f} ms  p99 {row['p99_ms']:>8.3f} ms  "
+                      f"build {row['build_s']}s / {row['build_peak_mb']} MB")
+            rag_system.snapshot = base_snapshot
+
+    output = {"queries": len(queries), "k": args.k, "repeats": args.repeats, "results": results}
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(output, f, indent=2)
+
+    regressions = hybrid_below_lexical(results)
+    if args.baseline:
+        regressions += compare(results, args.baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Streaming Statistics for Monte Carlo Simulation
+Accumulators that take simulated risks one chunk at a time and merge across
+shards and worker processes: Welford/Chan moments, a fixed-bin histogram and
+a merging t-digest quantile sketch. Memory is constant in the number of
+trials, so 10^8-10^9 trial runs never hold their samples.
+"""
+from typing import Tuple
+
+import numpy as np
+
+# Fixed fine bins (plus an underflow and an overflow bin) so histograms add up exactly
+HISTOGRAM_RANGE = (-50.0, 150.0)
+HISTOGRAM_BINS = 4000
+# t-digest compression: about compression / 2 centroids, finest in the tails
+DIGEST_COMPRESSION = 500
+
+class Moments:
+    """Count, mean, M2 (sum of squared deviations), min and max; Chan et al. batch updates"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    def update(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+        batch_mean = float(values.mean())
+        self._combine(len(values), batch_mean, float(((values - batch_mean) ** 2).sum()),
+                      float(values.min()), float(values.max()))
+
+    def merge(self, other: "Moments"):
+        if other.n:
+            self._combine(other.n, other.mean, other.m2, other.minimum, other.maximum)
+
+    def _combine(self, n: int, mean: float, m2: float, minimum: float, maximum: float):
+        total = self.n + n
+        delta = mean - self.mean
+        self.m2 += m2 + delta ** 2 * self.n * n / total
+        self.mean += delta * n / total
+        self.n = total
+        self.minimum = min(self.minimum, minimum)
+        self.maximum = max(self.maximum, maximum)
+
+    @property
+    def std_dev(self) -> float:
+        """Population standard deviation (as np.std)"""
+        return float(np.sqrt(self.m2 / self.n)) if self.n else 0.0
+
+class FixedHistogram:
+    """Counts over fixed bins with underflow and overflow bins; merging adds counts exactly"""
+
+    def __init__(self, value_range: Tuple[float, float] = HISTOGRAM_RANGE, bins: int = HISTOGRAM_BINS):
+        self.low, self.high = value_range
+        self.bins = bins
+        self.counts = np.zeros(bins + 2, dtype=np.int64)
+
+    def update(self, values: np.ndarray):
+        index = np.floor((values - self.low) * (self.bins / (self.high - self.low))).astype(np.int64)
+        self.counts += np.bincount(np.clip(index + 1, 0, self.bins + 1), minlength=self.bins + 2)
+
+    def merge(self, other: "FixedHistogram"):
+        if (other.low, other.high, other.bins) != (self.low, self.high, self.bins):
+            raise ValueError("Histograms with different bins cannot be merged")
+        self.counts += other.counts
+
+    def rebin(self, bins: int, value_range: Tuple[float, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """Coarser histogram (as np.histogram returns it) whose edges fall on fine-bin edges"""
+        per_bin = self.bins / (self.high - self.low)
+        edges = np.linspace(value_range[0], value_range[1], bins + 1)
+        fine_edges = np.rint((edges - self.low) * per_bin).astype(np.int64) + 1
+        cumulative = np.concatenate([[0], np.cumsum(self.counts)])
+        return np.diff(cumulative[fine_edges]), edges
+
+class TDigest:
+    """
+    Merging t-digest (Dunning & Ertl). Chunks and other digests are folded in
+    by one vectorized compression: sorted centroids are grouped by the integer
+    part of the k1 scale function at their quantile, so each centroid spans at
+    most one unit of k and tail centroids stay small. The result depends only
+    on the order of updates and merges, not on timing.
+    """
+
+    def __init__(self, compression: float = DIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    @property
+    def n(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray):
+        if len(values):
+            self.minimum = min(self.minimum, float(values.min()))
+            self.maximum = max(self.maximum, float(values.max()))
+            self._compress(np.concatenate([self.means, values]),
+                           np.concatenate([self.weights, np.ones(len(values))]))
+
+    def merge(self, other: "TDigest"):
+        if len(other.means):
+            self.minimum = min(self.minimum, other.minimum)
+            self.maximum = max(self.maximum, other.maximum)
+            self._compress(np.concatenate([self.means, other.means]),
+                           np.concatenate([self.weights, other.weights]))
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        total = cumulative[-1]
+        # k1(q) = compression / (2 pi) * asin(2q - 1), at each centroid's mid quantile
+        q = (cumulative - weights / 2) / total
+        bucket = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)).astype(np.int64)
+        starts = np.flatnonzero(np.concatenate([[True], bucket[1:] != bucket[:-1]]))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q: float) -> float:
+        """Interpolates between centroid centres (min and max anchor the ends)"""
+        if not len(self.means):
+            return float("nan")
+        cumulative = np.cumsum(self.weights)
+        centres = cumulative - self.weights / 2
+        positions = np.concatenate([[0.0], centres, [cumulative[-1]]])
+        values = np.concatenate([[self.minimum], self.means, [self.maximum]])
+        return float(np.interp(q * cumulative[-1], positions, values))
+
+class RiskAccumulator:
+    """Moments, fine histogram and quantile sketch of one run (or shard) of simulated risks"""
+
+    def __init__(self):
+        self.moments = Moments()
+        self.histogram = FixedHistogram()
+        self.digest = TDigest()
+
+    @property
+    def n(self) -> int:
+        return self.moments.n
+
+    def update(self, values: np.ndarray):
+        self.moments.update(values)
+        self.histogram.update(values)
+        self.digest.update(values)
+
+    def merge(self, other: "RiskAccumulator") -> "RiskAccumulator":
+        self.moments.merge(other.moments)
+        self.histogram.merge(other.histogram)
+        self.digest.merge(other.digest)
+        return self
+
+    def quantile(self, q: float) -> float:
+        return self.digest.quantile(q)
@@ -0,0 +1,233 @@
+"""
+Debate Similarity Cache
+Local semantic index over past (article, amendment text, context) debate inputs.
+Near-identical rewordings reuse a stored debate (or seed a new one) instead of
+paying for a full four-node LLM run. Embeddings come from a hashing vectorizer,
+so there is no fitted vocabulary and no network access.
+"""
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from pathlib import Path
+import copy
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+import zlib
+
+# Function words that rewordings add or drop without changing the amendment
+STOPWORDS = frozenset(
+    "a an the of in on for to and or by with as at be is are was were this that its it from into".split()
+)
+
+class HashingVectorizer:
+    """Signed feature hashing of word unigrams, word bigrams and character trigrams"""
+
+    def __init__(self, n_features: int = 2 ** 10):
+        self.n_features = n_features
+        # Per-instance cache (article contexts repeat across rewordings); dies with the vectorizer
+        self.transform = lru_cache(maxsize=4096)(self._transform)
+
+    def _features(self, text: str) -> List[Tuple[str, float]]:
+        words = [w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in STOPWORDS]
+        features = [(w, 1.0) for w in words]
+        features += [(f"{a} {b}", 0.5) for a, b in zip(words, words[1:])]
+        # Character trigrams tie together inflections (synchronize / synchronization)
+        for w in words:
+            padded = f"#{w}#"
+            features += [(padded[i:i + 3], 0.25) for i in range(len(padded) - 2)]
+        return features
+
+    def _transform(self, text: str) -> np.ndarray:
+        """Hashed feature vector"""
+        vector = np.zeros(self.n_features, dtype=np.float32)
+        for feature, value in self._features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if h & 0x80000000 else -1.0
+            vector[h % self.n_features] += sign * value
+        vector.setflags(write=False)
+        return vector
+
+def normalize(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+class DebateSimilarityCache:
+    def __init__(self):
+        self.index_path = Path(os.getenv(
+            "DEBATE_SIMILARITY_INDEX",
+            Path(__file__).parent.parent / "data" / "runtime" / "debate_similarity_index.jsonl"
+        ))
+        # At or above reuse_threshold the stored debate is returned as-is;
+        # between seed_threshold and reuse_threshold it seeds a fresh debate
+        self.reuse_threshold = float(os.getenv("DEBATE_REUSE_THRESHOLD", "0.95"))
+        self.seed_threshold = float(os.getenv("DEBATE_SEED_THRESHOLD", "0.80"))
+        # Debates kept in memory per article; the oldest quarter is dropped when full
+        self.max_per_article = max(4, int(os.getenv("DEBATE_CACHE_MAX_PER_ARTICLE", "1000")))
+        self.vectorizer = HashingVectorizer()
+
+        # article -> (entries, embedding matrix, count). Rows past `count` are free
+        # capacity: an insert fills the next row and publishes a new tuple, so
+        # lookups read a consistent snapshot without locking
+        self._index: Dict[int, Tuple[List[Dict], np.ndarray, int]] = {}
+        # Ids of loaded debates, and (inode, bytes read, lines read) of the index
+        # file, so refresh() only parses lines appended since the last read
+        self._seen: set = set()
+        self._file_state: Tuple[Optional[int], int, int] = (None, 0, 0)
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def embed(self, amendment_text: str, context: str) -> np.ndarray:
+        """Amendment wording dominates; context contributes at half weight"""
+        vector = self.vectorizer.transform(amendment_text) + 0.5 * self.vectorizer.transform(context)
+        return normalize(vector)
+
+    def refresh(self):
+        """
+        Load debates appended to the JSONL index file since the last read, e.g. by
+        precompute_debates.py. A replaced or truncated file is reloaded in full and
+        swapped in; lookups keep the previous index meanwhile.
+        """
+        with self._lock:
+            self._read_file()
+            self._compact_if_needed()
+
+    def _read_file(self):
+        try:
+            stat = self.index_path.stat()
+        except FileNotFoundError:
+            return
+        inode, offset, lines = self._file_state
+        index, seen = self._index, self._seen
+        if stat.st_ino != inode or stat.st_size < offset:
+            index, seen, offset, lines = {}, set(), 0, 0
+        try:
+            with open(self.index_path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # a writer is still appending this line
+                    offset += len(line)
+                    lines += 1
+                    if line.strip():
+                        self._load_line(index, seen, line)
+        except Exception as e:
+            print(f"Error loading debate similarity index: {e}")
+        self._index, self._seen, self._file_state = index, seen, (stat.st_ino, offset, lines)
+
+    def _load_line(self, index: Dict, seen: set, line: bytes):
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError as e:
+            print(f"Skipping malformed debate similarity index line: {e}")
+            return
+        # Our own appends come back on the next read; older lines have no id
+        entry.setdefault("id", hashlib.sha1(line.strip()).hexdigest())
+        if entry["id"] not in seen:
+            seen.add(entry["id"])
+            self._insert(index, entry)
+
+    def _compact_if_needed(self):
+        """
+        Rewrite the index file with only the debates still held in memory once
+        evicted or duplicate lines make up over half of it, so the file (and the
+        re-embedding at startup) stays bounded by DEBATE_CACHE_MAX_PER_ARTICLE.
+        A line another process appends during the rewrite can be lost; it is a
+        cache, so that debate simply runs again.
+        """
+        lines = self._file_state[2]
+        if lines <= max(2 * self.size(), self.max_per_article):
+            return
+        entries = sorted(
+            (entry for entries, _, count in self._index.values() for entry in entries[:count]),
+            key=lambda entry: entry.get("created_at", 0)
+        )
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        try:
+            with open(tmp_path, "w") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + "\n")
+            os.replace(tmp_path, self.index_path)
+            stat = self.index_path.stat()
+        except Exception as e:
+            print(f"Error compacting debate similarity index: {e}")
+            return
+        self._seen = {entry["id"] for entry in entries}
+        self._file_state = (stat.st_ino, stat.st_size, len(entries))
+
+    def _insert(self, index: Dict, entry: Dict):
+        """Append one debate (amortized O(1): the matrix grows by doubling)"""
+        article = entry["article"]
+        vector = self.embed(entry["amendment_text"], entry["context"])
+        entries, matrix, count = index.get(
+            article, ([], np.zeros((16, self.vectorizer.n_features), dtype=np.float32), 0)
+        )
+        if count == self.max_per_article:
+            # Keep the newest three quarters in fresh arrays (readers keep their old snapshot)
+            keep = count - count // 4
+            entries, matrix, count = entries[count - keep:], matrix[count - keep:count].copy(), keep
+        if count == len(matrix):
+            grown = np.zeros((min(2 * len(matrix), self.max_per_article), matrix.shape[1]), dtype=np.float32)
+            grown[:count] = matrix[:count]
+            matrix = grown
+        matrix[count] = vector
+        index[article] = (entries[:count] + [entry], matrix, count + 1)
+
+    def lookup(self, article: int, amendment_text: str, context: str,
+               ensemble_size: int = 1) -> Optional[Tuple[Dict, float]]:
+        """
+        Most similar stored debate for this article, with its cosine similarity.
+        If that debate has fewer than `ensemble_size` vulnerability samples, a
+        reusable one with enough samples is preferred.
+        """
+        entries, matrix, count = self._index.get(article, ([], None, 0))
+        if not count:
+            return None
+        similarities = matrix[:count] @ self.embed(amendment_text, context)
+        best = int(np.argmax(similarities))
+        if entries[best].get("ensemble_size", 1) < ensemble_size:
+            eligible = [i for i in range(count) if entries[i].get("ensemble_size", 1) >= ensemble_size]
+            if eligible:
+                candidate = max(eligible, key=lambda i: similarities[i])
+                if similarities[candidate] >= self.reuse_threshold:
+                    best = candidate
+        return entries[best], float(similarities[best])
+
+    def add(self, article: int, amendment_text: str, context: str, result: Dict, ensemble_size: int = 1):
+        """
+        Store a copy of a completed debate and append it to the index file.
+        ensemble_size is the number of vulnerability samples behind the result;
+        a request for more samples only uses this debate as a seed.
+        """
+        entry = {
+            "id": uuid.uuid4().hex,
+            "article": article,
+            "amendment_text": amendment_text,
+            "context": context,
+            "ensemble_size": ensemble_size,
+            # The caller keeps mutating its result (e.g. cache_match); the cache owns a copy
+            "result": copy.deepcopy(result),
+            "created_at": time.time()
+        }
+        with self._lock:
+            self._seen.add(entry["id"])
+            self._insert(self._index, entry)
+            try:
+                self.index_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.index_path, "a") as f:
+                    f.write(json.dumps(entry) + "\n")
+            except Exception as e:
+                print(f"Error writing debate similarity index: {e}")
+            # Also counts the new line (and any from other writers) towards compaction
+            self._read_file()
+            self._compact_if_needed()
+
+    def size(self) -> int:
+        return sum(count for _, _, count in self._index.values())
+
+# Singleton instance
+debate_cache = DebateSimilarityCache()
@@ -3,14 +3,25 @@ Feature 1: AI Debate Agent (LangGraph Enhanced)
 Multi-node constitutional debate workflow using LangGraph and DeepSeek
 """
 from langgraph.graph import StateGraph, END
+from langgraph.checkpoint.sqlite import SqliteSaver
 from langchain_huggingface import HuggingFaceEndpoint,ChatHuggingFace
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from models import VulnerabilityScoreAssessment, RiskMitigationResponse, MitigationStrategy
+from llm_usage import usage_tracker
+from features.debate_cache import debate_cache
 
-from typing import TypedDict, List, Dict
+from typing import TypedDict, List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+import contextvars
+import copy
+import hashlib
 import json
+import math
 import os
+import sqlite3
+import threading
 from dotenv import load_dotenv, find_dotenv
 
 # Load environment variables
@@ -31,12 +42,18 @@ class DebateState(TypedDict):
     vulnerability_score: float
     court_challenge_probability: str
     mitigations: List[Dict[str, str]]
+    ensemble_size: int
+    vulnerability_ensemble: Optional[Dict]
+    fallback_nodes: List[str]
     step: int
 
 # ============================================================================
 # INITIALIZE LLM (DeepSeek via Hugging Face)
 # ============================================================================
 
+DEBATE_MODEL = "HuggingFaceH4/zephyr-7b-beta"
+ASSESSMENT_MODEL = "mistralai/Mistral-7B-Instruct-v0.2"
+
 def get_llm():
     """Initialize DeepSeek LLM via Hugging Face"""
     api_key = os.getenv("HUGGINGFACE_API_KEY")
@@ -47,12 +64,12 @@ def get_llm():
     
     try:
         llm = HuggingFaceEndpoint(
-            repo_id="HuggingFaceH4/zephyr-7b-beta",
+            repo_id=DEBATE_MODEL,
             huggingfacehub_api_token=api_key,
             temperature=0.7,
             max_new_tokens=512,
             top_p=0.95,
-            endpoint_url="https://router.huggingface.co/models/HuggingFaceH4/zephyr-7b-beta"
+            endpoint_url=f"https://router.huggingface.co/models/{DEBATE_MODEL}"
         )
         model = ChatHuggingFace(llm=llm)
         return model
@@ -70,7 +87,7 @@ def vulnerability_llm():
     
     try:
         llm = HuggingFaceEndpoint(
-            repo_id="mistralai/Mistral-7B-Instruct-v0.2",
+            repo_id=ASSESSMENT_MODEL,
             huggingfacehub_api_token=api_key,
             temperature=0.7,
             max_new_tokens=512,
@@ -90,6 +107,7 @@ def government_position_node(state: DebateState) -> DebateState:
     """Government argues for ONOE feasibility"""
     
     llm = get_llm()
+    call = usage_tracker.start("government", DEBATE_MODEL, state["article"])
     
     # Predefined arguments for each article (fallback if LLM unavailable)
     fallback_arguments = {
@@ -100,6 +118,7 @@ def government_position_node(state: DebateState) -> DebateState:
     
     if llm is None:
         # Use fallback
+        call.mark_fallback("llm_unavailable")
         government_arg = fallback_arguments.get(
             state["article"],
             "The proposed amendment is constitutionally sound and necessary for ONOE implementation."
@@ -128,12 +147,17 @@ def government_position_node(state: DebateState) -> DebateState:
                 "article": state["article"],
                 "amendment_text": state["amendment_text"],
                 "context": state["context"]
-            })
+            }, config={"callbacks": [call.handler]})
             government_arg = response.content.strip()
         except Exception as e:
             print(f"LLM error in government node: {e}")
+            call.mark_fallback("llm_error")
             government_arg = fallback_arguments.get(state["article"], "Amendment is feasible.")
     
+    usage_tracker.finish(call)
+    if call.fallback:
+        state["fallback_nodes"].append("government")
+    
     state["government_argument"] = government_arg
     state["debate_transcript"].append({
         "speaker": "GOVERNMENT",
@@ -152,6 +176,7 @@ def court_position_node(state: DebateState) -> DebateState:
     """Supreme Court presents counter-argument"""
     
     llm = get_llm()
+    call = usage_tracker.start("court", DEBATE_MODEL, state["article"])
     
     # Predefined counter-arguments (fallback)
     fallback_arguments = {
@@ -161,6 +186,7 @@ def court_position_node(state: DebateState) -> DebateState:
     }
     
     if llm is None:
+        call.mark_fallback("llm_unavailable")
         court_arg = fallback_arguments.get(
             state["article"],
             "This amendment violates basic structure doctrine and federalism principles."
@@ -192,12 +218,17 @@ def court_position_node(state: DebateState) -> DebateState:
                 "amendment_text": state["amendment_text"],
                 "context": state["context"],
                 "government_argument": state["government_argument"]
-            })
+            }, config={"callbacks": [call.handler]})
             court_arg = response.content.strip()
         except Exception as e:
             print(f"LLM error in court node: {e}")
+            call.mark_fallback("llm_error")
             court_arg = fallback_arguments.get(state["article"], "Amendment violates basic structure.")
     
+    usage_tracker.finish(call)
+    if call.fallback:
+        state["fallback_nodes"].append("court")
+    
     state["court_argument"] = court_arg
     state["debate_transcript"].append({
         "speaker": "SUPREME COURT",
@@ -212,10 +243,148 @@ def court_position_node(state: DebateState) -> DebateState:
 # NODE 3: VULNERABILITY ASSESSMENT
 # ============================================================================
 
+def _sample_vulnerability(llm, state: DebateState) -> Optional[float]:
+    """One LLM vulnerability assessment; None if the call or parsing fails"""
+    call = usage_tracker.start("assess", ASSESSMENT_MODEL, state["article"])
+    
+    # Use PydanticOutputParser
+    parser = PydanticOutputParser(pydantic_object=VulnerabilityScoreAssessment)
+    
+    prompt_template = ChatPromptTemplate.from_template(
+        """Analyze litigation risk for this constitutional amendment.
+ 
+ Article: {article}
+ Government: {government_argument}
+ Court: {court_argument}
+ 
+ Based on federalism concerns, precedent strength, and court history, provide a vulnerability score (0.0 to 1.0) and explanation.
+ 
+ {format_instructions}"""
+    )
+    
+    try:
+        chain = prompt_template | llm | parser
+        response: VulnerabilityScoreAssessment = chain.invoke({
+            "article": state["article"],
+            "government_argument": state["government_argument"],
+            "court_argument": state["court_argument"],
+            "format_instructions": parser.get_format_instructions()
+        }, config={"callbacks": [call.handler]})
+        
+        # The structured output returns a Pydantic object directly
+        print(f"LLM Assessment: {response.vulnerability_score1} - {response.explanation}")
+        return response.vulnerability_score1
+        
+    except Exception as e:
+        print(f"LLM error in assessment node: {e}")
+        import traceback
+        traceback.print_exc()
+        call.mark_fallback("llm_error")
+        return None
+    finally:
+        usage_tracker.finish(call)
+
+# Two-sided 95% Student-t critical values by degrees of freedom (normal beyond 30)
+T_CRITICAL_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365,
+    8: 2.306, 9: 2.262, 10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 30: 2.042
+}
+
+def summarize_vulnerability_samples(samples: List[float]) -> Dict:
+    """Mean, spread and 95% confidence interval of the mean for an ensemble"""
+    n = len(samples)
+    mean = sum(samples) / n
+    std_dev = (sum((x - mean) ** 2 for x in samples) / (n - 1)) ** 0.5 if n > 1 else 0.0
+    
+    if n > 1:
+        df = n - 1
+        t_value = 1.96 if df > 30 else T_CRITICAL_95[max(k for k in T_CRITICAL_95 if k <= df)]
+        half_width = t_value * std_dev / n ** 0.5
+    else:
+        half_width = float("inf")
+    
+    return {
+        "samples": [round(x, 3) for x in samples],
+        "n": n,
+        "mean": round(mean, 3),
+        "std_dev": round(std_dev, 3),
+        "min": round(min(samples), 3),
+        "max": round(max(samples), 3),
+        "confidence_interval_95": [round(max(0.0, mean - half_width), 3), round(min(1.0, mean + half_width), 3)],
+        "ci_half_width": round(half_width, 3) if n > 1 else None
+    }
+
+def run_vulnerability_ensemble(llm, state: DebateState, size: int) -> Optional[Dict]:
+    """
+    Fire up to `size` concurrent assessments (capped by VULNERABILITY_ENSEMBLE_CONCURRENCY)
+    and stop early once the 95% CI half-width is within VULNERABILITY_CI_TOLERANCE.
+    In-flight calls are capped at the samples still needed (the minimum, then an
+    estimate from the current CI), so an early stop wastes few calls; any that
+    were still running are reported as "discarded".
+    Returns the ensemble summary, or None if every sample failed.
+    """
+    concurrency = max(1, int(os.getenv("VULNERABILITY_ENSEMBLE_CONCURRENCY", "4")))
+    tolerance = float(os.getenv("VULNERABILITY_CI_TOLERANCE", "0.05"))
+    min_samples = 3
+    
+    samples: List[float] = []
+    submitted, failed = 0, 0
+    early_stopped = False
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    pending = set()
+    
+    try:
+        while True:
+            if len(samples) < min_samples:
+                needed = min_samples - len(samples)
+            else:
+                # Half-width shrinks as 1/sqrt(n): samples still needed to reach the tolerance
+                half_width = summarize_vulnerability_samples(samples)["ci_half_width"]
+                needed = max(1, math.ceil(len(samples) * (half_width / tolerance) ** 2) - len(samples))
+            while submitted < size and len(pending) < min(concurrency, needed):
+                # Each task runs in a copy of this context, so usage records keep the request id
+                pending.add(executor.submit(contextvars.copy_context().run, _sample_vulnerability, llm, state))
+                submitted += 1
+            if not pending:
+                break
+            
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                score = future.result()
+                if score is None:
+                    failed += 1
+                else:
+                    samples.append(max(0.0, min(1.0, score)))
+            
+            if len(samples) >= min_samples:
+                half_width = summarize_vulnerability_samples(samples)["ci_half_width"]
+                if half_width <= tolerance and (pending or submitted < size):
+                    early_stopped = True
+                    break
+    finally:
+        # Drop queued samples; in-flight calls finish in the background and are discarded
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    if not samples:
+        return None
+    
+    summary = summarize_vulnerability_samples(samples)
+    summary.update({
+        "requested": size,
+        "submitted": submitted,
+        "failed": failed,
+        "discarded": len(pending),
+        "tolerance": tolerance,
+        "early_stopped": early_stopped
+    })
+    return summary
+
 def vulnerability_assessment_node(state: DebateState) -> DebateState:
     """AI evaluates court challenge probability"""
     
     llm = vulnerability_llm()
+    ensemble_size = state.get("ensemble_size") or 1
+    ensemble = None
     
     # Predefined vulnerability scores
     vulnerability_scores = {
@@ -225,51 +394,36 @@ def vulnerability_assessment_node(state: DebateState) -> DebateState:
     }
     
     if llm is None:
-        vulnerability = vulnerability_scores.get(state["article"], 0.65)
+        call = usage_tracker.start("assess", ASSESSMENT_MODEL, state["article"])
+        call.mark_fallback("llm_unavailable")
+        usage_tracker.finish(call)
+        vulnerability = None
+    elif ensemble_size > 1:
+        # Ensemble mode: average several temperature-0.7 samples for a stable score
+        ensemble = run_vulnerability_ensemble(llm, state, ensemble_size)
+        vulnerability = ensemble["mean"] if ensemble else None
     else:
-        # Use PydanticOutputParser
-        parser = PydanticOutputParser(pydantic_object=VulnerabilityScoreAssessment)
-        
-        prompt_template = ChatPromptTemplate.from_template(
-            """Analyze litigation risk for this constitutional amendment.
- 
- Article: {article}
- Government: {government_argument}
- Court: {court_argument}
- 
- Based on federalism concerns, precedent strength, and court history, provide a vulnerability score (0.0 to 1.0) and explanation.
- 
- {format_instructions}"""
-        )
-        
-        try:
-            chain = prompt_template | llm | parser
-            response: VulnerabilityScoreAssessment = chain.invoke({
-                "article": state["article"],
-                "government_argument": state["government_argument"],
-                "court_argument": state["court_argument"],
-                "format_instructions": parser.get_format_instructions()
-            })
-            
-            # The structured output returns a Pydantic object directly
-            vulnerability = response.vulnerability_score1
-            print(f"LLM Assessment: {vulnerability} - {response.explanation}")
-            
-        except Exception as e:
-            print(f"LLM error in assessment node: {e}")
-            import traceback
-            traceback.print_exc()
-            vulnerability = vulnerability_scores.get(state["article"], 0.68)
+        vulnerability = _sample_vulnerability(llm, state)
+    
+    if vulnerability is None:
+        state["fallback_nodes"].append("assess")
+        vulnerability = vulnerability_scores.get(state["article"], 0.65 if llm is None else 0.68)
     
     vulnerability = max(0, min(1, vulnerability))
     
     state["vulnerability_score"] = round(vulnerability, 2)
     state["court_challenge_probability"] = f"{int(vulnerability * 100)}%"
+    state["vulnerability_ensemble"] = ensemble
     state["step"] = 3
     
+    assessment = f"Vulnerability Score: {state['vulnerability_score']} ({state['court_challenge_probability']} court challenge probability)"
+    if ensemble:
+        low, high = ensemble["confidence_interval_95"]
+        assessment += f" - ensemble of {ensemble['n']}, 95% CI [{low}, {high}]"
+    
     state["debate_transcript"].append({
         "speaker": "ASSESSMENT",
-        "argument": f"Vulnerability Score: {state['vulnerability_score']} ({state['court_challenge_probability']} court challenge probability)",
+        "argument": assessment,
         "type": "assessment"
     })
     
@@ -283,6 +437,7 @@ def risk_mitigation_node(state: DebateState) -> DebateState:
     """Suggest constitutional safeguards"""
     
     llm = get_llm()
+    call = usage_tracker.start("mitigate", DEBATE_MODEL, state["article"])
     
     # Fallback mitigations
     fallback_mitigations = {
@@ -299,6 +454,7 @@ def risk_mitigation_node(state: DebateState) -> DebateState:
     }
     
     if llm is None:
+        call.mark_fallback("llm_unavailable")
         mitigations = fallback_mitigations.get(state["article"], [])
     else:
         # Use PydanticOutputParser
@@ -323,7 +479,7 @@ Provide 2 mitigation strategies with legal basis.
                 "vulnerability_score": state["vulnerability_score"],
                 "court_argument": state["court_argument"],
                 "format_instructions": parser.get_format_instructions()
-            })
+            }, config={"callbacks": [call.handler]})
             
             # Convert Pydantic models to list of dicts for state
             mitigations = [m.model_dump() for m in response.mitigations]
@@ -332,8 +488,13 @@ Provide 2 mitigation strategies with legal basis.
             print(f"LLM error in mitigation node: {e}")
             import traceback
             traceback.print_exc()
+            call.mark_fallback("llm_error")
             mitigations = fallback_mitigations.get(state["article"], [])
     
+    usage_tracker.finish(call)
+    if call.fallback:
+        state["fallback_nodes"].append("mitigate")
+    
     state["mitigations"] = mitigations
     
     for mitigation in mitigations:
@@ -346,11 +507,42 @@ Provide 2 mitigation strategies with legal basis.
     state["step"] = 4
     return state
 
+# ============================================================================
+# CHECKPOINTING (SQLite)
+# ============================================================================
+
+# Node names in execution order; DebateState["step"] counts completed nodes
+DEBATE_STEPS = ["government", "court", "assess", "mitigate"]
+
+# Striped locks: identical concurrent debates share a thread id, so they run one at a time
+THREAD_LOCK_STRIPES = 64
+
+def get_checkpointer():
+    """Initialize SQLite checkpointer so debates can resume after a node failure"""
+    db_path = Path(os.getenv(
+        "DEBATE_CHECKPOINT_DB",
+        Path(__file__).parent.parent / "data" / "runtime" / "debate_checkpoints.sqlite"
+    ))
+    
+    try:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        # FastAPI runs sync routes in a threadpool, so the connection is shared across threads
+        conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        return SqliteSaver(conn)
+    except Exception as e:
+        print(f"Error initializing debate checkpointer: {e}")
+        return None
+
+def debate_thread_id(article: int, amendment_text: str, context: str) -> str:
+    """Stable checkpoint thread id for one (article, amendment, context) debate"""
+    digest = hashlib.sha1(f"{article}|{amendment_text}|{context}".encode("utf-8")).hexdigest()
+    return f"debate-{article}-{digest[:16]}"
+
 # ============================================================================
 # BUILD LANGGRAPH
 # ============================================================================
 
-def build_debate_graph():
+def build_debate_graph(checkpointer=None):
     """Build the LangGraph debate workflow"""
     
     workflow = StateGraph(DebateState)
@@ -368,7 +560,7 @@ def build_debate_graph():
     workflow.add_edge("assess", "mitigate")
     workflow.add_edge("mitigate", END)
     
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 # ============================================================================
 # MAIN DEBATE FUNCTION
@@ -376,7 +568,15 @@ def build_debate_graph():
 
 class EnhancedDebateAgent:
     def __init__(self):
-        self.graph = build_debate_graph()
+        self.checkpointer = get_checkpointer()
+        self.graph = build_debate_graph(self.checkpointer)
+        self._thread_locks = [threading.Lock() for _ in range(THREAD_LOCK_STRIPES)]
+        
+        # How many times a failed debate is resumed from its last checkpoint
+        self.max_resumes = int(os.getenv("DEBATE_MAX_RESUMES", "1"))
+        
+        # Number of concurrent vulnerability samples per debate (1 = single sample)
+        self.ensemble_size = int(os.getenv("VULNERABILITY_ENSEMBLE_SIZE", "1"))
         
         # Article-specific contexts
         self.contexts = {
@@ -391,8 +591,14 @@ class EnhancedDebateAgent:
             356: "Define explicit procedure for elections during President's Rule in ONOE context"
         }
     
-    def simulate_debate(self, article_number: int, topic: str = None, use_llm: bool = True) -> Dict:
-        """Run complete constitutional debate using LangGraph"""
+    def simulate_debate(self, article_number: int, topic: str = None, use_llm: bool = True,
+                        ensemble_size: int = None, amendment_text: str = None, context: str = None,
+                        use_cache: bool = True) -> Dict:
+        """
+        Run complete constitutional debate using LangGraph.
+        amendment_text/context override the article defaults (e.g. analyst rewordings);
+        near-identical earlier debates are reused or used as a seed when use_cache is set.
+        """
         
         if not use_llm:
             # Return pre-calculated fallback immediately
@@ -403,45 +609,171 @@ class EnhancedDebateAgent:
                 "risk_contribution": (0.68 if article_number != 356 else 0.85) * (40 if article_number == 356 else 25),
                 "debate_transcript": [],
                 "mitigations": [],
-                "court_challenge_probability": "High"
+                "court_challenge_probability": "High",
+                "fallback_nodes": list(DEBATE_STEPS)
             }
         
+        amendment_text = amendment_text or self.amendments.get(article_number, "Constitutional amendment for ONOE")
+        context = context or self.contexts.get(article_number, "ONOE implementation context")
+        
+        requested_ensemble = ensemble_size or self.ensemble_size
+        
+        # Look for an earlier debate on a near-identical amendment
+        match = debate_cache.lookup(article_number, amendment_text, context, requested_ensemble) if use_cache else None
+        cache_match = None
+        seed = None
+        if match:
+            entry, similarity = match
+            cache_match = {
+                "similarity": round(similarity, 4),
+                "matched_amendment_text": entry["amendment_text"],
+                "matched_context": entry["context"]
+            }
+            # A stored debate with fewer vulnerability samples than requested is only a seed
+            if similarity >= debate_cache.reuse_threshold and entry.get("ensemble_size", 1) >= requested_ensemble:
+                # Deep copy: callers may mutate nested transcript/mitigation lists
+                return {**copy.deepcopy(entry["result"]), "cache_match": {**cache_match, "mode": "reused"}}
+            if similarity >= debate_cache.seed_threshold:
+                seed = copy.deepcopy(entry["result"])
+                cache_match["mode"] = "seeded"
+            else:
+                cache_match = None
+        
         initial_state = {
             "article": article_number,
-            "amendment_text": self.amendments.get(article_number, "Constitutional amendment for ONOE"),
-            "context": self.contexts.get(article_number, "ONOE implementation context"),
+            "amendment_text": amendment_text,
+            "context": context,
             "government_argument": "",
             "court_argument": "",
             "debate_transcript": [],
             "vulnerability_score": 0.0,
             "court_challenge_probability": "0%",
             "mitigations": [],
+            "ensemble_size": requested_ensemble,
+            "vulnerability_ensemble": None,
+            "fallback_nodes": [],
             "step": 0
         }
         
-        try:
-            final_state = self.graph.invoke(initial_state)
-        except Exception as e:
-            print(f"Error in debate graph: {e}")
-            # Return fallback state
-            final_state = initial_state
-            final_state["vulnerability_score"] = 0.68
-            final_state["government_argument"] = "Amendment is feasible"
-            final_state["court_argument"] = "Amendment violates basic structure"
+        final_state, completed_steps = self._run_graph(initial_state, seed)
+        partial = len(completed_steps) < len(DEBATE_STEPS)
         
         # Calculate risk contribution
         risk_weight = 30 if article_number == 356 else 25
         risk_contribution = final_state["vulnerability_score"] * risk_weight
         
-        return {
+        result = {
             "vulnerability_score": final_state["vulnerability_score"],
             "government_argument": final_state["government_argument"],
             "court_argument": final_state["court_argument"],
             "risk_contribution": risk_contribution,
             "debate_transcript": final_state["debate_transcript"],
             "mitigations": final_state.get("mitigations", []),
-            "court_challenge_probability": final_state["court_challenge_probability"]
+            "court_challenge_probability": final_state["court_challenge_probability"],
+            "vulnerability_ensemble": final_state.get("vulnerability_ensemble"),
+            "completed_steps": completed_steps,
+            "partial": partial,
+            # Nodes that used canned text because the LLM gave no usable reply
+            "fallback_nodes": list(final_state.get("fallback_nodes", []))
         }
+        
+        # Only complete, LLM-generated debates are worth reusing
+        if use_cache and not partial and not result["fallback_nodes"]:
+            # An ensemble that stopped on failures (not convergence) holds fewer samples
+            ensemble = result["vulnerability_ensemble"]
+            samples = ensemble["n"] if ensemble and not ensemble["early_stopped"] else requested_ensemble
+            debate_cache.add(article_number, amendment_text, context, result, ensemble_size=samples)
+        
+        result["cache_match"] = cache_match
+        return result
+    
+    def _run_graph(self, initial_state: DebateState, seed: Dict = None):
+        """
+        Run the debate graph, resuming from the last checkpoint on failure.
+        A seed (a stored debate on a similar amendment) supplies the government and
+        court positions, so only the assess and mitigate nodes run.
+        Returns the final (or best partial) state and the list of completed nodes.
+        """
+        if self.checkpointer is None:
+            try:
+                return self.graph.invoke(initial_state), list(DEBATE_STEPS)
+            except Exception as e:
+                print(f"Error in debate graph: {e}")
+                return self._fallback_state(initial_state, initial_state), []
+        
+        thread_id = debate_thread_id(
+            initial_state["article"], initial_state["amendment_text"], initial_state["context"]
+        )
+        lock = self._thread_locks[int(thread_id.rsplit("-", 1)[1], 16) % THREAD_LOCK_STRIPES]
+        with lock:
+            final_state, completed_steps = self._run_checkpointed(
+                {"configurable": {"thread_id": thread_id}}, initial_state, seed
+            )
+            if len(completed_steps) == len(DEBATE_STEPS):
+                # Finished debates are never resumed; only interrupted ones keep checkpoints
+                self._delete_thread(thread_id)
+        return final_state, completed_steps
+    
+    def _run_checkpointed(self, config: Dict, initial_state: DebateState, seed: Dict = None):
+        # An earlier call may have stopped mid-debate: pick up where it left off
+        snapshot = self.graph.get_state(config)
+        graph_input = None if snapshot.next else initial_state
+        
+        if graph_input is None and snapshot.values.get("ensemble_size") != initial_state["ensemble_size"]:
+            # The interrupted run was requested with other settings; this request's apply
+            self.graph.update_state(config, {"ensemble_size": initial_state["ensemble_size"]})
+        
+        if seed and graph_input is not None:
+            seeded_transcript = [t for t in seed["debate_transcript"] if t["type"] in ("position", "counter")]
+            self.graph.update_state(config, {
+                **initial_state,
+                "government_argument": seed["government_argument"],
+                "court_argument": seed["court_argument"],
+                "debate_transcript": seeded_transcript,
+                "step": 2
+            }, as_node="court")
+            graph_input = None
+        
+        for attempt in range(self.max_resumes + 1):
+            try:
+                final_state = self.graph.invoke(graph_input, config)
+                return final_state, list(DEBATE_STEPS)
+            except Exception as e:
+                print(f"Error in debate graph (attempt {attempt + 1}): {e}")
+                # Resume from the last completed node (restart if nothing was checkpointed)
+                graph_input = None if self.graph.get_state(config).next else initial_state
+        
+        # Serve whatever the completed nodes produced
+        snapshot = self.graph.get_state(config)
+        partial_state = snapshot.values or initial_state
+        completed_steps = DEBATE_STEPS[:partial_state.get("step", 0)]
+        print(f"Serving partial debate, completed steps: {completed_steps}")
+        return self._fallback_state(initial_state, partial_state), completed_steps
+    
+    def _delete_thread(self, thread_id: str):
+        """Drop a thread's checkpoints so the database only holds resumable debates"""
+        try:
+            try:
+                self.checkpointer.delete_thread(thread_id)
+            except NotImplementedError:
+                # Older SqliteSaver releases leave delete_thread unimplemented
+                with self.checkpointer.cursor() as cur:
+                    cur.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+                    cur.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+        except Exception as e:
+            print(f"Error pruning debate checkpoints for {thread_id}: {e}")
+    
+    def _fallback_state(self, initial_state: DebateState, partial_state: DebateState) -> DebateState:
+        """Fill in fields of nodes that never completed"""
+        state = {**initial_state, **partial_state}
+        if not state["government_argument"]:
+            state["government_argument"] = "Amendment is feasible"
+        if not state["court_argument"]:
+            state["court_argument"] = "Amendment violates basic structure"
+        if state.get("step", 0) < 3:
+            state["vulnerability_score"] = 0.68
+            state["court_challenge_probability"] = "68%"
+        return state
 
 # Singleton instance
 debate_agent = EnhancedDebateAgent()
@@ -2,35 +2,343 @@
 Feature 2: RAG (Retrieval-Augmented Generation) System
 Queries Constitution and Kovind Report for evidence
 """
-import json
-from typing import List, Dict
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Optional, Tuple
 from pathlib import Path
+import heapq
+import numpy as np
+
+from retrieval.dense import DenseIndex
+from retrieval.document_store import Collection, Filters, document_store
+from retrieval.ingest import ChunkStore, load_index
+from retrieval.lexical import BM25Index
+from models import RAGEvidence
+
+SEARCH_MODES = ("lexical", "dense", "hybrid")
+
+# Kovind excerpt "relevance" tag matched (as a substring) for each article
+KOVIND_RELEVANCE_TAGS = {
+    82: "article_82",
+    83: "articles_83_172",
+    85: "article_85",
+    172: "articles_83_172",
+    174: "article_174",
+    356: "article_356",
+    "82A": "article_82A"
+}
+
+@dataclass(frozen=True)
+class RAGSnapshot:
+    """Everything a query reads; a reload builds a new snapshot and swaps the reference"""
+    constitution: Collection
+    kovind: Collection
+    # Both corpora in one index, so BM25 statistics and dense idf are shared
+    curated: Collection
+    ingested: List[Tuple[BM25Index, ChunkStore, Optional[DenseIndex]]]
+    # str(article number) -> ready-to-serialize evidence, built once per load/reload
+    article_evidence: Mapping[str, Tuple[RAGEvidence, ...]]
 
 class RAGSystem:
     def __init__(self):
         self.data_dir = Path(__file__).parent.parent / "data"
-        self.constitution_data = None
-        self.kovind_data = None
+        # Weight of the dense cosine in hybrid mode (lexical gets 1 - alpha)
+        self.hybrid_alpha = float(os.getenv("RAG_HYBRID_ALPHA", "0.5"))
+        # Full-length corpora built offline by retrieval/ingest.py
+        self.index_dir = Path(os.getenv("RAG_INDEX_DIR", self.data_dir / "index"))
+        self.snapshot: Optional[RAGSnapshot] = None
         self.load_documents()
     
+    @property
+    def constitution_data(self) -> Dict:
+        return self.snapshot.constitution.raw
+    
+    @property
+    def kovind_data(self) -> Dict:
+        return self.snapshot.kovind.raw
+    
+    def watched_files(self) -> List[Path]:
+        """Files whose change requires a reload (ingest writes meta.json last)"""
+        return [document_store.path("constitution"), document_store.path("kovind")] + self.ingested_meta_paths()
+    
+    def ingested_meta_paths(self) -> List[Path]:
+        """meta.json of each published index (ingest stages into <name>.tmp and swaps it in)"""
+        if not self.index_dir.exists():
+            return []
+        return [p for p in sorted(self.index_dir.glob("*/meta.json")) if p.parent.suffix not in (".tmp", ".old")]
+    
     def load_documents(self):
-        """Load Constitution and Kovind Report excerpts"""
-        try:
-            with open(self.data_dir / "constitution_excerpts.json", "r") as f:
-                self.constitution_data = json.load(f)
+        """Load Constitution and Kovind Report excerpts (shared with the document store)"""
+        self.snapshot = self._build_snapshot(document_store.collection("constitution"), document_store.collection("kovind"))
+    
+    def reload(self):
+        """
+        Rebuild every index off the request path and swap the snapshot in one
+        assignment. Raises (keeping the current snapshot) if a file is unreadable,
+        e.g. half-written.
+        """
+        constitution = document_store.reload("constitution")
+        kovind = document_store.reload("kovind")
+        self.snapshot = self._build_snapshot(constitution, kovind)
+    
+    def _build_snapshot(self, constitution: Collection, kovind: Collection) -> RAGSnapshot:
+        return RAGSnapshot(
+            constitution=constitution,
+            kovind=kovind,
+            curated=document_store.union(("constitution", "kovind")),
+            ingested=self.load_ingested_indexes(),
+            article_evidence=self.build_article_evidence(constitution.raw, kovind.raw, kovind)
+        )
+    
+    def build_article_evidence(self, constitution_data: Dict, kovind_data: Dict,
+                               kovind: Collection) -> Mapping[str, Tuple[RAGEvidence, ...]]:
+        """
+        Constitution text plus tagged Kovind excerpts for every known article, in
+        the order and with the scores query_constitution/query_kovind_report give,
+        from a single pass over the excerpts. Near-duplicate excerpts (same
+        MinHash cluster) collapse into their first occurrence, keeping the best
+        score and every page reference.
+        """
+        articles = constitution_data.get("articles", {})
+        keys = {str(article) for article in KOVIND_RELEVANCE_TAGS} | set(articles)
+        tags = {str(article): tag for article, tag in KOVIND_RELEVANCE_TAGS.items()}
+        # (excerpt index, score) in bundle order
+        tagged: Dict[str, List[Tuple[int, float]]] = {key: [] for key in keys}
+        statistics: List[Tuple[int, float]] = []
+        excerpts = kovind_data.get("excerpts", [])
+        
+        for i, excerpt in enumerate(excerpts):
+            relevance = excerpt.get("relevance", "")
+            for key in keys:
+                if tags.get(key, "") in relevance:
+                    tagged[key].append((i, 0.95))
+            if "article_356_statistics" in relevance:
+                statistics.append((i, 1.0))
+        
+        bundles = {}
+        for key in keys:
+            bundle = []
+            if key in articles:
+                bundle.append(RAGEvidence(
+                    source=f"Constitution of India - Article {key}",
+                    page_number=None,
+                    quote=articles[key]["text"],
+                    relevance_score=1.0
+                ))
+            matches = tagged[key] + (statistics if key == "356" else [])
             
-            with open(self.data_dir / "kovind_report_excerpts.json", "r") as f:
-                self.kovind_data = json.load(f)
-        except Exception as e:
-            print(f"Error loading RAG documents: {e}")
-            self.constitution_data = {"articles": {}}
-            self.kovind_data = {"excerpts": []}
+            # cluster representative -> (first excerpt index, best score, pages)
+            collapsed: Dict[int, Tuple[int, float, set]] = {}
+            for i, score in matches:
+                rep = int(kovind.clusters[i]) if i < len(kovind.clusters) else i
+                first, best, pages = collapsed.get(rep, (i, score, set()))
+                pages.add(excerpts[i]["page"])
+                collapsed[rep] = (first, max(best, score), pages)
+            for first, best, pages in collapsed.values():
+                bundle.append(RAGEvidence(
+                    source=f"Kovind Committee Report - Page {excerpts[first]['page']}",
+                    page_number=excerpts[first]["page"],
+                    quote=excerpts[first]["quote"],
+                    relevance_score=best,
+                    page_references=sorted(pages) if len(pages) > 1 else []
+                ))
+            bundles[key] = tuple(bundle)
+        return MappingProxyType(bundles)
+    
+    def load_ingested_indexes(self) -> List[Tuple[BM25Index, ChunkStore, Optional[DenseIndex]]]:
+        """Memory-map every ingested corpus under index_dir (nothing is re-parsed at startup)"""
+        ingested = []
+        for meta_path in self.ingested_meta_paths():
+            try:
+                index, store = load_index(meta_path.parent)
+                dense = DenseIndex.load(meta_path.parent) if (meta_path.parent / "embeddings.npy").exists() else None
+                ingested.append((index, store, dense))
+            except Exception as e:
+                print(f"Error loading ingested index {meta_path.parent.name}: {e}")
+        return ingested
+    
+    def search(self, query: str, k: int = 5, corpus: str = None, mode: str = "lexical") -> List[Dict]:
+        """
+        Free-text search over both corpora (or one, via corpus="constitution"/"kovind"),
+        including any ingested full-length texts. mode is "lexical" (BM25), "dense"
+        (hashed TF-IDF cosine) or "hybrid". Cosines are compared in the curated
+        corpus's embedding space and BM25 by the best hit across sources, so
+        ingested chunks rank alongside curated excerpts. Relevance scores are
+        normalized so the best match is 1.0.
+        """
+        return self.search_many([query], k=k, corpus=corpus, mode=mode)[0]
+    
+    def search_many(self, queries: List[str], k: int = 5, corpus: str = None, mode: str = "lexical") -> List[List[Dict]]:
+        """Batched search: dense scoring runs one matrix product per source for all queries"""
+        snapshot = self.snapshot
+        curated = snapshot.curated
+        # (BM25 index, dense index or None, document mask, doc_id -> evidence) per searchable source
+        sources = [(
+            curated.index,
+            curated.dense if mode != "lexical" else None,
+            curated.mask(Filters(corpus=corpus)),
+            self._collection_chunk(curated)
+        )]
+        sources += [
+            (index, dense, None, self._ingested_chunk(store)) for index, store, dense in snapshot.ingested
+            if not corpus or store.meta["corpus"] == corpus
+        ]
+        
+        # Per query and source: (doc_id, cosine, BM25) candidates, ranked within the source
+        fetch = k * 2  # Over-fetch so k results remain after near-duplicates collapse
+        candidates = [
+            self._rank(queries, fetch, index, dense, allowed, mode)
+            for index, dense, allowed, _ in sources
+        ]
+        if mode != "lexical":
+            self._rescore_cosines(queries, curated.dense, sources, candidates)
+        
+        # Per query: (score, position in sources, doc_id)
+        hits: List[List[Tuple[float, int, int]]] = [[] for _ in queries]
+        for q, query_hits in enumerate(hits):
+            ranked = [(source, hit) for source, per_query in enumerate(candidates) for hit in per_query[q]]
+            if mode == "lexical":
+                query_hits.extend((bm25, source, doc_id) for source, (doc_id, _, bm25) in ranked)
+            elif mode == "dense":
+                query_hits.extend((cosine, source, doc_id) for source, (doc_id, cosine, _) in ranked)
+            else:
+                # BM25 is normalized by the best hit across every source, not per source
+                top_bm25 = max((bm25 for _, (_, _, bm25) in ranked), default=0.0) or 1.0
+                query_hits.extend(
+                    (self.hybrid_alpha * cosine + (1 - self.hybrid_alpha) * bm25 / top_bm25, source, doc_id)
+                    for source, (doc_id, cosine, bm25) in ranked
+                )
+        
+        results = []
+        for query_hits in hits:
+            query_hits = heapq.nlargest(fetch, query_hits)
+            if not query_hits or query_hits[0][0] <= 0:
+                results.append([])
+                continue
+            top_score = query_hits[0][0]
+            evidence = []
+            seen_clusters = set()
+            for score, source, doc_id in query_hits:
+                if score <= 0 or len(evidence) == k:
+                    break
+                chunk = sources[source][3](doc_id)
+                if (source, chunk["cluster"]) in seen_clusters:
+                    continue
+                seen_clusters.add((source, chunk["cluster"]))
+                evidence.append({
+                    "source": chunk["source"],
+                    "page_number": chunk["page_number"],
+                    "quote": chunk["quote"],
+                    "relevance_score": round(score / top_score, 3),
+                    "page_references": chunk["page_references"]
+                })
+            results.append(evidence)
+        return results
+    
+    def _rank(self, queries: List[str], k: int, index: BM25Index, dense: Optional[DenseIndex],
+              allowed: Optional[np.ndarray], mode: str) -> List[List[Tuple[int, float, float]]]:
+        """
+        Top-k (doc_id, cosine, BM25) per query from one source, ranked in that
+        source's own space; sources without embeddings fall back to BM25. A
+        component the mode does not use is 0.
+        """
+        if dense is None or mode == "lexical":
+            return [[(doc_id, 0.0, score) for doc_id, score in index.search(query, k=k, allowed=allowed)]
+                    for query in queries]
+        
+        vectors = dense.vectorizer.transform(queries)
+        if mode == "dense":
+            return [[(doc_id, score, 0.0) for doc_id, score in ranked]
+                    for ranked in dense.search_vectors(vectors, k=k, allowed=allowed)]
+        
+        # Hybrid: union of both candidate pools, max-normalized BM25 blended with cosine.
+        # Cosine is exact for every candidate; BM25 outside its pool counts as 0.
+        pool = k * 4
+        ranked = []
+        for vector, dense_hits, query in zip(vectors, dense.search_vectors(vectors, k=pool, allowed=allowed), queries):
+            lexical_hits = index.search(query, k=pool, allowed=allowed)
+            lexical = dict(lexical_hits)
+            candidates = np.array(sorted(lexical.keys() | {doc_id for doc_id, _ in dense_hits}), dtype=np.int64)
+            if len(candidates) == 0:
+                ranked.append([])
+                continue
+            top_bm25 = lexical_hits[0][1] if lexical_hits else 1.0
+            cosine = np.asarray(dense.embeddings[candidates]) @ vector
+            scores = [
+                (self.hybrid_alpha * float(c) + (1 - self.hybrid_alpha) * lexical.get(int(doc_id), 0.0) / top_bm25,
+                 int(doc_id), float(c))
+                for doc_id, c in zip(candidates, cosine)
+            ]
+            ranked.append([(doc_id, c, lexical.get(doc_id, 0.0)) for _, doc_id, c in heapq.nlargest(k, scores)])
+        return ranked
+    
+    def _rescore_cosines(self, queries: List[str], reference: DenseIndex, sources: List[Tuple],
+                         candidates: List[List[List[Tuple[int, float, float]]]]):
+        """
+        Replace ingested candidates' cosines with cosines in the curated corpus's
+        embedding space. Each ingested index fits its own vectorizer, so raw
+        cosines from different sources are not comparable; only the few
+        candidates per query are re-embedded.
+        """
+        vectors = reference.vectorizer.transform(queries)
+        for source in range(1, len(sources)):
+            chunk = sources[source][3]
+            per_query = candidates[source]
+            texts = [chunk(doc_id)["quote"] for ranked in per_query for doc_id, _, _ in ranked]
+            if not texts:
+                continue
+            embedded = iter(reference.vectorizer.transform(texts))
+            for q, ranked in enumerate(per_query):
+                per_query[q] = [(doc_id, float(next(embedded) @ vectors[q]), bm25) for doc_id, _, bm25 in ranked]
+    
+    def article_queries(self) -> Dict[str, str]:
+        """Evidence query per Constitution article, built from its text and ONOE context"""
+        return {
+            article_key: f"Article {article_key} {article['text']} {article.get('context', '')}"
+            for article_key, article in self.constitution_data.get("articles", {}).items()
+        }
+    
+    def search_articles(self, k: int = 5, mode: str = "hybrid") -> Dict[str, List[Dict]]:
+        """Ranked evidence for every article at once (one batched query)"""
+        queries = self.article_queries()
+        return dict(zip(queries.keys(), self.search_many(list(queries.values()), k=k, mode=mode)))
+    
+    def _collection_chunk(self, collection: Collection):
+        def chunk(doc_id: int) -> Dict:
+            document = collection.documents[doc_id]
+            rep = int(collection.clusters[doc_id])
+            members = collection.duplicates.get(rep, ())
+            pages = {collection.documents[m].page for m in members} - {None}
+            return {
+                "cluster": rep,
+                "source": document.source,
+                "page_number": document.page,
+                "quote": document.text,
+                "page_references": sorted(pages) if len(pages) > 1 else []
+            }
+        return chunk
+    
+    def _ingested_chunk(self, store: ChunkStore):
+        def chunk(doc_id: int) -> Dict:
+            text = store.get(doc_id)
+            rep = store.cluster_of(doc_id)
+            pages = sorted(set(store.pages[store.duplicates(rep)].tolist()))
+            return {
+                "cluster": rep,
+                "source": f"{store.meta['title']} - Page {text['page']}",
+                "page_number": text["page"],
+                "quote": text["text"],
+                "page_references": pages if len(pages) > 1 else []
+            }
+        return chunk
     
     def query_constitution(self, article_number: int) -> Dict:
         """Query Constitution for specific article"""
         article_key = str(article_number)
-        if article_key in self.constitution_data.get("articles", {}):
-            article = self.constitution_data["articles"][article_key]
+        articles = self.constitution_data.get("articles", {})
+        if article_key in articles:
+            article = articles[article_key]
             return {
                 "source": f"Constitution of India - Article {article_number}",
                 "page_number": None,
@@ -43,17 +351,7 @@ class RAGSystem:
     def query_kovind_report(self, article_number: int) -> List[Dict]:
         """Query Kovind Report for relevant excerpts"""
         results = []
-        relevance_map = {
-            82: "article_82",
-            83: "articles_83_172",
-            85: "article_85",
-            172: "articles_83_172",
-            174: "article_174",
-            356: "article_356",
-            "82A": "article_82A"
-        }
-        
-        target_relevance = relevance_map.get(article_number, "")
+        target_relevance = KOVIND_RELEVANCE_TAGS.get(article_number, "")
         
         for excerpt in self.kovind_data.get("excerpts", []):
             if target_relevance in excerpt.get("relevance", ""):
@@ -77,10 +375,19 @@ class RAGSystem:
         
         return results
     
-    def query_documents(self, article_number: int, query: str = None) -> List[Dict]:
+    def article_evidence(self, article_number) -> Tuple[RAGEvidence, ...]:
+        """Precomputed evidence for an article (a dict lookup on the current snapshot)"""
+        bundle = self.snapshot.article_evidence.get(str(article_number))
+        if bundle is None:
+            # Unknown article: no bundle was precomputed, fall back to the full scan
+            return tuple(RAGEvidence(**ev) for ev in self.query_documents(article_number))
+        return bundle
+    
+    def query_documents(self, article_number: int, query: str = None, k: int = 5) -> List[Dict]:
         """
         Main query method - searches both Constitution and Kovind Report
-        Returns list of evidence with sources and quotes
+        Returns list of evidence with sources and quotes; a free-text query
+        appends the top-k BM25 matches not already in the article's evidence
         """
         evidence = []
         
@@ -93,6 +400,12 @@ class RAGSystem:
         kovind_results = self.query_kovind_report(article_number)
         evidence.extend(kovind_results)
         
+        if query:
+            seen = {(ev["source"], ev["quote"]) for ev in evidence}
+            for result in self.search(query, k=k):
+                if (result["source"], result["quote"]) not in seen:
+                    evidence.append(result)
+        
         return evidence
 
 # Singleton instance
@@ -2,69 +2,157 @@
 Feature 3: Precedent Analysis
 Analyzes relevant Supreme Court cases
 """
-import json
-from typing import List, Dict
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Optional, Tuple
 from pathlib import Path
+import os
+
+from models import PrecedentCase
+from retrieval.citation_graph import CitationGraph, RankedPrecedent
+from retrieval.document_store import Collection, document_store
+from retrieval.precedent_query import PrecedentPage, PrecedentQuery, PrecedentQueryEngine
+from retrieval.precedent_store import PrecedentStore
+
+# Cap on the summed impact of an article's precedents
+RISK_CAPS = {
+    356: 15.0,  # Article 356 has 3 major precedents, each worth 5 points
+    83: 6.0,    # Articles 83 and 172 have federalism concerns
+    172: 6.0
+}
+DEFAULT_RISK_CAP = 3.0
+# "impact": hand-set impact scores; "influence": each case's impact scaled by its citation influence
+PRECEDENT_RISK_MODES = ("impact", "influence")
+
+@dataclass(frozen=True)
+class PrecedentIndex:
+    """Per-article case lists and risk built from one collection; a reload swaps the whole index"""
+    collection: Collection
+    # article -> cases, highest impact first
+    cases: Mapping[int, Tuple[PrecedentCase, ...]]
+    # article -> capped precedent risk
+    risk: Mapping[int, float]
+    graph: CitationGraph
+    # Served by the bulk store when one is imported, else built over the curated collection
+    queries: PrecedentQueryEngine
+    bulk: Optional[PrecedentStore] = None
 
 class PrecedentAnalyzer:
     def __init__(self):
-        self.data_dir = Path(__file__).parent.parent / "data"
-        self.precedents_data = None
+        self.risk_mode = os.getenv("PRECEDENT_RISK_MODE", "impact")
+        if self.risk_mode not in PRECEDENT_RISK_MODES:
+            print(f"Unknown PRECEDENT_RISK_MODE {self.risk_mode!r}, using impact")
+            self.risk_mode = "impact"
+        # Bulk case-law store built offline by retrieval/precedent_store.py
+        self.store_dir = Path(os.getenv("PRECEDENT_STORE_DIR", Path(__file__).parent.parent / "data" / "precedent_store"))
+        self.index: Optional[PrecedentIndex] = None
         self.load_precedents()
     
+    @property
+    def precedents_data(self) -> Dict:
+        return self.index.collection.raw
+    
     def load_precedents(self):
-        """Load Supreme Court precedents database"""
+        """Load Supreme Court precedents database (shared with the document store)"""
+        self.index = self.build_index(document_store.collection("precedents"))
+    
+    def watched_files(self) -> List[Path]:
+        """precedents.json and the bulk store (the importer swaps in a finished store)"""
+        return [document_store.path("precedents"), self.store_dir / "meta.json"]
+    
+    def reload(self):
+        """Re-read precedents.json and the bulk store and swap them in; raises (keeping current data) if unreadable"""
+        self.index = self.build_index(document_store.reload("precedents"))
+    
+    def build_index(self, collection: Collection) -> PrecedentIndex:
+        """Impact-sorted immutable case list, capped risk and the citation graph for every article"""
+        graph = CitationGraph(collection)
+        weights = graph.influence if self.risk_mode == "influence" else None
+        # One shared immutable model per case, in corpus order
+        models = tuple(
+            PrecedentCase(
+                case_name=d.fields["case_name"],
+                year=d.fields["year"],
+                impact_score=d.fields["impact_score"],
+                relevance=d.fields["relevance"],
+                summary=d.fields.get("summary", "")
+            )
+            for d in collection.documents
+        )
+        cases = {}
+        risk = {}
+        for tag, doc_ids in collection.tags.items():
+            try:
+                article_number = int(tag)
+            except ValueError:
+                continue
+            # Tag postings are in corpus order, so ties keep file order as before
+            doc_ids = doc_ids.tolist()
+            cases[article_number] = tuple(sorted(
+                (models[doc_id] for doc_id in doc_ids),
+                key=lambda case: case.impact_score,
+                reverse=True
+            ))
+            # Sum impact scores (each case adds risk), capped per article
+            total_impact = sum(
+                models[doc_id].impact_score * (1.0 if weights is None else float(weights[doc_id]))
+                for doc_id in doc_ids
+            )
+            risk[article_number] = min(total_impact, RISK_CAPS.get(article_number, DEFAULT_RISK_CAP))
+        bulk = self.load_store()
+        return PrecedentIndex(
+            collection=collection,
+            cases=MappingProxyType(cases),
+            risk=MappingProxyType(risk),
+            graph=graph,
+            queries=bulk.query_engine() if bulk is not None
+            else PrecedentQueryEngine.from_cases(collection, models, overruled=graph.overruled),
+            bulk=bulk
+        )
+    
+    def load_store(self) -> Optional[PrecedentStore]:
+        """Memory-map the imported bulk store, if there is one (nothing is re-parsed)"""
+        if not (self.store_dir / "meta.json").exists():
+            return None
         try:
-            with open(self.data_dir / "precedents.json", "r") as f:
-                self.precedents_data = json.load(f)
+            return PrecedentStore(self.store_dir)
         except Exception as e:
-            print(f"Error loading precedents: {e}")
-            self.precedents_data = {"cases": []}
+            print(f"Error loading precedent store {self.store_dir}: {e}")
+            return None
     
-    def find_relevant_precedents(self, article_number: int) -> List[Dict]:
+    def find_relevant_precedents(self, article_number: int) -> Tuple[PrecedentCase, ...]:
         """
         Find Supreme Court cases relevant to the article
-        Returns list of precedent cases with impact scores
+        Returns precedent cases with impact scores, highest impact first
         """
-        relevant_cases = []
-        
-        for case in self.precedents_data.get("cases", []):
-            if article_number in case.get("relevant_articles", []):
-                relevant_cases.append({
-                    "case_name": case["case_name"],
-                    "year": case["year"],
-                    "impact_score": case["impact_score"],
-                    "relevance": case["relevance"],
-                    "summary": case.get("summary", "")
-                })
-        
-        # Sort by impact score (highest first)
-        relevant_cases.sort(key=lambda x: x["impact_score"], reverse=True)
-        
-        return relevant_cases
+        return self.index.cases.get(article_number, ())
     
     def calculate_precedent_risk(self, article_number: int) -> float:
         """
         Calculate risk contribution from precedents
         Higher impact scores = higher risk of constitutional challenge
         """
-        precedents = self.find_relevant_precedents(article_number)
-        
-        if not precedents:
-            return 0.0
-        
-        # Sum impact scores (each case adds risk)
-        total_impact = sum(case["impact_score"] for case in precedents)
-        
-        # Special weighting for Article 356 (critical)
-        if article_number == 356:
-            # Article 356 has 3 major precedents, each worth 5 points
-            return min(total_impact, 15.0)
-        elif article_number in [83, 172]:
-            # Articles 83 and 172 have federalism concerns
-            return min(total_impact, 6.0)
-        else:
-            return min(total_impact, 3.0)
+        return self.index.risk.get(article_number, 0.0)
+    
+    def query_precedents(self, query: PrecedentQuery) -> PrecedentPage:
+        """
+        Cases matching an article set (any/all), year range, impact range and
+        overruled filter, sorted by impact or year, one page at a time. Searches
+        the imported bulk store when there is one.
+        """
+        return self.index.queries.query(query)
+    
+    def reachable_precedents(self, article_number: int, hops: int = 2, k: int = 5) -> Tuple[RankedPrecedent, ...]:
+        """Most influential cases within `hops` citation hops of the article (precomputed)"""
+        return self.index.graph.top_reachable(article_number, hops, k)
+    
+    def article_exposure(self, article_number: int) -> float:
+        """Impact-weighted citation influence of the cases touching the article"""
+        return self.index.graph.exposure.get(article_number, 0.0)
+    
+    def citation_edge_provenance(self) -> Dict:
+        """Status and note describing where the citation links behind influence come from"""
+        return dict(self.index.graph.edge_provenance)
 
 # Singleton instance
 precedent_analyzer = PrecedentAnalyzer()
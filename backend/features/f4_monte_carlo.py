@@ -2,70 +2,313 @@
 Feature 4: Monte Carlo Confidence Simulation
 Runs probabilistic simulations to estimate risk with confidence intervals
 """
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
 import numpy as np
-from typing import Dict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from features.accumulators import RiskAccumulator
+from features.sampling import SAMPLING_STRATEGIES, Beta, Normal, PointSequence, Poisson, Uniform, uniforms
+
+DEFAULT_SEED = 42
+DEFAULT_SCENARIO = "baseline"
+Z_95 = 1.959964
+# Risk distribution chart: 10 bins over 0-100
+DISPLAY_BINS = 10
+DISPLAY_RANGE = (0.0, 100.0)
+
+# Random factors of each article's risk model, in the order they are drawn
+ARTICLE_FACTORS = {
+    # Article 356: High uncertainty due to President's Rule complexity
+    # court challenge probability, President's Rule cases (avg 1.7 per year), political support
+    356: (Uniform(0.70, 0.90), Poisson(1.7), Uniform(0.55, 0.75)),
+    # Article 83: Moderate uncertainty (co-terminus provision)
+    # court challenge probability, federalism concern (skewed toward higher concern)
+    83: (Uniform(0.50, 0.90), Beta(3, 2)),
+    # Article 172: Similar to 83 but with state autonomy emphasis
+    172: (Uniform(0.55, 0.85), Beta(3.5, 2)),
+}
+# Default simulation for other articles: normal uncertainty around the base risk
+DEFAULT_FACTORS = (Normal(0, 5),)
+
+def article_factors(article_number: int) -> Tuple:
+    return ARTICLE_FACTORS.get(article_number, DEFAULT_FACTORS)
+
+def scenario_key(scenario: str) -> int:
+    """Stable 64-bit key of a scenario name (Python's hash() is salted per process)"""
+    return int.from_bytes(hashlib.blake2b(scenario.encode("utf-8"), digest_size=8).digest(), "little")
+
+def article_key(article_number) -> int:
+    """Stable 64-bit key of an article identifier; inserted articles such as "82A" are not integers"""
+    return scenario_key(f"article:{article_number}")
+
+def run_seed_sequence(article_number, scenario: str, seed: int) -> np.random.SeedSequence:
+    """Root SeedSequence of one (article, scenario, seed) run"""
+    return np.random.SeedSequence(seed, spawn_key=(article_key(article_number), scenario_key(scenario)))
+
+def simulation_rngs(article_number: int, scenario: str = DEFAULT_SCENARIO,
+                    seed: int = DEFAULT_SEED) -> Tuple[np.random.Generator, np.random.Generator]:
+    """
+    Independent generators for the risk trials and the graph data of one
+    (article, scenario, seed) run. Nothing touches the global np.random state,
+    so concurrent runs neither reseed each other nor share a stream.
+    """
+    root = run_seed_sequence(article_number, scenario, seed)
+    trials_seq, graph_seq = root.spawn(2)
+    return np.random.default_rng(trials_seq), np.random.default_rng(graph_seq)
+
+def simulate_shard(article_number: int, shard_seq: np.random.SeedSequence, trials: int,
+                   strategy: str = "plain", chunk_trials: int = 1 << 16) -> RiskAccumulator:
+    """
+    One shard of a streamed run (a top-level function, so process pools can
+    pickle it): chunks of trials are folded into an accumulator and dropped.
+    Halton and Sobol chunks continue one sequence across the shard; Latin
+    hypercube and antithetic chunks are independent designs of chunk_trials
+    points each (an LHS shard is stratified per chunk, not as a whole).
+    """
+    rng = np.random.default_rng(shard_seq)
+    sequence = PointSequence(strategy, rng, len(article_factors(article_number))) if strategy in ("halton", "sobol") else None
+    accumulator = RiskAccumulator()
+    for start in range(0, trials, chunk_trials):
+        accumulator.update(monte_carlo_simulator.sample_risks(
+            article_number, rng, min(chunk_trials, trials - start), strategy, sequence
+        ))
+    return accumulator
+
+def quantile_half_width(samples: np.ndarray, q: float) -> float:
+    """
+    Half-width of the distribution-free 95% CI of quantile q: the order
+    statistics at ranks n*q -/+ 1.96*sqrt(n*q*(1-q)), found by partition (O(n))
+    """
+    n = len(samples)
+    spread = Z_95 * np.sqrt(n * q * (1 - q))
+    low = int(min(max(np.floor(n * q - spread), 0), n - 1))
+    high = int(min(max(np.ceil(n * q + spread), 0), n - 1))
+    ordered = np.partition(samples, (low, high))
+    return float(ordered[high] - ordered[low]) / 2
 
 class MonteCarloSimulator:
     def __init__(self):
         self.default_trials = 1000
+        # Article 82 scatter: points simulated, and at most this many returned for display
+        self.scatter_points = int(os.getenv("MONTE_CARLO_SCATTER_POINTS", "50"))
+        self.display_points = int(os.getenv("MONTE_CARLO_DISPLAY_POINTS", "50"))
+        # Adaptive runs: first (and smallest) batch, and the hard cap on trials
+        self.adaptive_batch = 1000
+        self.max_trials = 1_000_000
+        # Streamed runs: trials per shard (fixed, so results do not depend on the worker count),
+        # trials held in memory at once, and pool size
+        self.shard_trials = 1_000_000
+        self.chunk_trials = 1 << 16
+        self.workers = int(os.getenv("MONTE_CARLO_WORKERS", "0")) or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_workers = 0
+        self._pool_lock = threading.Lock()
     
-    def run_simulation(self, article_number: int, trials: int = None) -> Dict:
+    def run_simulation(self, article_number: int, trials: int = None,
+                       scenario: str = DEFAULT_SCENARIO, seed: Optional[int] = None,
+                       strategy: str = "plain") -> Dict:
         """
         Run Monte Carlo simulation for the article
         Varies: court challenge probability, state disruption, political support
         Returns: mean, std_dev, 95% confidence interval
+        The same (article, scenario, seed) always gives the same result, from any thread.
+        strategy is one of SAMPLING_STRATEGIES (plain pseudo-random draws by default).
+        Runs above shard_trials are streamed in constant memory (percentiles from
+        the quantile sketch), in this process.
         """
         if trials is None:
             trials = self.default_trials
+        if trials > self.shard_trials:
+            return self.run_parallel_simulation(article_number, trials, workers=1, scenario=scenario,
+                                                seed=seed, strategy=strategy)
         
-        np.random.seed(42)  # For reproducibility
+        rng, graph_rng = simulation_rngs(article_number, scenario, DEFAULT_SEED if seed is None else seed)
+        simulated_risks = self.sample_risks(article_number, rng, trials, strategy)
+        return self._summarize(article_number, simulated_risks, graph_rng)
+    
+    def run_adaptive_simulation(self, article_number: int, tolerance: float = 0.1,
+                                quantiles: Sequence[float] = (), quantile_tolerance: Optional[float] = None,
+                                time_budget_s: float = 1.0, scenario: str = DEFAULT_SCENARIO,
+                                seed: Optional[int] = None) -> Dict:
+        """
+        Draw batches of trials until the 95% CI half-width of the mean (and of
+        every requested quantile) is at most the tolerance, the time budget is
+        spent or max_trials is reached. Each batch is sized from the current
+        variance estimate (at most doubling the trials so far), so stable
+        articles stop after one batch. Same result shape as run_simulation, plus
+        "convergence" diagnostics; reproducible unless the time budget stops it.
+        """
+        if tolerance <= 0:
+            raise ValueError("tolerance must be positive")
+        if any(not 0 < q < 1 for q in quantiles):
+            raise ValueError("quantiles must be between 0 and 1")
+        quantile_tolerance = tolerance if quantile_tolerance is None else quantile_tolerance
         
-        # Define simulation parameters based on article
-        if article_number == 356:
-            # Article 356: High uncertainty due to President's Rule complexity
-            base_risk = 35.0
-            court_challenge_prob = np.random.uniform(0.70, 0.90, trials)
-            state_disruption = np.random.poisson(1.7, trials)  # Avg 1.7 President's Rule per year
-            political_support = np.random.uniform(0.55, 0.75, trials)
+        rng, graph_rng = simulation_rngs(article_number, scenario, DEFAULT_SEED if seed is None else seed)
+        started = time.perf_counter()
+        samples = np.empty(self.adaptive_batch)
+        n, mean, m2 = 0, 0.0, 0.0
+        history = []
+        batch = self.adaptive_batch
+        while True:
+            risks = self.sample_risks(article_number, rng, batch)
+            if n + batch > len(samples):
+                samples = np.concatenate([samples[:n], np.empty(max(n + batch, 2 * len(samples)) - n)])
+            samples[n:n + batch] = risks
+            # Chan et al. merge of the batch mean/M2, so the mean check is O(batch)
+            batch_mean = float(risks.mean())
+            delta = batch_mean - mean
+            m2 += float(((risks - batch_mean) ** 2).sum()) + delta ** 2 * n * batch / (n + batch)
+            n += batch
+            mean += delta * batch / n
             
+            mean_half_width = Z_95 * np.sqrt(m2 / max(n - 1, 1) / n)
+            quantile_half_widths = {q: quantile_half_width(samples[:n], q) for q in quantiles}
+            history.append({"trials": n, "mean_half_width": round(float(mean_half_width), 4)})
+            # Half-widths shrink as 1/sqrt(n): trials needed for the widest one to meet its tolerance
+            ratio = max([mean_half_width / tolerance] + [hw / quantile_tolerance for hw in quantile_half_widths.values()])
+            elapsed = time.perf_counter() - started
+            if ratio <= 1:
+                stop_reason = "tolerance"
+            elif elapsed >= time_budget_s:
+                stop_reason = "time_budget"
+            elif n >= self.max_trials:
+                stop_reason = "max_trials"
+            else:
+                needed = int(np.ceil(n * ratio ** 2)) - n
+                batch = int(min(max(needed, self.adaptive_batch), n, self.max_trials - n))
+                continue
+            break
+        
+        result = self._summarize(article_number, samples[:n], graph_rng)
+        result["convergence"] = {
+            "converged": stop_reason == "tolerance",
+            "stop_reason": stop_reason,
+            "tolerance": tolerance,
+            "mean_half_width": round(float(mean_half_width), 4),
+            "quantile_half_widths": {str(q): round(hw, 4) for q, hw in quantile_half_widths.items()},
+            "batches": len(history),
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "history": history
+        }
+        return result
+    
+    def run_parallel_simulation(self, article_number: int, trials: int, workers: Optional[int] = None,
+                                scenario: str = DEFAULT_SCENARIO, seed: Optional[int] = None,
+                                strategy: str = "plain") -> Dict:
+        """run_simulation for large trial counts, sharded across worker processes"""
+        runs = [(article_number, scenario)]
+        return self.run_scenario_grid(runs, trials, workers, seed, strategy)[(article_number, scenario)]
+    
+    def run_scenario_grid(self, runs: Sequence[Tuple[int, str]], trials: int, workers: Optional[int] = None,
+                          seed: Optional[int] = None, strategy: str = "plain") -> Dict[Tuple[int, str], Dict]:
+        """
+        Simulate `trials` trials for every (article, scenario) in `runs`. Trials
+        are split into shards of shard_trials, each drawn from its own
+        SeedSequence.spawn child of the run's trials stream and streamed through
+        a RiskAccumulator chunk by chunk, so memory does not grow with trials.
+        Workers return only accumulators, merged in shard order. The shard
+        layout depends on trials alone, so any worker count (1 runs inline)
+        gives identical results.
+        """
+        if trials < 1:
+            raise ValueError("trials must be positive")
+        if strategy not in SAMPLING_STRATEGIES:
+            raise ValueError(f"Unknown sampling strategy: {strategy}")
+        seed = DEFAULT_SEED if seed is None else seed
+        sizes = [self.shard_trials] * (trials // self.shard_trials)
+        if trials % self.shard_trials:
+            sizes.append(trials % self.shard_trials)
+        
+        tasks, graph_rngs = [], {}
+        for article_number, scenario in runs:
+            root = run_seed_sequence(article_number, scenario, seed)
+            trials_seq, graph_seq = root.spawn(2)
+            graph_rngs[(article_number, scenario)] = np.random.default_rng(graph_seq)
+            tasks += [(article_number, shard_seq, size, strategy, self.chunk_trials)
+                      for shard_seq, size in zip(trials_seq.spawn(len(sizes)), sizes)]
+        
+        workers = min(workers or self.workers, len(tasks))
+        if workers <= 1:
+            shards = [simulate_shard(*task) for task in tasks]
+        else:
+            pool = self._get_pool(workers)
+            shards = list(pool.map(simulate_shard, *zip(*tasks)))
+        
+        results = {}
+        for i, run in enumerate(graph_rngs):
+            accumulator = RiskAccumulator()
+            for shard in shards[i * len(sizes):(i + 1) * len(sizes)]:
+                accumulator.merge(shard)
+            moments = accumulator.moments
+            ci_95 = [accumulator.quantile(0.025), accumulator.quantile(0.975)]
+            histogram = accumulator.histogram.rebin(DISPLAY_BINS, DISPLAY_RANGE)
+            results[run] = {
+                "mean": round(moments.mean, 2),
+                "std_dev": round(moments.std_dev, 2),
+                "confidence_interval_95": [round(ci_95[0], 2), round(ci_95[1], 2)],
+                "trials": moments.n,
+                "risk_contribution": 0.0,
+                "graph_data": self._generate_graph_data(run[0], histogram, moments.n, graph_rngs[run], moments.mean, ci_95)
+            }
+        return results
+    
+    def _get_pool(self, workers: int) -> ProcessPoolExecutor:
+        """Process pool shared by parallel runs (spawned: forking a threaded server is unsafe)"""
+        with self._pool_lock:
+            if self._pool is None or self._pool_workers != workers:
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False)
+                self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+                self._pool_workers = workers
+            return self._pool
+    
+    def sample_risks(self, article_number: int, rng: np.random.Generator, trials: int,
+                     strategy: str = "plain", sequence: Optional[PointSequence] = None) -> np.ndarray:
+        """
+        Simulated risk scores for `trials` trials. "plain" draws every factor
+        from rng; the other strategies map one point set (see features/sampling.py)
+        through the factors' inverse CDFs. A Halton/Sobol `sequence` supplies the
+        next points of a run sampled in chunks.
+        """
+        factors = article_factors(article_number)
+        if strategy == "plain":
+            draws = [factor.sample(rng, trials) for factor in factors]
+        else:
+            points = sequence.take(trials) if sequence is not None else uniforms(strategy, rng, trials, len(factors))
+            draws = [factor.ppf(points[:, j]) for j, factor in enumerate(factors)]
+        return self._risk_model(article_number, *draws)
+    
+    def _risk_model(self, article_number: int, *factors: np.ndarray) -> np.ndarray:
+        """Risk score of every trial from its factor draws (ARTICLE_FACTORS order)"""
+        if article_number == 356:
+            court_challenge_prob, state_disruption, political_support = factors
             # Risk formula for 356
-            simulated_risks = (
-                base_risk + 
+            return (
+                35.0 +  # Base risk
                 court_challenge_prob * 40 +  # Court challenge impact
                 np.minimum(state_disruption * 3, 15) +  # State disruption capped
                 (1 - political_support) * 25  # Political opposition
             )
             
         elif article_number == 83:
-            # Article 83: Moderate uncertainty (co-terminus provision)
-            base_risk = 20.0
-            court_challenge_prob = np.random.uniform(0.50, 0.90, trials)
-            federalism_concern = np.random.beta(3, 2, trials)  # Skewed toward higher concern
-            
-            simulated_risks = (
-                base_risk +
-                court_challenge_prob * 25 +
-                federalism_concern * 20
-            )
+            court_challenge_prob, federalism_concern = factors
+            return 20.0 + court_challenge_prob * 25 + federalism_concern * 20
             
         elif article_number == 172:
-            # Article 172: Similar to 83 but with state autonomy emphasis
-            base_risk = 25.0
-            court_challenge_prob = np.random.uniform(0.55, 0.85, trials)
-            state_autonomy_concern = np.random.beta(3.5, 2, trials)
-            
-            simulated_risks = (
-                base_risk +
-                court_challenge_prob * 25 +
-                state_autonomy_concern * 22
-            )
+            court_challenge_prob, state_autonomy_concern = factors
+            return 25.0 + court_challenge_prob * 25 + state_autonomy_concern * 22
             
         else:
-            # Default simulation for other articles
-            base_risk = 15.0
-            uncertainty = np.random.normal(0, 5, trials)
-            simulated_risks = base_risk + uncertainty
-        
+            uncertainty, = factors
+            return 15.0 + uncertainty
+    
+    def _summarize(self, article_number: int, simulated_risks: np.ndarray, graph_rng: np.random.Generator) -> Dict:
         # Calculate statistics
         mean = np.mean(simulated_risks)
         std_dev = np.std(simulated_risks)
@@ -73,37 +316,41 @@ class MonteCarloSimulator:
             np.percentile(simulated_risks, 2.5),
             np.percentile(simulated_risks, 97.5)
         ]
-        
-        # Risk contribution is now purely informational (0.0 impact)
-        risk_contribution = 0.0
+        trials = len(simulated_risks)
         
         # Generate specific graph data based on article criteria
-        graph_data = self._generate_graph_data(article_number, simulated_risks, trials)
+        histogram = np.histogram(simulated_risks, bins=DISPLAY_BINS, range=DISPLAY_RANGE)
+        graph_data = self._generate_graph_data(article_number, histogram, trials, graph_rng, mean, ci_95)
         
         return {
             "mean": round(mean, 2),
             "std_dev": round(std_dev, 2),
             "confidence_interval_95": [round(ci_95[0], 2), round(ci_95[1], 2)],
             "trials": trials,
+            # Risk contribution is now purely informational (0.0 impact)
             "risk_contribution": 0.0,
             "graph_data": graph_data
         }
 
-    def _generate_graph_data(self, article_number: int, simulated_risks: np.ndarray, trials: int) -> Dict:
-        """Generate article-specific visualization data"""
+    def _generate_graph_data(self, article_number: int, histogram: Tuple[np.ndarray, np.ndarray], trials: int,
+                             rng: np.random.Generator, mean: float, ci_95: List[float]) -> Dict:
+        """
+        Generate article-specific visualization data from the run's statistics
+        (histogram is the DISPLAY_BINS histogram of the simulated risks)
+        """
         
         if article_number == 356:
             # Type: Distribution (Histogram)
             # Visualize the spread of risk outcomes
-            counts, bins = np.histogram(simulated_risks, bins=10, range=(0, 100))
+            counts, bins = histogram
             return {
                 "type": "distribution",
                 "title": "Risk Probability Distribution",
                 "x_label": "Risk Score",
                 "y_label": "Frequency",
                 "data": [
-                    {"range": f"{int(bins[i])}-{int(bins[i+1])}", "frequency": int(c)} 
-                    for i, c in enumerate(counts)
+                    {"range": f"{int(low)}-{int(high)}", "frequency": c}
+                    for low, high, c in zip(bins[:-1], bins[1:], counts.tolist())
                 ]
             }
             
@@ -112,56 +359,51 @@ class MonteCarloSimulator:
             # Visualize stability/survival probability over 5 years
             years = [2029, 2030, 2031, 2032, 2033]
             decay_rate = 0.05 if article_number == 83 else 0.08 # State assemblies are more volatile
-            stability = []
-            current_prob = 1.0
-            
-            for year in years:
-                # Slight randomness in decay
-                decay = np.random.normal(decay_rate, 0.01)
-                current_prob *= (1 - max(0, decay))
-                stability.append({
-                    "year": year, 
-                    "stability_prob": round(current_prob * 100, 1)
-                })
+            # Slight randomness in each year's decay, compounded
+            decays = np.maximum(rng.normal(decay_rate, 0.01, len(years)), 0)
+            stability = np.round(np.cumprod(1 - decays) * 100, 1)
                 
             return {
                 "type": "timeline",
                 "title": "Projected Stability over 5 Years",
                 "x_label": "Year",
                 "y_label": "Stability Probability (%)",
-                "data": stability
+                "data": [
+                    {"year": year, "stability_prob": prob}
+                    for year, prob in zip(years, stability.tolist())
+                ]
             }
             
         elif article_number == 82:
             # Type: Scatter
             # Visualize Population Variance vs Seat Impact
-            scatter_data = []
-            for _ in range(50): # 50 points
-                pop_var = np.random.uniform(-10, 10)
-                seat_impact = pop_var * 1.5 + np.random.normal(0, 2)
-                scatter_data.append({
-                    "x": round(pop_var, 2),
-                    "y": round(seat_impact, 2)
-                })
+            n_points = max(self.scatter_points, 1)
+            pop_var = rng.uniform(-10, 10, n_points)
+            seat_impact = pop_var * 1.5 + rng.normal(0, 2, n_points)
+            # Points are i.i.d., so an even stride is an unbiased sample for display
+            shown = np.linspace(0, n_points - 1, min(n_points, max(self.display_points, 1))).astype(np.int64)
                 
             return {
                 "type": "scatter",
                 "title": "Population Change vs Seat Reallocation",
                 "x_label": "Population Variance (%)",
                 "y_label": "Seat Impact",
-                "data": scatter_data
+                "simulated_points": n_points,
+                "data": [
+                    {"x": x, "y": y}
+                    for x, y in zip(np.round(pop_var[shown], 2).tolist(), np.round(seat_impact[shown], 2).tolist())
+                ]
             }
             
         else:
             # Default: Bar chart of Confidence Interval
-            mean = np.mean(simulated_risks)
             return {
                 "type": "bar",
                 "title": "Risk Confidence Interval",
                 "data": [
-                    {"label": "Lower 95%", "value": round(np.percentile(simulated_risks, 2.5), 2)},
+                    {"label": "Lower 95%", "value": round(ci_95[0], 2)},
                     {"label": "Mean", "value": round(mean, 2)},
-                    {"label": "Upper 95%", "value": round(np.percentile(simulated_risks, 97.5), 2)}
+                    {"label": "Upper 95%", "value": round(ci_95[1], 2)}
                 ]
             }
 
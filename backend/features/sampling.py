@@ -0,0 +1,217 @@
+"""
+Sampling Strategies for Monte Carlo Simulation
+Unit-cube point sets (antithetic pairs, Latin hypercube, randomized Halton and
+Sobol sequences) and the inverse CDFs that turn them into the uniform,
+Poisson, beta and normal factors of the article risk models. Implemented with
+NumPy alone; every randomized point set is driven by the caller's Generator,
+so results stay reproducible per seed.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+import math
+
+import numpy as np
+
+SAMPLING_STRATEGIES = ("plain", "antithetic", "lhs", "halton", "sobol")
+
+HALTON_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+SOBOL_BITS = 32
+# Joe & Kuo (2008) primitive polynomials and initial direction numbers for dimensions 2..10,
+# as (degree s, coefficients a, initial m_1..m_s); dimension 1 is the van der Corput sequence
+SOBOL_PARAMETERS = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+)
+# Keeps inverse CDFs finite at the ends of the unit interval
+UNIT_EPSILON = 1e-12
+
+def uniforms(strategy: str, rng: np.random.Generator, n: int, d: int) -> np.ndarray:
+    """(n, d) points in [0, 1) for a sampling strategy other than "plain" (which draws each factor directly)"""
+    if strategy == "antithetic":
+        # Pairs (u, 1 - u): monotone risk models get negatively correlated halves
+        half = rng.random(((n + 1) // 2, d))
+        return np.concatenate([half, 1 - half])[:n]
+    if strategy == "lhs":
+        # One point in each of the n equal strata of every dimension, strata paired at random
+        strata = rng.permuted(np.tile(np.arange(n), (d, 1)), axis=1).T
+        return (strata + rng.random((n, d))) / n
+    if strategy == "halton":
+        return halton(n, d, rng)
+    if strategy == "sobol":
+        return sobol(n, d, rng)
+    raise ValueError(f"Unknown sampling strategy: {strategy}")
+
+def halton(n: int, d: int, rng: np.random.Generator, start: int = 0,
+           shift: Optional[np.ndarray] = None) -> np.ndarray:
+    """Halton points start+1..start+n randomized by one Cranley-Patterson shift per dimension"""
+    if d > len(HALTON_PRIMES):
+        raise ValueError(f"Halton sampling supports at most {len(HALTON_PRIMES)} dimensions")
+    points = np.empty((n, d))
+    for j, base in enumerate(HALTON_PRIMES[:d]):
+        # Radical inverse of the indices, one digit of every index per pass
+        indices = np.arange(start + 1, start + n + 1)
+        value = np.zeros(n)
+        scale = 1.0 / base
+        while indices.any():
+            value += scale * (indices % base)
+            indices //= base
+            scale /= base
+        points[:, j] = value
+    return (points + (rng.random(d) if shift is None else shift)) % 1.0
+
+@lru_cache(maxsize=None)
+def sobol_directions(d: int) -> np.ndarray:
+    """(d, SOBOL_BITS) direction numbers, scaled to SOBOL_BITS-bit integers"""
+    if d > len(SOBOL_PARAMETERS) + 1:
+        raise ValueError(f"Sobol sampling supports at most {len(SOBOL_PARAMETERS) + 1} dimensions")
+    directions = np.zeros((d, SOBOL_BITS), dtype=np.uint64)
+    directions[0] = [1 << (SOBOL_BITS - 1 - k) for k in range(SOBOL_BITS)]
+    for j, (s, a, m) in enumerate(SOBOL_PARAMETERS[:d - 1], start=1):
+        v = [m[k] << (SOBOL_BITS - 1 - k) for k in range(s)]
+        for k in range(s, SOBOL_BITS):
+            value = v[k - s] ^ (v[k - s] >> s)
+            for i in range(1, s):
+                if (a >> (s - 1 - i)) & 1:
+                    value ^= v[k - i]
+            v.append(value)
+        directions[j] = v
+    return directions
+
+def sobol(n: int, d: int, rng: np.random.Generator, start: int = 0,
+          shift: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Sobol points start..start+n-1 (Gray-code order) with a random digital shift,
+    which keeps their net structure
+    """
+    if start + n > 1 << SOBOL_BITS:
+        raise ValueError(f"Sobol sampling supports at most 2^{SOBOL_BITS} points")
+    directions = sobol_directions(d)
+    index = np.arange(start, start + n, dtype=np.uint64)
+    gray = index ^ (index >> np.uint64(1))
+    points = np.zeros((n, d), dtype=np.uint64)
+    # Gray codes of indices below 2^m use only the lowest m bits
+    for k in range(max(start + n - 1, 1).bit_length()):
+        bit = (gray >> np.uint64(k)) & np.uint64(1)
+        points ^= bit[:, None] * directions[:, k]
+    if shift is None:
+        shift = rng.integers(0, 1 << SOBOL_BITS, d, dtype=np.uint64)
+    return (points ^ shift).astype(np.float64) / float(1 << SOBOL_BITS)
+
+class PointSequence:
+    """
+    Consecutive blocks of one randomized Halton or Sobol sequence: the shift is
+    drawn once and each take() continues where the last one stopped, so a run
+    sampled chunk by chunk uses the same points as one sampled at once.
+    """
+
+    def __init__(self, strategy: str, rng: np.random.Generator, d: int):
+        if strategy not in ("halton", "sobol"):
+            raise ValueError(f"{strategy} points do not form a continuing sequence")
+        self.strategy = strategy
+        self.rng = rng
+        self.d = d
+        self.position = 0
+        # Drawn exactly as a one-shot halton()/sobol() call would draw it
+        self.shift = rng.random(d) if strategy == "halton" else rng.integers(0, 1 << SOBOL_BITS, d, dtype=np.uint64)
+
+    def take(self, n: int) -> np.ndarray:
+        generate = halton if self.strategy == "halton" else sobol
+        points = generate(n, self.d, self.rng, start=self.position, shift=self.shift)
+        self.position += n
+        return points
+
+# Acklam's rational approximation to the normal quantile (relative error below 1.2e-9)
+_NORMAL_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+             1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_NORMAL_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+             6.680131188771972e+01, -1.328068155288572e+01)
+_NORMAL_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+             -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_NORMAL_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00)
+_NORMAL_TAIL = 0.02425
+
+def normal_ppf(u: np.ndarray) -> np.ndarray:
+    """Standard normal quantile function"""
+    u = np.clip(u, UNIT_EPSILON, 1 - UNIT_EPSILON)
+    z = np.empty_like(u)
+    central = (u >= _NORMAL_TAIL) & (u <= 1 - _NORMAL_TAIL)
+    q = u[central] - 0.5
+    r = q * q
+    z[central] = q * np.polyval(_NORMAL_A, r) / np.polyval(_NORMAL_B + (1.0,), r)
+    lower = u < _NORMAL_TAIL
+    q = np.sqrt(-2 * np.log(u[lower]))
+    z[lower] = np.polyval(_NORMAL_C, q) / np.polyval(_NORMAL_D + (1.0,), q)
+    upper = u > 1 - _NORMAL_TAIL
+    q = np.sqrt(-2 * np.log1p(-u[upper]))
+    z[upper] = -np.polyval(_NORMAL_C, q) / np.polyval(_NORMAL_D + (1.0,), q)
+    return z
+
+@lru_cache(maxsize=None)
+def _beta_table(a: float, b: float, points: int = 1 << 14) -> Tuple[np.ndarray, np.ndarray]:
+    """CDF of Beta(a, b) on an even grid (midpoint rule, so unbounded densities at 0 or 1 are fine)"""
+    edges = np.linspace(0.0, 1.0, points + 1)
+    mid = (edges[:-1] + edges[1:]) / 2
+    density = np.exp((a - 1) * np.log(mid) + (b - 1) * np.log1p(-mid))
+    cdf = np.concatenate([[0.0], np.cumsum(density)])
+    return cdf / cdf[-1], edges
+
+@lru_cache(maxsize=None)
+def _poisson_cdf(lam: float) -> np.ndarray:
+    """Poisson CDF at 0, 1, ... up to where the remaining tail is negligible"""
+    pmf = [math.exp(-lam)]
+    while sum(pmf) < 1 - 1e-15 and len(pmf) < 10 * lam + 50:
+        pmf.append(pmf[-1] * lam / len(pmf))
+    return np.cumsum(pmf)
+
+@dataclass(frozen=True)
+class Uniform:
+    low: float
+    high: float
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return rng.uniform(self.low, self.high, n)
+
+    def ppf(self, u: np.ndarray) -> np.ndarray:
+        return self.low + (self.high - self.low) * u
+
+@dataclass(frozen=True)
+class Poisson:
+    lam: float
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return rng.poisson(self.lam, n)
+
+    def ppf(self, u: np.ndarray) -> np.ndarray:
+        # Smallest k with CDF(k) > u
+        return np.searchsorted(_poisson_cdf(self.lam), u, side="right")
+
+@dataclass(frozen=True)
+class Beta:
+    a: float
+    b: float
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return rng.beta(self.a, self.b, n)
+
+    def ppf(self, u: np.ndarray) -> np.ndarray:
+        cdf, edges = _beta_table(self.a, self.b)
+        return np.interp(u, cdf, edges)
+
+@dataclass(frozen=True)
+class Normal:
+    mu: float
+    sigma: float
+
+    def sample(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        return rng.normal(self.mu, self.sigma, n)
+
+    def ppf(self, u: np.ndarray) -> np.ndarray:
+        return self.mu + self.sigma * normal_ppf(u)
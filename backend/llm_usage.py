@@ -0,0 +1,201 @@
+"""
+LLM Usage Accounting
+Records prompt/completion tokens, latency, model and fallback status for every
+LLM call made by the debate agent (F1) and the bottleneck explorer (admin F5).
+Calls are rolled up per node, per article and per API request, and appended to
+a local JSONL log for quota sizing.
+"""
+from langchain_core.callbacks import BaseCallbackHandler
+
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import json
+import os
+import threading
+import time
+
+# Set per HTTP request by the middleware in main.py
+current_request_id: ContextVar[Optional[str]] = ContextVar("current_request_id", default=None)
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) when the endpoint reports no usage"""
+    if not text:
+        return 0
+    return max(1, round(len(text) / 4))
+
+def _usage_value(usage, name: str):
+    if isinstance(usage, dict):
+        return usage.get(name)
+    return getattr(usage, name, None)
+
+@dataclass
+class LLMCallRecord:
+    """One LLM call (or the fallback that replaced it)"""
+    node: str
+    model: str
+    article: Optional[int] = None
+    request_id: Optional[str] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    tokens_estimated: bool = False
+    latency_ms: float = 0.0
+    fallback: bool = False
+    fallback_reason: Optional[str] = None
+    timestamp: float = field(default_factory=time.time)
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+    _prompt_text: str = field(default="", repr=False)
+
+    @property
+    def handler(self) -> "UsageCallbackHandler":
+        """LangChain callback that fills in this record's token counts"""
+        return UsageCallbackHandler(self)
+
+    def mark_fallback(self, reason: str):
+        self.fallback = True
+        self.fallback_reason = reason
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("_started")
+        data.pop("_prompt_text")
+        data["total_tokens"] = self.prompt_tokens + self.completion_tokens
+        return data
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """Captures token usage reported by the endpoint, estimating it when missing"""
+
+    def __init__(self, call: LLMCallRecord):
+        self.call = call
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self.call._prompt_text = "\n".join(prompts)
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.call._prompt_text = "\n".join(
+            str(message.content) for batch in messages for message in batch
+        )
+
+    def on_llm_end(self, response, **kwargs):
+        prompt_tokens, completion_tokens = None, None
+
+        # Chat endpoints report usage in llm_output (TGI ChatCompletionOutputUsage or dict)
+        usage = (response.llm_output or {}).get("token_usage")
+        if usage is not None:
+            prompt_tokens = _usage_value(usage, "prompt_tokens")
+            completion_tokens = _usage_value(usage, "completion_tokens")
+
+        completion_text = ""
+        for generations in response.generations:
+            for generation in generations:
+                completion_text += generation.text
+                usage_metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage_metadata and prompt_tokens is None:
+                    prompt_tokens = usage_metadata.get("input_tokens")
+                    completion_tokens = usage_metadata.get("output_tokens")
+
+        if prompt_tokens is None or completion_tokens is None:
+            # Text-generation endpoints return no usage: estimate from the text
+            self.call.tokens_estimated = True
+            prompt_tokens = estimate_tokens(self.call._prompt_text)
+            completion_tokens = estimate_tokens(completion_text)
+
+        self.call.prompt_tokens += int(prompt_tokens)
+        self.call.completion_tokens += int(completion_tokens)
+
+class UsageTracker:
+    def __init__(self, max_records: int = 10000):
+        self.log_path = Path(os.getenv(
+            "LLM_USAGE_LOG",
+            Path(__file__).parent / "data" / "runtime" / "llm_usage.jsonl"
+        ))
+        # In-memory rollups cover the most recent calls; the JSONL log keeps full history
+        self.records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+
+    def start(self, node: str, model: str, article: Optional[int] = None) -> LLMCallRecord:
+        """Begin timing an LLM call for a debate node (or other LLM consumer)"""
+        return LLMCallRecord(node=node, model=model, article=article, request_id=current_request_id.get())
+
+    def finish(self, call: LLMCallRecord) -> LLMCallRecord:
+        """Stop the clock, store the record and append it to the usage log"""
+        call.latency_ms = round((time.perf_counter() - call._started) * 1000, 2)
+        line = json.dumps(call.to_dict())
+
+        with self._lock:
+            self.records.append(call)
+            try:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.log_path, "a") as f:
+                    f.write(line + "\n")
+            except Exception as e:
+                print(f"Error writing LLM usage log: {e}")
+
+        return call
+
+    def _snapshot(self) -> List[LLMCallRecord]:
+        with self._lock:
+            return list(self.records)
+
+    @staticmethod
+    def _rollup(records: List[LLMCallRecord]) -> Dict[str, Any]:
+        """Aggregate token and latency totals for a group of calls"""
+        latencies = [r.latency_ms for r in records]
+        prompt_tokens = sum(r.prompt_tokens for r in records)
+        completion_tokens = sum(r.completion_tokens for r in records)
+        return {
+            "calls": len(records),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "latency_ms_total": round(sum(latencies), 2),
+            "latency_ms_avg": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "latency_ms_max": max(latencies) if latencies else 0.0,
+            "fallbacks": sum(1 for r in records if r.fallback),
+            "models": sorted({r.model for r in records})
+        }
+
+    def _group(self, records: List[LLMCallRecord], key) -> Dict[str, Dict[str, Any]]:
+        groups: Dict[str, List[LLMCallRecord]] = {}
+        for record in records:
+            groups.setdefault(str(key(record)), []).append(record)
+        return {name: self._rollup(group) for name, group in groups.items()}
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals plus rollups by node, by article and by request"""
+        records = self._snapshot()
+        return {
+            "totals": self._rollup(records),
+            "by_node": self._group(records, lambda r: r.node),
+            # Admin calls (bottleneck analysis) are not tied to an article
+            "by_article": self._group(records, lambda r: r.article if r.article is not None else "admin"),
+            "by_request": self._group(records, lambda r: r.request_id or "background"),
+            "log_file": str(self.log_path)
+        }
+
+    def article_summary(self, article_number: int) -> Dict[str, Any]:
+        records = [r for r in self._snapshot() if r.article == article_number]
+        return {
+            "article": article_number,
+            "totals": self._rollup(records),
+            "by_node": self._group(records, lambda r: r.node)
+        }
+
+    def request_summary(self, request_id: str) -> Dict[str, Any]:
+        records = [r for r in self._snapshot() if r.request_id == request_id]
+        return {
+            "request_id": request_id,
+            "totals": self._rollup(records),
+            "by_node": self._group(records, lambda r: r.node),
+            "by_article": self._group(records, lambda r: r.article if r.article is not None else "admin"),
+            "calls": [r.to_dict() for r in records]
+        }
+
+    def recent_calls(self, limit: int = 100) -> List[Dict[str, Any]]:
+        records = self._snapshot()
+        return [r.to_dict() for r in records[-limit:]]
+
+# Singleton instance
+usage_tracker = UsageTracker()
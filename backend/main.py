@@ -2,15 +2,29 @@
 FastAPI Main Application
 Constitutional Engine for ONOE Analysis
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from routes import articles, analysis, admin
+from routes import articles, analysis, admin, usage
+from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from llm_usage import current_request_id
+from reloader import corpus_reloader
+from warmup import warmup_manager
+import uuid
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm article, dashboard and bottleneck caches in the background on startup"""
+    warmup_manager.start()
+    corpus_reloader.start()
+    yield
 
 # Create FastAPI app
 app = FastAPI(
     title="Constitutional Engine for ONOE",
     description="Advanced AI-powered analysis of One Nation One Election feasibility",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -20,12 +34,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
+@app.middleware("http")
+async def assign_request_id(request: Request, call_next):
+    """Tag each request so LLM usage can be rolled up per request"""
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:12]
+    token = current_request_id.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        current_request_id.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 # Include routers
 app.include_router(articles.router)
 app.include_router(analysis.router)
 app.include_router(admin.router)
+app.include_router(usage.router)
 
 @app.get("/")
 async def root():
@@ -37,14 +65,24 @@ async def root():
             "articles": "/api/articles",
             "analysis": "/api/analysis/overall",
             "priorities": "/api/analysis/priorities",
-            "critical_356": "/api/articles/356/critical"
+            "critical_356": "/api/articles/356/critical",
+            "llm_usage": "/api/usage"
         }
     }
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy"}
+    """Health check endpoint (liveness), with cache warm-up and corpus reload status"""
+    return {"status": "healthy", "warmup": warmup_manager.progress(), "corpus_reload": corpus_reloader.status()}
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 503 until the startup warm-up pass is over, then ready or degraded"""
+    progress = warmup_manager.progress()
+    if not progress["ready"]:
+        return JSONResponse(status_code=503, content={"status": "warming_up", "warmup": progress})
+    # Degraded: some caches failed to warm and are being retried; requests still fill them on demand
+    return {"status": "degraded" if progress["degraded"] else "ready", "warmup": progress}
 
 if __name__ == "__main__":
     import uvicorn
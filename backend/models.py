@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from enum import Enum
 
@@ -9,6 +9,9 @@ class ArticleStatus(str, Enum):
     CRITICAL_BLOCKER = "CRITICAL BLOCKER"
 
 class PrecedentCase(BaseModel):
+    # Immutable so the per-article case lists built at load can be shared across requests
+    model_config = ConfigDict(frozen=True)
+    
     case_name: str
     year: int
     impact_score: float
@@ -23,6 +26,10 @@ class DebateResult(BaseModel):
     debate_transcript: List[Dict[str, str]] = []
     mitigations: List[Dict[str, str]] = []
     court_challenge_probability: str = "0%"
+    vulnerability_ensemble: Optional[Dict[str, Any]] = None
+    completed_steps: List[str] = []
+    partial: bool = False
+    cache_match: Optional[Dict[str, Any]] = None
 
 
 class MonteCarloResult(BaseModel):
@@ -64,10 +71,15 @@ class RiskComponents(BaseModel):
     feature_8_priority: Optional[int] = None
 
 class RAGEvidence(BaseModel):
+    # Immutable so precomputed per-article bundles can be shared across requests
+    model_config = ConfigDict(frozen=True)
+    
     source: str
     page_number: Optional[int] = None
     quote: str
     relevance_score: float
+    # Pages of near-duplicate evidence collapsed into this item
+    page_references: List[int] = []
 
 class Article(BaseModel):
     article_number: int
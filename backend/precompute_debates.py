@@ -0,0 +1,170 @@
+"""
+Offline Batch Precompute for Amendment-Variant Debates
+Runs EnhancedDebateAgent debates for a file of (article, amendment_text, context)
+variants through a rate-limited worker pool and streams results to a JSONL store.
+Completed debates also land in the debate similarity cache; a running server
+picks them up on its next reload poll, so overnight runs replace live HF calls
+per click.
+
+Usage:
+    python precompute_debates.py variants.jsonl --workers 4 --rate 20
+    python precompute_debates.py variants.csv --out data/runtime/debates.jsonl --format parquet
+
+Input rows (JSONL objects or CSV columns): article, amendment_text, context (optional).
+Re-running with the same --out skips variants that already completed, and a
+debate interrupted mid-graph resumes from its last checkpointed node. Debates
+where any node fell back to canned text (no LLM reply) are recorded as
+"fallback" and retried on the next run.
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterator
+import argparse
+import csv
+import json
+import threading
+import time
+
+from features.f1_debate_agent import debate_agent, debate_thread_id
+
+DEFAULT_OUTPUT = Path(__file__).parent / "data" / "runtime" / "debate_precompute.jsonl"
+
+class RateLimiter:
+    """Spaces debate starts evenly across workers (rate = debates per minute, 0 = unlimited)"""
+
+    def __init__(self, rate_per_minute: float):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self.next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait_for = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if wait_for > 0:
+            time.sleep(wait_for)
+
+def read_variants(path: Path) -> Iterator[Dict]:
+    """Yield variants from a JSONL or CSV file, filling in article defaults"""
+    with open(path, "r", newline="") as f:
+        rows = csv.DictReader(f) if path.suffix.lower() == ".csv" else (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            article = int(row["article"])
+            yield {
+                "article": article,
+                "amendment_text": row.get("amendment_text") or debate_agent.amendments.get(article, "Constitutional amendment for ONOE"),
+                "context": row.get("context") or debate_agent.contexts.get(article, "ONOE implementation context")
+            }
+
+def completed_keys(output_path: Path) -> set:
+    """Keys of variants already finished in an earlier (possibly interrupted) run"""
+    keys = set()
+    if output_path.exists():
+        with open(output_path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Truncated last line from an interrupted run
+                if record.get("status") == "ok":
+                    keys.add(record["key"])
+    return keys
+
+def run_variant(variant: Dict, limiter: RateLimiter, ensemble_size: int) -> Dict:
+    limiter.acquire()
+    started = time.perf_counter()
+    record = dict(variant)
+    try:
+        result = debate_agent.simulate_debate(
+            variant["article"],
+            amendment_text=variant["amendment_text"],
+            context=variant["context"],
+            ensemble_size=ensemble_size
+        )
+        if result.get("partial"):
+            record["status"] = "partial"
+        elif result.get("fallback_nodes"):
+            record["status"] = "fallback"
+        else:
+            record["status"] = "ok"
+        record["result"] = result
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = str(e)
+    record["elapsed_s"] = round(time.perf_counter() - started, 2)
+    return record
+
+def write_parquet(jsonl_path: Path) -> Path:
+    """Convert the JSONL store to Parquet (requires pyarrow)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Parquet output requires pyarrow: pip install pyarrow")
+
+    # Later records supersede earlier failed attempts for the same variant
+    rows: Dict[str, Dict] = {}
+    with open(jsonl_path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Truncated last line from an interrupted run
+            result = record.get("result") or {}
+            rows[record["key"]] = {
+                "key": record["key"],
+                "article": record["article"],
+                "amendment_text": record["amendment_text"],
+                "context": record["context"],
+                "status": record["status"],
+                "elapsed_s": record.get("elapsed_s"),
+                "vulnerability_score": result.get("vulnerability_score"),
+                "risk_contribution": result.get("risk_contribution"),
+                "result_json": json.dumps(result)
+            }
+    parquet_path = jsonl_path.with_suffix(".parquet")
+    pq.write_table(pa.Table.from_pylist(list(rows.values())), parquet_path)
+    return parquet_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute debates for amendment variants")
+    parser.add_argument("variants", type=Path, help="JSONL or CSV file of (article, amendment_text, context)")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUTPUT, help="JSONL results store (appended, resumable)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent debates")
+    parser.add_argument("--rate", type=float, default=30.0, help="Max debates started per minute (0 = unlimited)")
+    parser.add_argument("--ensemble-size", type=int, default=None, help="Vulnerability samples per debate")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl", help="Also write Parquet when done")
+    args = parser.parse_args()
+
+    done = completed_keys(args.out)
+    pending = []
+    for variant in read_variants(args.variants):
+        variant["key"] = debate_thread_id(variant["article"], variant["amendment_text"], variant["context"])
+        if variant["key"] not in done:
+            pending.append(variant)
+            done.add(variant["key"])  # Also de-duplicates repeated rows in the input
+
+    print(f"{len(pending)} variants to run ({len(done) - len(pending)} already complete)")
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    limiter = RateLimiter(args.rate)
+    counts = {"ok": 0, "partial": 0, "fallback": 0, "error": 0}
+    started = time.perf_counter()
+
+    with open(args.out, "a") as out, ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(run_variant, variant, limiter, args.ensemble_size) for variant in pending]
+        for i, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            out.write(json.dumps(record) + "\n")
+            out.flush()  # Every finished debate survives an interrupted run
+            counts[record["status"]] += 1
+            print(f"[{i}/{len(pending)}] Article {record['article']} {record['status']} in {record['elapsed_s']}s")
+
+    print(f"Done in {time.perf_counter() - started:.1f}s: {counts}")
+    if args.format == "parquet":
+        print(f"Parquet written to {write_parquet(args.out)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Corpus Hot Reload
+Polls the evidence and precedent data files, rebuilds the affected corpus in a
+background thread and swaps it in with a single reference assignment, so
+requests never take a lock. Only caches registered against a changed file are
+refreshed; every other warm cache survives.
+"""
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import os
+import threading
+import time
+
+from admin_features.f2_supply_chain import supply_chain_rag
+from features.debate_cache import debate_cache
+from features.f2_rag_system import rag_system
+from features.f3_precedent_analysis import precedent_analyzer
+from routes.admin import refresh_dashboard_cache
+from routes.articles import refresh_cache as refresh_articles
+
+# (mtime_ns, size) per file; a deleted file maps to None
+Signature = Dict[str, Optional[Tuple[int, int]]]
+
+def file_signature(files: List[Path]) -> Signature:
+    signature = {}
+    for path in files:
+        try:
+            stat = path.stat()
+            signature[str(path)] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature[str(path)] = None
+    return signature
+
+class CorpusReloader:
+    def __init__(self):
+        # Seconds between polls; 0 disables hot reload
+        self.interval = float(os.getenv("CORPUS_RELOAD_INTERVAL", "2"))
+        self.corpora: Dict[str, Tuple[Callable[[], List[Path]], Callable[[], None]]] = {}
+        # File name -> caches derived from it, as (cache name, refresh callable)
+        self.dependents: Dict[str, List[Tuple[str, Callable[[], object]]]] = {}
+        self._signatures: Dict[str, Signature] = {}
+        self._pending: Dict[str, Signature] = {}
+        self.history = deque(maxlen=50)
+        self._thread = None
+
+    def watch(self, name: str, files: Callable[[], List[Path]], reload: Callable[[], None]):
+        """Rebuild corpus `name` with `reload` whenever any of `files()` changes"""
+        self.corpora[name] = (files, reload)
+        self._signatures[name] = file_signature(files())
+
+    def register_cache(self, file_name: str, cache_name: str, refresh: Callable[[], object]):
+        """Refresh `cache_name` after a reload triggered by a change to `file_name`"""
+        self.dependents.setdefault(file_name, []).append((cache_name, refresh))
+
+    def start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="corpus-reloader", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Corpus reload check failed: {e}")
+
+    def check(self) -> List[str]:
+        """
+        Reload corpora whose files changed. A change is acted on once its signature
+        is stable across two polls, so a file still being written is not parsed.
+        Returns the names of reloaded corpora.
+        """
+        reloaded = []
+        for name, (files, reload) in self.corpora.items():
+            signature = file_signature(files())
+            if signature == self._signatures[name]:
+                self._pending.pop(name, None)
+                continue
+            if self._pending.get(name) != signature:
+                self._pending[name] = signature
+                continue
+
+            changed = sorted(
+                path for path in signature.keys() | self._signatures[name].keys()
+                if signature.get(path) != self._signatures[name].get(path)
+            )
+            # Commit the signature even on failure: a fixed file changes it again
+            self._signatures[name] = signature
+            self._pending.pop(name, None)
+            self._reload(name, reload, changed)
+            reloaded.append(name)
+        return reloaded
+
+    def _reload(self, name: str, reload: Callable[[], None], changed: List[str]):
+        started = time.perf_counter()
+        event = {"corpus": name, "files": [Path(p).name for p in changed], "at": time.time(),
+                 "status": "ok", "refreshed": [], "error": None}
+        try:
+            reload()
+        except Exception as e:
+            print(f"Reload of {name} failed, keeping the previous version: {e}")
+            event["status"] = "failed"
+            event["error"] = str(e)
+        else:
+            refreshes = {}
+            for file_name in event["files"]:
+                refreshes.update(self.dependents.get(file_name, []))
+            for cache_name, refresh in refreshes.items():
+                try:
+                    refresh()
+                    event["refreshed"].append(cache_name)
+                except Exception as e:
+                    print(f"Refreshing {cache_name} after {name} reload failed: {e}")
+        event["duration_s"] = round(time.perf_counter() - started, 2)
+        self.history.append(event)
+        print(f"Reloaded {name} ({', '.join(event['files'])}): {event['status']}")
+
+    def status(self) -> Dict:
+        return {
+            "enabled": self.interval > 0,
+            "interval_s": self.interval,
+            "corpora": list(self.corpora),
+            "recent_reloads": list(self.history)[-5:]
+        }
+
+# Singleton instance. Article risk reads Constitution text, Kovind excerpts and
+# precedents; ingested full-text indexes (meta.json) only feed live search. The
+# admin dashboard reads supply-chain facts (bottleneck results are keyed by the
+# resulting deficit, so they need no invalidation). The debate similarity index
+# is read incrementally, picking up debates appended by precompute_debates.py.
+corpus_reloader = CorpusReloader()
+corpus_reloader.watch("rag", rag_system.watched_files, rag_system.reload)
+corpus_reloader.watch("precedents", precedent_analyzer.watched_files, precedent_analyzer.reload)
+corpus_reloader.watch("supply_chain", supply_chain_rag.watched_files, supply_chain_rag.reload)
+corpus_reloader.watch("debate_cache", lambda: [debate_cache.index_path], debate_cache.refresh)
+for data_file in ("constitution_excerpts.json", "kovind_report_excerpts.json", "precedents.json"):
+    corpus_reloader.register_cache(data_file, "articles", refresh_articles)
+corpus_reloader.register_cache("supply_chain_documents.json", "admin_dashboard", refresh_dashboard_cache)
@@ -0,0 +1,112 @@
+"""
+Near-Duplicate Detection: MinHash Signatures with LSH Banding
+Clusters chunks whose word-shingle sets have high Jaccard similarity so that
+retrieval can collapse repeated statements into one representative with all of
+its page references. Signatures are computed one chunk at a time (streaming);
+LSH band keys propose candidate pairs by sorting, and each candidate is
+confirmed against the full signature, so cost grows with corpus size times a
+log factor and the signature matrix can stay on disk.
+"""
+import numpy as np
+from typing import Dict, Iterable, List, Tuple
+import zlib
+
+from retrieval.lexical import tokenize
+
+class MinHasher:
+    """
+    num_perm MinHash values per text over word 3-shingles, banded into
+    `bands` LSH keys. With 128 permutations in 32 bands of 4 rows, a pair at
+    0.6 Jaccard similarity shares a band with probability ~0.99; candidates are
+    then confirmed by signature agreement, which estimates the similarity.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 32, shingle_size: int = 3, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing: h(x) = ((a * x + b) mod 2^64) >> 32 with random 64-bit a (odd), b
+        self.a = rng.integers(1, 2 ** 64, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 2 ** 64, size=num_perm, dtype=np.uint64)
+        self.band_weights = rng.integers(1, 2 ** 63, size=self.rows, dtype=np.uint64) | np.uint64(1)
+
+    def shingles(self, text: str) -> np.ndarray:
+        tokens = tokenize(text)
+        n = self.shingle_size
+        grams = [" ".join(tokens[i:i + n]) for i in range(max(1, len(tokens) - n + 1))] if tokens else [""]
+        return np.unique(np.array([zlib.crc32(g.encode("utf-8")) for g in grams], dtype=np.uint64))
+
+    def signature(self, text: str) -> np.ndarray:
+        hashed = (self.a[:, None] * self.shingles(text)[None, :] + self.b[:, None]) >> np.uint64(32)
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def band_hashes(self, signatures: np.ndarray) -> np.ndarray:
+        """(n, num_perm) signatures -> (n, bands) uint64 band keys"""
+        signatures = np.atleast_2d(signatures).astype(np.uint64)
+        banded = signatures.reshape(len(signatures), self.bands, self.rows)
+        keys = (banded * self.band_weights).sum(axis=2)
+        # Salt with the band number so equal rows in different bands do not collide
+        return keys ^ np.arange(self.bands, dtype=np.uint64)
+
+    def signatures(self, texts: Iterable[str]) -> np.ndarray:
+        signatures = [self.signature(text) for text in texts]
+        return np.stack(signatures) if signatures else np.zeros((0, self.num_perm), dtype=np.uint32)
+
+def cluster_band_hashes(band_hashes: np.ndarray, signatures: np.ndarray,
+                        threshold: float = 0.6) -> np.ndarray:
+    """
+    Representative (lowest doc id in its cluster) for every document. Documents
+    sharing a band key with an estimated Jaccard similarity of at least
+    `threshold` are merged transitively with union-find; only groups with more
+    than one member reach the Python loop.
+    """
+    n_docs = len(band_hashes)
+    parent = np.arange(n_docs)
+
+    def find(x: int) -> int:
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    for band in range(band_hashes.shape[1] if n_docs else 0):
+        keys = np.asarray(band_hashes[:, band])
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        sizes = np.diff(np.r_[starts, n_docs])
+        for start, size in zip(starts[sizes > 1], sizes[sizes > 1]):
+            members = np.sort(order[start:start + size])
+            # Confirm each candidate against the bucket's first member
+            agreement = (np.asarray(signatures[members[1:]]) == np.asarray(signatures[members[0]])).mean(axis=1)
+            confirmed = [int(members[0])] + members[1:][agreement >= threshold].tolist()
+            if len(confirmed) < 2:
+                continue
+            roots = {find(doc) for doc in confirmed}
+            leader = min(roots)
+            for root in roots:
+                parent[root] = leader
+
+    return np.array([find(doc) for doc in range(n_docs)], dtype=np.int32)
+
+def cluster_texts(texts: List[str], hasher: MinHasher = None, threshold: float = 0.6) -> np.ndarray:
+    hasher = hasher or MinHasher()
+    signatures = hasher.signatures(texts)
+    return cluster_band_hashes(hasher.band_hashes(signatures), signatures, threshold)
+
+def duplicate_groups(representatives: np.ndarray) -> Dict[int, Tuple[int, ...]]:
+    """representative -> all member doc ids, for clusters with more than one member"""
+    groups: Dict[int, List[int]] = {}
+    reps, counts = np.unique(representatives, return_counts=True)
+    for rep in reps[counts > 1]:
+        groups[int(rep)] = []
+    for doc_id, rep in enumerate(representatives.tolist()):
+        if rep in groups:
+            groups[rep].append(doc_id)
+    return {rep: tuple(members) for rep, members in groups.items()}
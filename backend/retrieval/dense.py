@@ -0,0 +1,207 @@
+"""
+Dense Retrieval: Hashed TF-IDF Embeddings with NumPy Top-k
+Embeds chunks locally (no network, no fitted vocabulary) as hashed TF-IDF
+vectors, optionally projected to a smaller dimension with a truncated SVD fitted
+on a sample. Embeddings are a float32 matrix stored as .npy and memory-mapped;
+queries are scored in batches with one matrix product per block of chunks and
+top-k selected with argpartition.
+"""
+import numpy as np
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+import json
+import zlib
+
+from retrieval.lexical import tokenize
+
+def top_right_singular_vectors(matrix: np.ndarray, dim: int, rng: np.random.Generator,
+                               oversample: int = 10, power_iterations: int = 4) -> np.ndarray:
+    """
+    (dim, n_features) leading right singular vectors. Small matrices take an exact
+    SVD; larger ones a randomized range finder (Halko, Martinsson & Tropp), which
+    costs a few products with a (n_features, dim + oversample) block instead of a
+    full decomposition of the sample.
+    """
+    rank = dim + oversample
+    if rank >= min(matrix.shape):
+        return np.linalg.svd(matrix, full_matrices=False)[2][:dim]
+    q, _ = np.linalg.qr(matrix @ rng.standard_normal((matrix.shape[1], rank), dtype=np.float32))
+    for _ in range(power_iterations):
+        q, _ = np.linalg.qr(matrix.T @ q)
+        q, _ = np.linalg.qr(matrix @ q)
+    _, _, vt = np.linalg.svd(q.T @ matrix, full_matrices=False)
+    return vt[:dim]
+
+class HashedTfidfVectorizer:
+    """Unigram + bigram feature hashing, sublinear tf, bucket-level idf, optional SVD projection"""
+
+    def __init__(self, n_features: int = 2 ** 12, idf: Optional[np.ndarray] = None,
+                 components: Optional[np.ndarray] = None):
+        self.n_features = n_features
+        self.idf = idf if idf is not None else np.ones(n_features, dtype=np.float32)
+        # (n_features, dim) projection, or None to keep the hashed space
+        self.components = components
+
+    @property
+    def dim(self) -> int:
+        return self.n_features if self.components is None else self.components.shape[1]
+
+    def _buckets(self, text: str) -> np.ndarray:
+        tokens = tokenize(text)
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return np.array([zlib.crc32(f.encode("utf-8")) % self.n_features for f in features], dtype=np.int64)
+
+    def _hashed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        for row, text in enumerate(texts):
+            buckets, counts = np.unique(self._buckets(text), return_counts=True)
+            matrix[row, buckets] = 1.0 + np.log(counts)
+        return matrix
+
+    def fit(self, texts: Iterable[str], dim: Optional[int] = None, sample_size: int = 4096,
+            seed: int = 0) -> "HashedTfidfVectorizer":
+        """Document frequencies from every text; SVD from a uniform sample (reservoir)"""
+        rng = np.random.default_rng(seed)
+        dfs = np.zeros(self.n_features, dtype=np.int64)
+        sample: List[str] = []
+        n_docs = 0
+        for text in texts:
+            dfs[np.unique(self._buckets(text))] += 1
+            if len(sample) < sample_size:
+                sample.append(text)
+            else:
+                j = rng.integers(0, n_docs + 1)
+                if j < sample_size:
+                    sample[j] = text
+            n_docs += 1
+
+        self.idf = (np.log((1 + n_docs) / (1 + dfs)) + 1.0).astype(np.float32)
+        self.components = None
+        if dim and dim < self.n_features and sample:
+            hashed = self._hashed(sample) * self.idf
+            self.components = np.ascontiguousarray(top_right_singular_vectors(hashed, dim, rng).T, dtype=np.float32)
+        return self
+
+    def transform(self, texts: List[str]) -> np.ndarray:
+        """L2-normalized float32 embeddings, one row per text"""
+        matrix = self._hashed(texts) * self.idf
+        if self.components is not None:
+            matrix = matrix @ self.components
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+class DenseIndex:
+    """Cosine top-k over a (possibly memory-mapped) float32 embedding matrix"""
+
+    def __init__(self, embeddings: np.ndarray, vectorizer: HashedTfidfVectorizer, block_rows: int = 1 << 16):
+        self.embeddings = embeddings
+        self.vectorizer = vectorizer
+        self.block_rows = block_rows
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.embeddings)
+
+    @classmethod
+    def build(cls, texts: List[str], dim: Optional[int] = None, n_features: int = 2 ** 12) -> "DenseIndex":
+        vectorizer = HashedTfidfVectorizer(n_features).fit(texts, dim=dim)
+        return cls(vectorizer.transform(texts), vectorizer)
+
+    @classmethod
+    def build_to_disk(cls, texts, n_docs: int, out_dir: Path, dim: Optional[int] = 256,
+                      n_features: int = 2 ** 12, batch_size: int = 1024) -> "DenseIndex":
+        """
+        Two streaming passes over `texts` (a zero-argument callable returning an
+        iterator): one to fit idf/SVD, one to write embeddings.npy in batches.
+        """
+        out_dir = Path(out_dir)
+        vectorizer = HashedTfidfVectorizer(n_features).fit(texts(), dim=dim)
+        embeddings = np.lib.format.open_memmap(out_dir / "embeddings.npy", mode="w+", dtype=np.float32,
+                                               shape=(n_docs, vectorizer.dim))
+        batch: List[str] = []
+        row = 0
+        for text in texts():
+            batch.append(text)
+            if len(batch) == batch_size:
+                embeddings[row:row + len(batch)] = vectorizer.transform(batch)
+                row += len(batch)
+                batch = []
+        if batch:
+            embeddings[row:row + len(batch)] = vectorizer.transform(batch)
+        embeddings.flush()
+        del embeddings
+
+        index = cls(np.load(out_dir / "embeddings.npy", mmap_mode="r"), vectorizer)
+        index.save_vectorizer(out_dir)
+        return index
+
+    def save(self, out_dir: Path):
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        np.save(out_dir / "embeddings.npy", np.asarray(self.embeddings, dtype=np.float32))
+        self.save_vectorizer(out_dir)
+
+    def save_vectorizer(self, out_dir: Path):
+        np.save(Path(out_dir) / "dense_idf.npy", self.vectorizer.idf)
+        if self.vectorizer.components is not None:
+            np.save(Path(out_dir) / "dense_components.npy", self.vectorizer.components)
+        with open(Path(out_dir) / "dense_meta.json", "w") as f:
+            json.dump({"n_features": self.vectorizer.n_features, "dim": self.vectorizer.dim,
+                       "n_docs": self.n_docs}, f, indent=2)
+
+    @classmethod
+    def load(cls, index_dir: Path) -> "DenseIndex":
+        """Open a saved index; the embedding matrix is memory-mapped, not read"""
+        index_dir = Path(index_dir)
+        with open(index_dir / "dense_meta.json") as f:
+            meta = json.load(f)
+        components_path = index_dir / "dense_components.npy"
+        vectorizer = HashedTfidfVectorizer(
+            meta["n_features"],
+            idf=np.load(index_dir / "dense_idf.npy"),
+            components=np.load(components_path) if components_path.exists() else None
+        )
+        return cls(np.load(index_dir / "embeddings.npy", mmap_mode="r"), vectorizer)
+
+    def search(self, query: str, k: int = 10, allowed: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        return self.search_batch([query], k, allowed)[0]
+
+    def search_batch(self, queries: List[str], k: int = 10,
+                     allowed: Optional[np.ndarray] = None) -> List[List[Tuple[int, float]]]:
+        """Top-k (doc_id, cosine) per query, best first, from one matrix product per block"""
+        return self.search_vectors(self.vectorizer.transform(queries), k, allowed)
+
+    def search_vectors(self, vectors: np.ndarray, k: int = 10,
+                       allowed: Optional[np.ndarray] = None) -> List[List[Tuple[int, float]]]:
+        n_queries = len(vectors)
+        if k <= 0 or self.n_docs == 0:
+            return [[] for _ in range(n_queries)]
+
+        # Running top-k per query, merged block by block so memory stays at
+        # n_queries x block_rows regardless of corpus size
+        best_docs = np.zeros((n_queries, 0), dtype=np.int64)
+        best_scores = np.zeros((n_queries, 0), dtype=np.float32)
+        for start in range(0, self.n_docs, self.block_rows):
+            block = self.embeddings[start:start + self.block_rows]
+            scores = vectors @ block.T
+            if allowed is not None:
+                scores[:, ~allowed[start:start + len(block)]] = -np.inf
+            if scores.shape[1] > k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, top, axis=1)
+            else:
+                top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+            best_docs = np.concatenate([best_docs, top + start], axis=1)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_docs = np.take_along_axis(best_docs, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best_docs = np.take_along_axis(best_docs, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        return [
+            [(int(d), float(s)) for d, s in zip(docs, scores) if np.isfinite(s)]
+            for docs, scores in zip(best_docs, best_scores)
+        ]
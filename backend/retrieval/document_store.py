@@ -0,0 +1,281 @@
+"""
+Unified Document Store
+One ingestion path, index format and query cache for every local corpus: the
+Constitution excerpts, Kovind Report excerpts, Supreme Court precedents and the
+supply-chain evidence. Each corpus is loaded once into an immutable Collection
+(documents, BM25 index, year column, tag postings, near-duplicate clusters); features query it through
+the typed search API and a reload swaps the whole collection in one step.
+"""
+import numpy as np
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+import json
+import threading
+
+from retrieval.dedup import cluster_texts, duplicate_groups
+from retrieval.dense import DenseIndex
+from retrieval.lexical import BM25Index
+
+# Cached hit lists per collection
+SEARCH_CACHE_SIZE = 4096
+
+@dataclass(frozen=True)
+class Document:
+    doc_id: int
+    corpus: str
+    source: str
+    # Display text (quote, summary or content)
+    text: str
+    year: Optional[int] = None
+    page: Optional[int] = None
+    # Exact-match keys: article numbers, document types
+    tags: Tuple[str, ...] = ()
+    # The original record, read-only
+    fields: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+
+@dataclass(frozen=True)
+class Filters:
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    tag: Optional[str] = None
+    # Case-insensitive substring of Document.source
+    source: Optional[str] = None
+    # Component corpus, for collections that unite several
+    corpus: Optional[str] = None
+
+@dataclass(frozen=True)
+class Hit:
+    document: Document
+    # Raw BM25 score (0.0 for filter-only queries)
+    score: float
+
+class Collection:
+    """An immutable, indexed corpus; never mutated after construction"""
+
+    def __init__(self, name: str, raw: Dict, documents: Tuple[Document, ...],
+                 index_texts: Tuple[str, ...], generation: int):
+        self.name = name
+        self.raw = raw
+        self.generation = generation
+        self.documents = documents
+        self.index_texts = index_texts
+        self.index = BM25Index.build(self.index_texts)
+        self.years = np.array([d.year or 0 for d in self.documents], dtype=np.int32)
+
+        tags: Dict[str, List[int]] = {}
+        for document in self.documents:
+            for tag in document.tags:
+                tags.setdefault(tag, []).append(document.doc_id)
+        self.tags = {tag: np.array(ids, dtype=np.int32) for tag, ids in tags.items()}
+        # MinHash/LSH near-duplicate clusters over display text: representative
+        # doc id per document, and members of every multi-document cluster
+        self.clusters = cluster_texts([d.text for d in self.documents])
+        self.duplicates = duplicate_groups(self.clusters)
+        self._dense: Optional[DenseIndex] = None
+        # Per-collection hit cache: it is dropped with the collection when a reload swaps it out
+        self.search = lru_cache(maxsize=SEARCH_CACHE_SIZE)(self._search)
+
+    @classmethod
+    def from_records(cls, name: str, raw: Dict, records: List[Dict], generation: int) -> "Collection":
+        documents = tuple(
+            Document(
+                doc_id=doc_id,
+                corpus=name,
+                source=record["source"],
+                text=record["text"],
+                year=record.get("year"),
+                page=record.get("page"),
+                tags=tuple(str(tag) for tag in record.get("tags", ())),
+                fields=MappingProxyType(record.get("fields", {}))
+            )
+            for doc_id, record in enumerate(records)
+        )
+        index_texts = tuple(record.get("index_text", record["text"]) for record in records)
+        return cls(name, raw, documents, index_texts, generation)
+
+    @classmethod
+    def union(cls, name: str, collections: List["Collection"], generation: int) -> "Collection":
+        """One index over several corpora (shared BM25 statistics); documents keep their corpus"""
+        documents = tuple(
+            replace(document, doc_id=doc_id)
+            for doc_id, document in enumerate(d for c in collections for d in c.documents)
+        )
+        index_texts = tuple(text for c in collections for text in c.index_texts)
+        return cls(name, {c.name: c.raw for c in collections}, documents, index_texts, generation)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @property
+    def dense(self) -> DenseIndex:
+        """Dense embeddings, built on first use (a concurrent first build just does the work twice)"""
+        if self._dense is None:
+            self._dense = DenseIndex.build(list(self.index_texts))
+        return self._dense
+
+    def _search(self, query: str, k: Optional[int], filters: Filters) -> Tuple[Hit, ...]:
+        """Ranked BM25 hits within the filters; an empty query lists documents in corpus order"""
+        allowed = self.mask(filters)
+        if not query.strip():
+            ids = range(len(self)) if allowed is None else np.flatnonzero(allowed).tolist()
+            documents = [self.documents[i] for i in ids]
+            return tuple(Hit(d, 0.0) for d in (documents if k is None else documents[:k]))
+
+        hits = self.index.search(query, k=len(self) if k is None else k, allowed=allowed)
+        return tuple(Hit(self.documents[doc_id], score) for doc_id, score in hits)
+
+    def mask(self, filters: Filters) -> Optional[np.ndarray]:
+        """Boolean document mask for the filters, or None when nothing is filtered"""
+        if filters == Filters():
+            return None
+        allowed = np.ones(len(self.documents), dtype=bool)
+        if filters.year_from is not None:
+            allowed &= self.years >= filters.year_from
+        if filters.year_to is not None:
+            allowed &= self.years <= filters.year_to
+        if filters.tag is not None:
+            tagged = np.zeros(len(self.documents), dtype=bool)
+            tagged[self.tags.get(str(filters.tag), np.zeros(0, dtype=np.int32))] = True
+            allowed &= tagged
+        if filters.source:
+            needle = filters.source.lower()
+            allowed &= np.array([needle in d.source.lower() for d in self.documents], dtype=bool)
+        if filters.corpus:
+            allowed &= np.array([d.corpus == filters.corpus for d in self.documents], dtype=bool)
+        return allowed
+
+# Loaders turn a corpus file into records: source, text, optional index_text,
+# year, page, tags and the original fields
+
+def load_constitution(raw: Dict) -> List[Dict]:
+    return [
+        {
+            "source": f"Constitution of India - Article {key}",
+            "text": article["text"],
+            "index_text": f"Article {key} {article['text']} {article.get('context', '')}",
+            "tags": [key],
+            "fields": {"article": key, **article}
+        }
+        for key, article in raw.get("articles", {}).items()
+    ]
+
+def load_kovind(raw: Dict) -> List[Dict]:
+    return [
+        {
+            "source": f"Kovind Committee Report - Page {excerpt['page']}",
+            "text": excerpt["quote"],
+            "index_text": f"{excerpt.get('section', '')} {excerpt['quote']}",
+            "year": raw.get("year"),
+            "page": excerpt["page"],
+            "tags": [excerpt["relevance"]] if excerpt.get("relevance") else [],
+            "fields": excerpt
+        }
+        for excerpt in raw.get("excerpts", [])
+    ]
+
+def load_precedents(raw: Dict) -> List[Dict]:
+    return [
+        {
+            "source": case["case_name"],
+            "text": case.get("summary", ""),
+            "index_text": f"{case['case_name']} {case.get('summary', '')} {case.get('relevance', '')}",
+            "year": case.get("year"),
+            "tags": case.get("relevant_articles", []),
+            "fields": case
+        }
+        for case in raw.get("cases", [])
+    ]
+
+def load_supply_chain(raw: Dict) -> List[Dict]:
+    return [
+        {
+            "source": document["source"],
+            "text": document["content"],
+            "index_text": f"{document['source']} {document.get('doc_type', '')} {document['content']}",
+            "year": document.get("year"),
+            "tags": [document["doc_type"]] if document.get("doc_type") else [],
+            "fields": document
+        }
+        for document in raw.get("documents", [])
+    ]
+
+class DocumentStore:
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        self.corpora: Dict[str, Tuple[Path, Callable[[Dict], List[Dict]], Dict]] = {}
+        # Replaced wholesale on (re)load so readers never see a half-built corpus
+        self._collections: Dict[str, Collection] = {}
+        # names -> (component collections, union); rebuilt when any component is reloaded
+        self._unions: Dict[Tuple[str, ...], Tuple[Tuple[Collection, ...], Collection]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def register(self, name: str, file_name: str, loader: Callable[[Dict], List[Dict]], empty: Dict):
+        """Declare a corpus; `empty` is served if the file cannot be read at startup"""
+        self.corpora[name] = (self.data_dir / file_name, loader, empty)
+
+    def path(self, name: str) -> Path:
+        return self.corpora[name][0]
+
+    def collection(self, name: str) -> Collection:
+        """The current collection, loading it on first use"""
+        collection = self._collections.get(name)
+        if collection is None:
+            with self._lock:
+                collection = self._collections.get(name)
+                if collection is None:
+                    try:
+                        collection = self._build(name)
+                    except Exception as e:
+                        print(f"Error loading {name} corpus: {e}")
+                        collection = self._build(name, raw=self.corpora[name][2])
+                    self._collections = {**self._collections, name: collection}
+        return collection
+
+    def union(self, names: Tuple[str, ...]) -> Collection:
+        """A single collection over several corpora, e.g. ("constitution", "kovind")"""
+        components = tuple(self.collection(name) for name in names)
+        cached = self._unions.get(names)
+        if cached is not None and all(a is b for a, b in zip(cached[0], components)):
+            return cached[1]
+        self._generation += 1
+        union = Collection.union("+".join(names), list(components), self._generation)
+        self._unions = {**self._unions, names: (components, union)}
+        return union
+
+    def reload(self, name: str) -> Collection:
+        """Rebuild a corpus from disk and swap it in; raises (keeping the old one) if unreadable"""
+        collection = self._build(name)
+        with self._lock:
+            self._collections = {**self._collections, name: collection}
+        return collection
+
+    def _build(self, name: str, raw: Dict = None) -> Collection:
+        path, loader, _ = self.corpora[name]
+        if raw is None:
+            with open(path, "r") as f:
+                raw = json.load(f)
+        self._generation += 1
+        return Collection.from_records(name, raw, loader(raw), self._generation)
+
+    def search(self, name: str, query: str = "", k: Optional[int] = 10,
+               filters: Filters = Filters()) -> Tuple[Hit, ...]:
+        """
+        Ranked BM25 hits for `query` within the filters, best first. An empty
+        query returns every matching document in corpus order (k=None: no limit).
+        """
+        return self.collection(name).search(query, k, filters)
+
+    def get(self, name: str, filters: Filters = Filters()) -> Tuple[Document, ...]:
+        """Every document matching the filters, in corpus order"""
+        return tuple(hit.document for hit in self.search(name, "", None, filters))
+
+# Singleton instance
+document_store = DocumentStore(Path(__file__).parent.parent / "data")
+document_store.register("constitution", "constitution_excerpts.json", load_constitution, {"articles": {}})
+document_store.register("kovind", "kovind_report_excerpts.json", load_kovind, {"excerpts": []})
+document_store.register("precedents", "precedents.json", load_precedents, {"cases": []})
+document_store.register("supply_chain", "supply_chain_documents.json", load_supply_chain, {"documents": []})
@@ -0,0 +1,405 @@
+"""
+Streaming Ingestion Pipeline for Full-Length Source Texts
+Streams text files page by page (pages separated by form feeds, as produced by
+pdftotext), chunks them with page and section metadata, and incrementally
+builds a BM25 index in an on-disk format the server memory-maps at startup.
+
+Postings are accumulated in bounded blocks and flushed as sorted runs, then
+scattered into memory-mapped final arrays, and BM25 weights are written slice
+by slice, so the resident postings data depends on the block size and
+vocabulary, not on the length of the report. MinHash band keys are streamed
+the same way and clustered at the end to mark near-duplicate chunks. The index
+is built in a staging directory and swapped into place when complete, so a
+running server keeps serving the previous index until then.
+
+Usage:
+    python -m retrieval.ingest --corpus kovind --title "Kovind Committee Report" \\
+        --out data/index/kovind_full vol1.txt vol2.txt
+
+On-disk layout (all arrays are .npy, opened with mmap_mode="r"):
+    meta.json                corpus, title, counts, BM25 parameters
+    vocab.json               term -> term id
+    offsets.npy              int64, postings of term t live in [offsets[t], offsets[t + 1])
+    postings_docs.npy        int32 chunk ids
+    postings_tfs.npy         float32 term frequencies
+    postings_weights.npy     float32 precomputed BM25 weights
+    doc_lengths.npy          int32 tokens per chunk
+    chunks.bin               UTF-8 chunk texts, back to back
+    chunk_offsets.npy        int64 byte offsets into chunks.bin (n_chunks + 1)
+    chunk_pages.npy          int32 page number of each chunk
+    chunk_sections.npy       int32 index into sections.json
+    sections.json            section headings
+    chunk_clusters.npy       int32 near-duplicate representative of each chunk (see retrieval/dedup.py)
+    cluster_order.npy        int32 chunk ids sorted by representative, to list a cluster's members
+    embeddings.npy           float32 dense chunk embeddings (with --dense; see retrieval/dense.py)
+"""
+import numpy as np
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import bisect
+import json
+import mmap
+import re
+import shutil
+import time
+
+from retrieval.dedup import MinHasher, cluster_band_hashes
+from retrieval.dense import DenseIndex
+from retrieval.lexical import BM25Index, bm25_weights, tokenize
+
+# "CHAPTER 5", "Chapter V - ...", "5.2 Constitutional Challenges", "ANNEXURE III"
+SECTION_RE = re.compile(
+    r"^\s*((chapter|part|annexure|appendix|section)\s+[\divxlc]+\b.*|\d+(\.\d+)*\s+[A-Z][^.]{2,80})\s*$",
+    re.IGNORECASE
+)
+
+def is_heading(line: str) -> bool:
+    stripped = line.strip()
+    if not stripped or len(stripped) > 100:
+        return False
+    if SECTION_RE.match(stripped):
+        return True
+    # Short all-caps lines are headings in most government reports
+    letters = [c for c in stripped if c.isalpha()]
+    return len(letters) >= 4 and all(c.isupper() for c in letters) and len(stripped.split()) <= 12
+
+def iter_pages(paths: Iterable[Path], first_page: int = 1) -> Iterator[Tuple[int, List[str]]]:
+    """Yield (page_number, lines) page by page; pages are split on form feeds"""
+    page_number = first_page
+    for path in paths:
+        lines: List[str] = []
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                while "\f" in line:
+                    before, line = line.split("\f", 1)
+                    if before.strip():
+                        lines.append(before)
+                    yield page_number, lines
+                    page_number += 1
+                    lines = []
+                lines.append(line)
+        if any(l.strip() for l in lines):
+            yield page_number, lines
+            page_number += 1
+
+def iter_chunks(pages: Iterable[Tuple[int, List[str]]], chunk_words: int = 200,
+                overlap: int = 40) -> Iterator[Dict]:
+    """
+    Split pages into overlapping word windows that never cross a page or section
+    boundary. Section headings carry over from page to page until the next one.
+    """
+    section = ""
+    step = max(1, chunk_words - overlap)
+
+    def windows(words: List[str], page: int, section: str):
+        for start in range(0, max(1, len(words) - overlap), step):
+            window = words[start:start + chunk_words]
+            if window:
+                yield {"text": " ".join(window), "page": page, "section": section}
+
+    for page, lines in pages:
+        words: List[str] = []
+        for line in lines:
+            if is_heading(line):
+                yield from windows(words, page, section)
+                words = []
+                section = line.strip()
+            else:
+                words.extend(line.split())
+        yield from windows(words, page, section)
+
+class IndexWriter:
+    """
+    Incrementally builds the on-disk BM25 index from a stream of chunks. Files
+    are written to a staging directory next to out_dir and swapped into place by
+    publish(), so the live index is never deleted or half-written.
+    """
+
+    def __init__(self, out_dir: Path, block_size: int = 20000, k1: float = 1.5, b: float = 0.75):
+        self.out_dir = Path(out_dir)
+        self.stage_dir = self.out_dir.with_name(self.out_dir.name + ".tmp")
+        self.block_size = block_size
+        self.k1 = k1
+        self.b = b
+        self.hasher = MinHasher()
+
+        if self.stage_dir.exists():
+            shutil.rmtree(self.stage_dir)
+        (self.stage_dir / "runs").mkdir(parents=True)
+
+        self.vocab: Dict[str, int] = {}
+        self.dfs: List[int] = []
+        self.sections: Dict[str, int] = {}
+        self.n_docs = 0
+        self.n_runs = 0
+        self.text_bytes = 0
+
+        # Per-chunk columns are streamed to raw files and converted to .npy at the end
+        self._texts = open(self.stage_dir / "chunks.bin", "wb")
+        self._columns = {
+            name: open(self.stage_dir / f"{name}.raw", "wb")
+            for name in ("chunk_offsets", "chunk_pages", "chunk_sections", "doc_lengths", "signatures", "band_hashes")
+        }
+        self._columns["chunk_offsets"].write(np.int64(0).tobytes())
+        self._block: List[Tuple[int, int, int]] = []  # (term_id, doc_id, tf)
+
+    def add(self, chunk: Dict):
+        doc_id = self.n_docs
+        self.n_docs += 1
+
+        encoded = chunk["text"].encode("utf-8")
+        self._texts.write(encoded)
+        self.text_bytes += len(encoded)
+        section_id = self.sections.setdefault(chunk.get("section", ""), len(self.sections))
+
+        tokens = tokenize(f"{chunk.get('section', '')} {chunk['text']}")
+        self._columns["chunk_offsets"].write(np.int64(self.text_bytes).tobytes())
+        self._columns["chunk_pages"].write(np.int32(chunk.get("page", 0)).tobytes())
+        self._columns["chunk_sections"].write(np.int32(section_id).tobytes())
+        self._columns["doc_lengths"].write(np.int32(len(tokens)).tobytes())
+        signature = self.hasher.signature(chunk["text"])
+        self._columns["signatures"].write(signature.tobytes())
+        self._columns["band_hashes"].write(self.hasher.band_hashes(signature).tobytes())
+
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, tf in counts.items():
+            term_id = self.vocab.setdefault(token, len(self.vocab))
+            if term_id == len(self.dfs):
+                self.dfs.append(0)
+            self.dfs[term_id] += 1
+            self._block.append((term_id, doc_id, tf))
+
+        if doc_id % self.block_size == self.block_size - 1:
+            self._flush_run()
+
+    def _flush_run(self):
+        """Write the current block's postings as a run sorted by term (docs stay ascending)"""
+        if not self._block:
+            return
+        block = np.array(self._block, dtype=np.int64)
+        order = np.argsort(block[:, 0], kind="stable")
+        block = block[order]
+        run_dir = self.stage_dir / "runs"
+        np.save(run_dir / f"{self.n_runs}_terms.npy", block[:, 0].astype(np.int32))
+        np.save(run_dir / f"{self.n_runs}_docs.npy", block[:, 1].astype(np.int32))
+        np.save(run_dir / f"{self.n_runs}_tfs.npy", block[:, 2].astype(np.float32))
+        self.n_runs += 1
+        self._block = []
+
+    def _column_to_npy(self, name: str, dtype, slice_rows: int = 1 << 20):
+        raw_path = self.stage_dir / f"{name}.raw"
+        raw = np.memmap(raw_path, dtype=dtype, mode="r") if raw_path.stat().st_size else np.zeros(0, dtype=dtype)
+        out = np.lib.format.open_memmap(self.stage_dir / f"{name}.npy", mode="w+", dtype=dtype, shape=raw.shape)
+        for start in range(0, len(raw), slice_rows):
+            out[start:start + slice_rows] = raw[start:start + slice_rows]
+        out.flush()
+        del raw, out
+        raw_path.unlink()
+
+    def _cluster_duplicates(self) -> int:
+        """Cluster chunks on their streamed band keys; returns how many chunks duplicate another"""
+        hashes_path = self.stage_dir / "band_hashes.raw"
+        signatures_path = self.stage_dir / "signatures.raw"
+        if self.n_docs:
+            band_hashes = np.memmap(hashes_path, dtype=np.uint64, mode="r").reshape(-1, self.hasher.bands)
+            signatures = np.memmap(signatures_path, dtype=np.uint32, mode="r").reshape(-1, self.hasher.num_perm)
+            clusters = cluster_band_hashes(band_hashes, signatures)
+            del band_hashes, signatures
+        else:
+            clusters = np.zeros(0, dtype=np.int32)
+        hashes_path.unlink()
+        signatures_path.unlink()
+        np.save(self.stage_dir / "chunk_clusters.npy", clusters)
+        np.save(self.stage_dir / "cluster_order.npy", np.argsort(clusters, kind="stable").astype(np.int32))
+        return int((clusters != np.arange(len(clusters))).sum())
+
+    def finalize(self, meta: Dict, publish: bool = True) -> Dict:
+        """Merge runs into the final postings arrays and write metadata (and publish the index)"""
+        self._flush_run()
+        self._texts.close()
+        for f in self._columns.values():
+            f.close()
+        for name, dtype in (("chunk_offsets", np.int64), ("chunk_pages", np.int32),
+                            ("chunk_sections", np.int32), ("doc_lengths", np.int32)):
+            self._column_to_npy(name, dtype)
+        n_duplicates = self._cluster_duplicates()
+
+        dfs = np.array(self.dfs, dtype=np.int64)
+        offsets = np.zeros(len(dfs) + 1, dtype=np.int64)
+        np.cumsum(dfs, out=offsets[1:])
+        np.save(self.stage_dir / "offsets.npy", offsets)
+        n_postings = int(offsets[-1])
+
+        postings_docs = np.lib.format.open_memmap(self.stage_dir / "postings_docs.npy", mode="w+", dtype=np.int32, shape=(n_postings,))
+        postings_tfs = np.lib.format.open_memmap(self.stage_dir / "postings_tfs.npy", mode="w+", dtype=np.float32, shape=(n_postings,))
+
+        # Runs are in doc order, so appending each run's postings per term keeps lists sorted
+        cursor = offsets[:-1].copy()
+        run_dir = self.stage_dir / "runs"
+        for run in range(self.n_runs):
+            terms = np.load(run_dir / f"{run}_terms.npy", mmap_mode="r")
+            docs = np.load(run_dir / f"{run}_docs.npy", mmap_mode="r")
+            tfs = np.load(run_dir / f"{run}_tfs.npy", mmap_mode="r")
+            unique_terms, group_starts, counts = np.unique(terms, return_index=True, return_counts=True)
+            rank = np.arange(len(terms)) - np.repeat(group_starts, counts)
+            destination = np.repeat(cursor[unique_terms], counts) + rank
+            postings_docs[destination] = docs
+            postings_tfs[destination] = tfs
+            cursor[unique_terms] += counts
+            del terms, docs, tfs
+        shutil.rmtree(run_dir)
+
+        doc_lengths = np.load(self.stage_dir / "doc_lengths.npy", mmap_mode="r")
+        postings_weights = np.lib.format.open_memmap(self.stage_dir / "postings_weights.npy", mode="w+",
+                                                     dtype=np.float32, shape=(n_postings,))
+        bm25_weights(offsets, postings_docs, postings_tfs, doc_lengths, self.k1, self.b, out=postings_weights)
+        postings_docs.flush()
+        postings_tfs.flush()
+        postings_weights.flush()
+        del postings_docs, postings_tfs, postings_weights
+
+        with open(self.stage_dir / "vocab.json", "w") as f:
+            json.dump(self.vocab, f)
+        with open(self.stage_dir / "sections.json", "w") as f:
+            json.dump(sorted(self.sections, key=self.sections.get), f)
+
+        meta = {
+            **meta,
+            "format_version": 1,
+            "n_chunks": self.n_docs,
+            "n_terms": len(self.vocab),
+            "n_postings": n_postings,
+            "n_duplicate_chunks": n_duplicates,
+            "avg_chunk_tokens": round(float(doc_lengths.mean()), 2) if self.n_docs else 0.0,
+            "k1": self.k1,
+            "b": self.b,
+            "created_at": time.time()
+        }
+        with open(self.stage_dir / "meta.json", "w") as f:
+            json.dump(meta, f, indent=2)
+        if publish:
+            self.publish()
+        return meta
+
+    def publish(self):
+        """Swap the finished index into place"""
+        previous = self.out_dir.with_name(self.out_dir.name + ".old")
+        if previous.exists():
+            shutil.rmtree(previous)
+        if self.out_dir.exists():
+            self.out_dir.rename(previous)
+        self.stage_dir.rename(self.out_dir)
+        if previous.exists():
+            shutil.rmtree(previous)
+
+class ChunkStore:
+    """Memory-mapped chunk texts and metadata of an ingested corpus"""
+
+    def __init__(self, index_dir: Path):
+        index_dir = Path(index_dir)
+        with open(index_dir / "meta.json") as f:
+            self.meta = json.load(f)
+        with open(index_dir / "sections.json") as f:
+            self.sections = json.load(f)
+        self.offsets = np.load(index_dir / "chunk_offsets.npy", mmap_mode="r")
+        self.pages = np.load(index_dir / "chunk_pages.npy", mmap_mode="r")
+        self.section_ids = np.load(index_dir / "chunk_sections.npy", mmap_mode="r")
+        # Indexes ingested before near-duplicate detection treat every chunk as unique
+        if (index_dir / "chunk_clusters.npy").exists():
+            self.clusters = np.load(index_dir / "chunk_clusters.npy", mmap_mode="r")
+            self.cluster_order = np.load(index_dir / "cluster_order.npy", mmap_mode="r")
+        else:
+            self.clusters = None
+        self._file = open(index_dir / "chunks.bin", "rb")
+        self._text = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.offsets[-1] else b""
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def get(self, chunk_id: int) -> Dict:
+        start, end = int(self.offsets[chunk_id]), int(self.offsets[chunk_id + 1])
+        return {
+            "text": self._text[start:end].decode("utf-8"),
+            "page": int(self.pages[chunk_id]),
+            "section": self.sections[int(self.section_ids[chunk_id])]
+        }
+
+    def cluster_of(self, chunk_id: int) -> int:
+        """Near-duplicate representative (lowest chunk id of its cluster)"""
+        return chunk_id if self.clusters is None else int(self.clusters[chunk_id])
+
+    def duplicates(self, representative: int) -> np.ndarray:
+        """Chunk ids in the cluster of `representative`, ascending"""
+        if self.clusters is None:
+            return np.array([representative])
+        # Binary search over cluster_order by representative, touching O(log n) rows
+        key = lambda chunk_id: self.clusters[chunk_id]
+        start = bisect.bisect_left(self.cluster_order, representative, key=key)
+        end = bisect.bisect_right(self.cluster_order, representative, lo=start, key=key)
+        return np.asarray(self.cluster_order[start:end])
+
+def load_index(index_dir: Path) -> Tuple[BM25Index, ChunkStore]:
+    """Open an ingested corpus without re-parsing any text (arrays are memory-mapped)"""
+    index_dir = Path(index_dir)
+    store = ChunkStore(index_dir)
+    with open(index_dir / "vocab.json") as f:
+        vocab = json.load(f)
+    index = BM25Index(
+        vocab,
+        np.load(index_dir / "offsets.npy", mmap_mode="r"),
+        np.load(index_dir / "postings_docs.npy", mmap_mode="r"),
+        np.load(index_dir / "postings_weights.npy", mmap_mode="r"),
+        np.load(index_dir / "doc_lengths.npy", mmap_mode="r"),
+        k1=store.meta["k1"],
+        b=store.meta["b"]
+    )
+    return index, store
+
+def ingest(paths: List[Path], out_dir: Path, corpus: str, title: str, first_page: int = 1,
+           chunk_words: int = 200, overlap: int = 40, block_size: int = 20000,
+           dense_dim: Optional[int] = None) -> Dict:
+    writer = IndexWriter(out_dir, block_size=block_size)
+    for chunk in iter_chunks(iter_pages(paths, first_page), chunk_words, overlap):
+        writer.add(chunk)
+    meta = writer.finalize({
+        "corpus": corpus,
+        "title": title,
+        "sources": [str(p) for p in paths],
+        "chunk_words": chunk_words,
+        "overlap": overlap
+    }, publish=False)
+
+    if dense_dim:
+        # Embeddings are built from the memory-mapped chunk store, not the source files
+        store = ChunkStore(writer.stage_dir)
+        texts = lambda: (f"{c['section']} {c['text']}" for c in map(store.get, range(len(store))))
+        DenseIndex.build_to_disk(texts, len(store), writer.stage_dir, dim=dense_dim)
+    writer.publish()
+    return meta
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Ingest source text files into a memory-mappable BM25 index")
+    parser.add_argument("files", nargs="+", type=Path, help="Text files, pages separated by form feeds")
+    parser.add_argument("--out", type=Path, required=True, help="Index directory (e.g. data/index/kovind_full)")
+    parser.add_argument("--corpus", required=True, choices=["constitution", "kovind"], help="Corpus the chunks belong to")
+    parser.add_argument("--title", required=True, help="Source name shown with evidence, e.g. 'Kovind Committee Report'")
+    parser.add_argument("--first-page", type=int, default=1)
+    parser.add_argument("--chunk-words", type=int, default=200)
+    parser.add_argument("--overlap", type=int, default=40)
+    parser.add_argument("--block-size", type=int, default=20000, help="Chunks per in-memory postings block")
+    parser.add_argument("--dense", action="store_true", help="Also build dense embeddings for dense/hybrid search")
+    parser.add_argument("--dense-dim", type=int, default=256, help="SVD dimension of the dense embeddings")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    meta = ingest(args.files, args.out, args.corpus, args.title, args.first_page,
+                  args.chunk_words, args.overlap, args.block_size,
+                  dense_dim=args.dense_dim if args.dense else None)
+    print(f"Indexed {meta['n_chunks']} chunks, {meta['n_terms']} terms, "
+          f"{meta['n_postings']} postings in {time.perf_counter() - started:.1f}s -> {args.out}")
+
+if __name__ == "__main__":
+    main()
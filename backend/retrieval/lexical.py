@@ -0,0 +1,144 @@
+"""
+Lexical Retrieval: Tokenization and BM25 Inverted Index
+Builds postings once at load time and answers free-text queries with BM25
+scoring and top-k selection. Postings are stored as flat NumPy arrays with the
+per-posting BM25 term weight precomputed, so a query is a handful of array
+slices plus a sum.
+"""
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Tuple
+import heapq
+import re
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a an the of in on for to and or by with as at be is are was were been being this that these those
+it its from into than then there their they them he she his her we our you your i not no nor but if
+so such can could may might shall should will would must has have had do does did also any all each
+which who whom whose what when where while how per upon under over about between during
+""".split())
+
+def _stem(token: str) -> str:
+    """Conservative plural folding (elections -> election, states -> state, parties -> party)"""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split on non-alphanumerics, drop stopwords, fold plurals"""
+    return [_stem(t) for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+class BM25Index:
+    """
+    Inverted index with Okapi BM25 scoring.
+    Postings for term t are postings_docs[offsets[t]:offsets[t + 1]] with matching
+    precomputed weights idf(t) * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl)).
+    """
+
+    def __init__(self, vocab: Dict[str, int], offsets: np.ndarray, postings_docs: np.ndarray,
+                 postings_weights: np.ndarray, doc_lengths: np.ndarray, k1: float = 1.5, b: float = 0.75):
+        self.vocab = vocab
+        self.offsets = offsets
+        self.postings_docs = postings_docs
+        self.postings_weights = postings_weights
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.doc_lengths)
+
+    @classmethod
+    def build(cls, texts: Iterable[str], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """Tokenize documents and build the postings arrays in one pass"""
+        vocab: Dict[str, int] = {}
+        term_docs: List[List[int]] = []
+        term_tfs: List[List[int]] = []
+        doc_lengths: List[int] = []
+
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                term_id = vocab.setdefault(token, len(vocab))
+                if term_id == len(term_docs):
+                    term_docs.append([])
+                    term_tfs.append([])
+                term_docs[term_id].append(doc_id)
+                term_tfs[term_id].append(tf)
+
+        dfs = np.array([len(docs) for docs in term_docs], dtype=np.int64)
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(dfs, out=offsets[1:])
+        postings_docs = np.array([d for docs in term_docs for d in docs], dtype=np.int32)
+        postings_tfs = np.array([tf for tfs in term_tfs for tf in tfs], dtype=np.float32)
+        doc_lengths = np.array(doc_lengths, dtype=np.int32)
+
+        weights = bm25_weights(offsets, postings_docs, postings_tfs, doc_lengths, k1, b)
+        return cls(vocab, offsets, postings_docs, weights, doc_lengths, k1, b)
+
+    def search(self, query: str, k: int = 10, allowed: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        Top-k (doc_id, score) pairs for a free-text query, best first.
+        `allowed` is an optional boolean mask over documents (e.g. one source only).
+        """
+        term_ids = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        if not term_ids or k <= 0:
+            return []
+
+        if len(term_ids) == 1:
+            t = term_ids.pop()
+            docs = self.postings_docs[self.offsets[t]:self.offsets[t + 1]]
+            scores = self.postings_weights[self.offsets[t]:self.offsets[t + 1]]
+        else:
+            slices = [slice(self.offsets[t], self.offsets[t + 1]) for t in term_ids]
+            all_docs = np.concatenate([self.postings_docs[s] for s in slices])
+            all_weights = np.concatenate([self.postings_weights[s] for s in slices])
+            docs, inverse = np.unique(all_docs, return_inverse=True)
+            scores = np.bincount(inverse, weights=all_weights).astype(np.float32)
+
+        if allowed is not None:
+            keep = allowed[docs]
+            docs, scores = docs[keep], scores[keep]
+        if len(docs) == 0:
+            return []
+
+        # Large candidate sets: partition first, then rank the survivors with heapq
+        if len(docs) > k * 64:
+            top = np.argpartition(-scores, k - 1)[:k]
+            docs, scores = docs[top], scores[top]
+        best = heapq.nlargest(k, zip(scores.tolist(), docs.tolist()))
+        return [(doc_id, score) for score, doc_id in best]
+
+def bm25_weights(offsets: np.ndarray, postings_docs: np.ndarray, postings_tfs: np.ndarray,
+                 doc_lengths: np.ndarray, k1: float, b: float, out: np.ndarray = None,
+                 slice_postings: int = 1 << 20) -> np.ndarray:
+    """
+    Per-posting BM25 weights (idf x saturated, length-normalized tf). With `out`
+    (e.g. a memory-mapped array) they are written slice_postings at a time, so
+    only one slice of the postings is held in memory.
+    """
+    n_docs = len(doc_lengths)
+    n_postings = int(offsets[-1])
+    avgdl = float(doc_lengths.mean()) if n_docs else 0.0
+    dfs = np.diff(offsets).astype(np.float64)
+    idf = np.log1p((n_docs - dfs + 0.5) / (dfs + 0.5))
+
+    if out is None:
+        out = np.empty(n_postings, dtype=np.float32)
+        slice_postings = max(n_postings, 1)
+    for start in range(0, n_postings, slice_postings):
+        end = min(start + slice_postings, n_postings)
+        # Term of each posting: the last term whose postings start at or before it
+        terms = np.searchsorted(offsets, np.arange(start, end), side="right") - 1
+        tfs = np.asarray(postings_tfs[start:end])
+        norm = k1 * (1 - b + b * doc_lengths[np.asarray(postings_docs[start:end])] / avgdl) if avgdl else k1
+        out[start:end] = idf[terms] * tfs * (k1 + 1) / (tfs + norm)
+    return out
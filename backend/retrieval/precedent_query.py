@@ -0,0 +1,167 @@
+"""
+Precedent Query Engine
+Compound precedent queries ("post-1994 cases touching Article 356 with impact
+>= 4") answered from column arrays built once per precedents collection.
+Year- and impact-sorted case orders are searched with bisect and article
+postings are combined as sorted id sets; the smallest of those candidate sets
+drives the query and the remaining conditions apply as vectorized masks.
+Results come back in impact or year order, one page at a time.
+"""
+import bisect
+import numpy as np
+from dataclasses import dataclass
+from typing import Callable, Iterable, Mapping, Optional, Sequence, Tuple
+
+from models import PrecedentCase
+from retrieval.document_store import Collection
+
+SORT_ORDERS = ("impact", "year")
+ARTICLE_MATCHES = ("any", "all")
+
+@dataclass(frozen=True)
+class PrecedentQuery:
+    articles: Tuple[int, ...] = ()
+    # "any": a case touches at least one of the articles; "all": every one of them
+    match: str = "any"
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    min_impact: Optional[float] = None
+    max_impact: Optional[float] = None
+    exclude_overruled: bool = False
+    # "impact" (highest first, then newest) or "year" (newest first, then highest impact)
+    sort: str = "impact"
+    offset: int = 0
+    limit: int = 20
+
+@dataclass(frozen=True)
+class PrecedentPage:
+    total: int
+    offset: int
+    limit: int
+    cases: Tuple[PrecedentCase, ...]
+
+def sort_orders(years: np.ndarray, impact: np.ndarray,
+                keep: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Year- and impact-ascending case orders (only `keep` cases, if given) and
+    every case's position in the impact-first and year-first result orders
+    """
+    n_cases = len(years)
+    ids = np.arange(n_cases, dtype=np.int32) if keep is None else np.flatnonzero(keep).astype(np.int32)
+    by_year = ids[np.argsort(years[ids], kind="stable")]
+    by_impact = ids[np.argsort(impact[ids], kind="stable")]
+    impact_rank = np.empty(n_cases, dtype=np.int32)
+    impact_rank[np.lexsort((-years, -impact))] = np.arange(n_cases, dtype=np.int32)
+    year_rank = np.empty(n_cases, dtype=np.int32)
+    year_rank[np.lexsort((-impact, -years))] = np.arange(n_cases, dtype=np.int32)
+    return by_year, by_impact, impact_rank, year_rank
+
+class PrecedentQueryEngine:
+    """
+    Immutable after construction; a precedents reload builds a new engine.
+    Columns may be in-memory arrays or memory-mapped ones from a bulk store.
+    """
+
+    def __init__(self, years: np.ndarray, impact: np.ndarray, overruled: np.ndarray,
+                 articles: Mapping[int, np.ndarray], case_at: Callable[[int], PrecedentCase],
+                 by_year: np.ndarray, by_impact: np.ndarray, impact_rank: np.ndarray, year_rank: np.ndarray,
+                 sorted_years: Sequence[int], sorted_impacts: Sequence[float]):
+        self.years = years
+        self.impact = impact
+        self.overruled = overruled
+        # Article postings, ascending case ids
+        self.articles = articles
+        self.case_at = case_at
+        # Case ids in ascending year / impact order, with their keys for bisect
+        self.by_year = by_year
+        self.by_impact = by_impact
+        self.sorted_years = sorted_years
+        self.sorted_impacts = sorted_impacts
+        # Position of every case in each sort order, so a candidate set sorts by one argsort
+        self.impact_rank = impact_rank
+        self.year_rank = year_rank
+
+    @classmethod
+    def from_cases(cls, collection: Collection, cases: Sequence[PrecedentCase],
+                   overruled: Optional[np.ndarray] = None) -> "PrecedentQueryEngine":
+        """Engine over an in-memory collection and its case models (in corpus order)"""
+        cases = tuple(cases)
+        years = np.array([case.year for case in cases], dtype=np.int32)
+        # float64 so thresholds compare exactly against the JSON values
+        impact = np.array([case.impact_score for case in cases], dtype=np.float64)
+        by_year, by_impact, impact_rank, year_rank = sort_orders(years, impact)
+        articles = {}
+        for tag, doc_ids in collection.tags.items():
+            try:
+                articles[int(tag)] = doc_ids
+            except ValueError:
+                continue
+        return cls(
+            years, impact,
+            overruled if overruled is not None else np.zeros(len(cases), dtype=bool),
+            articles, cases.__getitem__, by_year, by_impact, impact_rank, year_rank,
+            years[by_year].tolist(), impact[by_impact].tolist()
+        )
+
+    def _article_ids(self, articles: Iterable[int], match: str) -> np.ndarray:
+        postings = sorted(
+            (self.articles.get(article, np.zeros(0, dtype=np.int32)) for article in articles),
+            key=len
+        )
+        if match == "all":
+            ids = postings[0]
+            for other in postings[1:]:
+                ids = np.intersect1d(ids, other, assume_unique=True)
+            return ids
+        return np.unique(np.concatenate(postings))
+
+    @staticmethod
+    def _range(sorted_keys: list, low, high) -> slice:
+        start = bisect.bisect_left(sorted_keys, low) if low is not None else 0
+        end = bisect.bisect_right(sorted_keys, high) if high is not None else len(sorted_keys)
+        return slice(start, max(start, end))
+
+    def query(self, query: PrecedentQuery) -> PrecedentPage:
+        if query.match not in ARTICLE_MATCHES:
+            raise ValueError(f"Unknown article match: {query.match}")
+        if query.sort not in SORT_ORDERS:
+            raise ValueError(f"Unknown sort order: {query.sort}")
+
+        # Candidate sets: the bisected year range, the bisected impact range and the article postings
+        candidates = [
+            self.by_year[self._range(self.sorted_years, query.year_from, query.year_to)],
+            self.by_impact[self._range(self.sorted_impacts, query.min_impact, query.max_impact)]
+        ]
+        if query.articles:
+            candidates.append(self._article_ids(query.articles, query.match))
+        ids = min(candidates, key=len)
+
+        keep = np.ones(len(ids), dtype=bool)
+        if query.year_from is not None:
+            keep &= self.years[ids] >= query.year_from
+        if query.year_to is not None:
+            keep &= self.years[ids] <= query.year_to
+        if query.min_impact is not None:
+            keep &= self.impact[ids] >= query.min_impact
+        if query.max_impact is not None:
+            keep &= self.impact[ids] <= query.max_impact
+        if query.articles and ids is not candidates[-1]:
+            keep &= np.isin(ids, candidates[-1], assume_unique=True)
+        if query.exclude_overruled:
+            keep &= ~self.overruled[ids]
+        ids = ids[keep]
+
+        rank = self.impact_rank if query.sort == "impact" else self.year_rank
+        offset, limit = max(query.offset, 0), max(query.limit, 0)
+        if offset + limit < len(ids):
+            # Only the requested page needs ordering
+            top = ids[np.argpartition(rank[ids], offset + limit - 1)[:offset + limit]]
+        else:
+            top = ids
+        page = top[np.argsort(rank[top])][offset:offset + limit]
+        return PrecedentPage(
+            total=len(ids),
+            offset=offset,
+            limit=limit,
+            cases=tuple(self.case_at(i) for i in page.tolist())
+        )
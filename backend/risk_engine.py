@@ -2,7 +2,7 @@
 Core Risk Calculation Engine
 Calculates risk scores for all 7 constitutional articles using the 8 features
 """
-from models import Article, ArticleStatus, RiskComponents, RAGEvidence, DebateResult
+from models import Article, ArticleStatus, RiskComponents, DebateResult
 from features.f1_debate_agent import debate_agent
 from features.f2_rag_system import rag_system
 from features.f3_precedent_analysis import precedent_analyzer
@@ -76,8 +76,7 @@ class RiskEngine:
         # Feature 2: RAG System (always used for evidence)
         rag_evidence = []
         if "F2" in features_used:
-            evidence_list = rag_system.query_documents(article_number)
-            rag_evidence = [RAGEvidence(**ev) for ev in evidence_list]
+            rag_evidence = list(rag_system.article_evidence(article_number))
         
         # Feature 3: Precedent Analysis
         precedents = []
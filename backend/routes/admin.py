@@ -3,9 +3,10 @@ API Routes for Administrative Engine
 """
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from admin_risk_engine import admin_risk_engine, AdminDashboardData
+from admin_features.f2_supply_chain import supply_chain_rag
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -18,20 +19,36 @@ class DashboardInput(BaseModel):
     evm_supply: float = 100.0
     security_personnel: float = 100.0
 
+# Cache for the default dashboard (precomputed by startup warm-up)
+_dashboard_cache = None
+
+def get_default_dashboard() -> AdminDashboardData:
+    """Get or calculate the dashboard for default inputs"""
+    global _dashboard_cache
+    if _dashboard_cache is None:
+        _dashboard_cache = admin_risk_engine.get_dashboard_data()
+    return _dashboard_cache
+
+def refresh_dashboard_cache():
+    """Recalculate the default dashboard and swap it in (only if it was already computed)"""
+    global _dashboard_cache
+    if _dashboard_cache is not None:
+        _dashboard_cache = admin_risk_engine.get_dashboard_data()
+
 @router.get("/dashboard", response_model=AdminDashboardData)
-async def get_dashboard():
+def get_dashboard():
     """
     Get initial dashboard data (defaults).
     """
     try:
-        data = admin_risk_engine.get_dashboard_data()
+        data = get_default_dashboard()
         return data
     except Exception as e:
         print(f"Error getting admin dashboard: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/dashboard", response_model=AdminDashboardData)
-async def update_dashboard(inputs: DashboardInput):
+def update_dashboard(inputs: DashboardInput):
     """
     Get dashboard data with custom inputs.
     """
@@ -43,7 +60,7 @@ async def update_dashboard(inputs: DashboardInput):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/bottleneck/analyze")
-async def analyze_bottlenecks(inputs: DashboardInput):
+def analyze_bottlenecks(inputs: DashboardInput):
     """
     Intelligently analyze bottlenecks using LLM based on current administrative context.
     """
@@ -53,3 +70,18 @@ async def analyze_bottlenecks(inputs: DashboardInput):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/supply-chain/search")
+async def search_supply_chain(q: str, k: int = 5, year_from: Optional[int] = None, year_to: Optional[int] = None,
+                              source: Optional[str] = None, doc_type: Optional[str] = None):
+    """
+    Ranked supply-chain evidence (BEL/ECIL reports, ECI manuals, committee reports).
+    """
+    return supply_chain_rag.query_supply_chain(q, k=k, year_from=year_from, year_to=year_to,
+                                               source=source, doc_type=doc_type)
+
+@router.get("/supply-chain/facts")
+async def get_supply_chain_facts():
+    """
+    Numeric facts extracted from the supply-chain corpus, most recent first per metric.
+    """
+    return supply_chain_rag.facts
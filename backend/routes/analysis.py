@@ -1,14 +1,20 @@
 """
 API Routes for Overall Analysis
 """
-from fastapi import APIRouter
-from models import OverallAnalysis
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, List, Optional
+from models import OverallAnalysis, RAGEvidence
 from routes.articles import get_all_articles
+from features.f2_rag_system import SEARCH_MODES, rag_system
+from features.f3_precedent_analysis import precedent_analyzer
+from features.f4_monte_carlo import monte_carlo_simulator
+from retrieval.citation_graph import MAX_HOPS
+from retrieval.precedent_query import PrecedentQuery
 
 router = APIRouter(prefix="/api/analysis", tags=["analysis"])
 
 @router.get("/overall", response_model=OverallAnalysis)
-async def get_overall_analysis():
+def get_overall_analysis():
     """Get overall ONOE feasibility analysis"""
     articles = get_all_articles()
     
@@ -46,7 +52,7 @@ async def get_overall_analysis():
     )
 
 @router.get("/priorities")
-async def get_priorities():
+def get_priorities():
     """Get ranked list of articles by priority"""
     articles = get_all_articles()
     sorted_articles = sorted(articles, key=lambda x: x.priority_rank)
@@ -66,7 +72,7 @@ async def get_priorities():
     }
 
 @router.get("/recommendations")
-async def get_recommendations():
+def get_recommendations():
     """Get evidence-based recommendations"""
     articles = get_all_articles()
     
@@ -102,3 +108,65 @@ async def get_recommendations():
             recommendations["moderate_priority"].append(item)
     
     return recommendations
+
+@router.get("/evidence", response_model=List[RAGEvidence])
+async def search_evidence(q: str, k: int = 5, corpus: Optional[str] = None, mode: str = "lexical"):
+    """Ranked evidence for a free-text question (corpus: constitution or kovind; mode: lexical, dense or hybrid)"""
+    if corpus and corpus not in ("constitution", "kovind"):
+        raise HTTPException(status_code=400, detail=f"Unknown corpus: {corpus}")
+    if mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown search mode: {mode}")
+    return rag_system.search(q, k=k, corpus=corpus, mode=mode)
+
+@router.get("/evidence/articles", response_model=Dict[str, List[RAGEvidence]])
+async def search_article_evidence(k: int = 5, mode: str = "hybrid"):
+    """Ranked evidence for every article, answered as one batched query"""
+    if mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown search mode: {mode}")
+    return rag_system.search_articles(k=k, mode=mode)
+
+@router.get("/precedents")
+async def query_precedents(articles: List[int] = Query(default=[]), match: str = "any",
+                           year_from: Optional[int] = None, year_to: Optional[int] = None,
+                           min_impact: Optional[float] = None, max_impact: Optional[float] = None,
+                           exclude_overruled: bool = False, sort: str = "impact",
+                           offset: int = 0, limit: int = 20):
+    """Precedents by article set (match any/all), year range and impact range, one page at a time"""
+    query = PrecedentQuery(
+        articles=tuple(articles), match=match, year_from=year_from, year_to=year_to,
+        min_impact=min_impact, max_impact=max_impact, exclude_overruled=exclude_overruled,
+        sort=sort, offset=offset, limit=min(limit, 100)
+    )
+    try:
+        return precedent_analyzer.query_precedents(query)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/precedents/{article_number}")
+async def get_reachable_precedents(article_number: int, hops: int = 2, k: int = 5):
+    """Most influential precedents within `hops` citation hops of an article, with its exposure"""
+    if not 1 <= hops <= MAX_HOPS:
+        raise HTTPException(status_code=400, detail=f"hops must be between 1 and {MAX_HOPS}")
+    return {
+        "article": article_number,
+        "exposure": precedent_analyzer.article_exposure(article_number),
+        "precedents": precedent_analyzer.reachable_precedents(article_number, hops=hops, k=k),
+        # The citation links are illustrative in the curated corpus; influence inherits that caveat
+        "citation_edges": precedent_analyzer.citation_edge_provenance()
+    }
+
+@router.get("/monte-carlo/{article_number}")
+def run_adaptive_monte_carlo(article_number: int, tolerance: float = 0.1,
+                             quantiles: List[float] = Query(default=[]),
+                             quantile_tolerance: Optional[float] = None, time_budget_ms: int = 500):
+    """
+    Monte Carlo run that samples until the 95% CI half-width of the mean (and quantiles) meets the tolerance.
+    A plain def route: up to 5 s of NumPy work runs in the threadpool, not on the event loop.
+    """
+    try:
+        return monte_carlo_simulator.run_adaptive_simulation(
+            article_number, tolerance=tolerance, quantiles=quantiles, quantile_tolerance=quantile_tolerance,
+            time_budget_s=min(max(time_budget_ms, 1), 5000) / 1000
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -5,32 +5,62 @@ from fastapi import APIRouter, HTTPException
 from models import Article, ToggleRequest
 from risk_engine import risk_engine
 from features.f5_explorer import explorer_system
+import threading
 
 router = APIRouter(prefix="/api/articles", tags=["articles"])
 
 # Cache for calculated articles
 _articles_cache = None
+# Bumped on every invalidation, so a computation that raced a toggle never swaps in stale articles
+_articles_generation = 0
+# Guards only the cache swap, so toggles never wait behind a computation
+_articles_lock = threading.Lock()
+# Requests arriving during startup warm-up wait for it instead of re-running every debate
+_compute_lock = threading.Lock()
 
 def get_all_articles():
     """Get or calculate all articles"""
     global _articles_cache
-    if _articles_cache is None:
-        # Revert: Use full AI mode (slow but accurate)
-        _articles_cache = risk_engine.calculate_all_articles()
-    return _articles_cache
+    articles = _articles_cache
+    if articles is not None:
+        return articles
+    with _compute_lock:
+        articles = _articles_cache
+        if articles is None:
+            generation = _articles_generation
+            # Revert: Use full AI mode (slow but accurate)
+            articles = risk_engine.calculate_all_articles()
+            with _articles_lock:
+                if _articles_generation == generation:
+                    _articles_cache = articles
+    return articles
 
 def invalidate_cache():
     """Invalidate cache when toggles change"""
+    global _articles_cache, _articles_generation
+    with _articles_lock:
+        _articles_cache = None
+        _articles_generation += 1
+
+def refresh_cache():
+    """Recalculate in the background and swap; requests keep the old articles until then"""
     global _articles_cache
-    _articles_cache = None
+    if _articles_cache is None:
+        return
+    generation = _articles_generation
+    # Built outside the lock so readers are never blocked behind the debates
+    articles = risk_engine.calculate_all_articles()
+    with _articles_lock:
+        if _articles_cache is not None and _articles_generation == generation:
+            _articles_cache = articles
 
 @router.get("/", response_model=list[Article])
-async def get_articles():
+def get_articles():
     """Get all 7 articles with risk scores"""
     return get_all_articles()
 
 @router.get("/{article_number}", response_model=Article)
-async def get_article(article_number: int):
+def get_article(article_number: int):
     """Get detailed analysis for specific article"""
     try:
         article = risk_engine.calculate_article_risk(article_number)
@@ -39,7 +69,7 @@ async def get_article(article_number: int):
         raise HTTPException(status_code=404, detail=str(e))
 
 @router.post("/{article_number}/toggle")
-async def apply_toggle(article_number: int, request: ToggleRequest):
+def apply_toggle(article_number: int, request: ToggleRequest):
     """Apply explorer toggle and recalculate risk"""
     try:
         # Apply toggle
@@ -66,7 +96,7 @@ async def apply_toggle(article_number: int, request: ToggleRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/356/critical")
-async def get_critical_article_356():
+def get_critical_article_356():
     """
     Special endpoint for Article 356 - the CRITICAL BLOCKER
     Returns detailed breakdown with all 8 features
@@ -0,0 +1,31 @@
+"""
+API Routes for LLM Usage Accounting
+"""
+from fastapi import APIRouter, HTTPException
+
+from llm_usage import usage_tracker
+
+router = APIRouter(prefix="/api/usage", tags=["usage"])
+
+@router.get("/")
+async def get_usage_summary():
+    """Token and latency totals, rolled up by node, article and request"""
+    return usage_tracker.summary()
+
+@router.get("/articles/{article_number}")
+async def get_article_usage(article_number: int):
+    """Token and latency breakdown per debate node for one article"""
+    return usage_tracker.article_summary(article_number)
+
+@router.get("/requests/{request_id}")
+async def get_request_usage(request_id: str):
+    """All LLM calls made while serving one API request (see X-Request-ID header)"""
+    summary = usage_tracker.request_summary(request_id)
+    if not summary["calls"]:
+        raise HTTPException(status_code=404, detail=f"No LLM calls recorded for request {request_id}")
+    return summary
+
+@router.get("/calls")
+async def get_recent_calls(limit: int = 100):
+    """Most recent individual LLM calls"""
+    return {"calls": usage_tracker.recent_calls(limit)}
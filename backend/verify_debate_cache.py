@@ -0,0 +1,106 @@
+"""
+Regression check for the debate similarity cache: an identical amendment is
+reused without running the graph, a reworded one is seeded with the stored
+positions (only assess and mitigate run), a request for more vulnerability
+samples is not served a smaller ensemble, callers cannot mutate what the cache
+stores, and the index file is compacted once evicted debates pile up. Runs offline (the debate nodes are stubbed).
+"""
+import os
+import sys
+import tempfile
+
+sys.path.append(os.getcwd())
+
+runtime_dir = tempfile.mkdtemp()
+os.environ["DEBATE_CHECKPOINT_DB"] = os.path.join(runtime_dir, "checkpoints.sqlite")
+os.environ["DEBATE_SIMILARITY_INDEX"] = os.path.join(runtime_dir, "similarity_index.jsonl")
+# Anything but an identical amendment is seeded
+os.environ["DEBATE_REUSE_THRESHOLD"] = "0.999"
+os.environ["DEBATE_SEED_THRESHOLD"] = "0.0"
+
+import features.f1_debate_agent as f1
+from features.debate_cache import DebateSimilarityCache, debate_cache
+
+calls = []
+
+def stub_node(name, step):
+    def run(state):
+        calls.append(name)
+        if name == "government":
+            state["government_argument"] = "Feasible under Article 368"
+        elif name == "court":
+            state["court_argument"] = "Violates federalism"
+        elif name == "assess":
+            state["vulnerability_score"] = 0.8
+            state["court_challenge_probability"] = "80%"
+        state["debate_transcript"] = state["debate_transcript"] + [
+            {"speaker": name, "argument": name, "type": "position" if step < 3 else "assessment"}
+        ]
+        state["step"] = step
+        return state
+    return run
+
+def check(label, ok, failed):
+    print(f"{'✅' if ok else '❌'} {label}")
+    if not ok:
+        failed.append(label)
+
+def verify_debate_cache():
+    print("Verifying debate similarity cache...\n")
+    f1.government_position_node = stub_node("government", 1)
+    f1.court_position_node = stub_node("court", 2)
+    f1.vulnerability_assessment_node = stub_node("assess", 3)
+    f1.risk_mitigation_node = stub_node("mitigate", 4)
+    agent = f1.EnhancedDebateAgent()
+    amendment = "Define explicit procedure for elections during President's Rule in ONOE context"
+    failed = []
+
+    first = agent.simulate_debate(356, amendment_text=amendment)
+    check("First debate runs every node and is cached", calls == f1.DEBATE_STEPS and debate_cache.size() == 1, failed)
+    first["debate_transcript"].append({"speaker": "caller", "argument": "edit", "type": "note"})
+
+    calls.clear()
+    reused = agent.simulate_debate(356, amendment_text=amendment)
+    check("Identical amendment is reused without running the graph",
+          not calls and reused["cache_match"]["mode"] == "reused", failed)
+    check("Caller edits to the first result did not reach the cache",
+          len(reused["debate_transcript"]) == len(f1.DEBATE_STEPS), failed)
+    reused["debate_transcript"].clear()
+    again = agent.simulate_debate(356, amendment_text=amendment)
+    check("Edits to a reused result do not reach the cache", len(again["debate_transcript"]) == len(f1.DEBATE_STEPS), failed)
+
+    calls.clear()
+    seeded = agent.simulate_debate(356, amendment_text=amendment + " and by-elections")
+    check("Reworded amendment is seeded (only assess and mitigate run)",
+          calls == ["assess", "mitigate"] and seeded["cache_match"]["mode"] == "seeded", failed)
+    check("Seeded debate keeps the stored positions",
+          seeded["government_argument"] == first["government_argument"], failed)
+
+    calls.clear()
+    larger = agent.simulate_debate(356, amendment_text=amendment, ensemble_size=5)
+    check("Larger ensemble request is seeded, not served the 1-sample debate",
+          calls == ["assess", "mitigate"] and larger["cache_match"]["mode"] == "seeded", failed)
+    calls.clear()
+    agent.simulate_debate(356, amendment_text=amendment, ensemble_size=5)
+    agent.simulate_debate(356, amendment_text=amendment, ensemble_size=3)
+    check("5-sample debate is then reused for 5- and 3-sample requests", not calls, failed)
+
+    reloaded = DebateSimilarityCache()
+    check(f"Index file reloads ({reloaded.size()} debates)", reloaded.size() == debate_cache.size() == 3, failed)
+
+    os.environ["DEBATE_SIMILARITY_INDEX"] = os.path.join(runtime_dir, "compacted_index.jsonl")
+    os.environ["DEBATE_CACHE_MAX_PER_ARTICLE"] = "4"
+    small = DebateSimilarityCache()
+    for i in range(40):
+        small.add(83, f"Amendment variant {i}", "context", {"vulnerability_score": 0.5})
+    with open(small.index_path) as f:
+        lines = sum(1 for _ in f)
+    check(f"Index file is compacted ({lines} lines for {small.size()} cached debates)",
+          small.size() <= 4 and lines <= 8, failed)
+    check("Compacted index file reloads", DebateSimilarityCache().size() == small.size(), failed)
+
+    print(f"\n{'All checks passed' if not failed else f'{len(failed)} check(s) failed'}")
+    return not failed
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_debate_cache() else 1)
@@ -0,0 +1,93 @@
+"""
+Regression check for debate checkpointing: an interrupted debate resumes from
+its last completed node with the current request's settings, identical
+concurrent debates run one at a time, and finished debates leave no
+checkpoints behind. Runs offline (the debate nodes are stubbed).
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.getcwd())
+
+runtime_dir = tempfile.mkdtemp()
+os.environ["DEBATE_CHECKPOINT_DB"] = os.path.join(runtime_dir, "checkpoints.sqlite")
+os.environ["DEBATE_SIMILARITY_INDEX"] = os.path.join(runtime_dir, "similarity_index.jsonl")
+os.environ["DEBATE_MAX_RESUMES"] = "0"
+
+import features.f1_debate_agent as f1
+
+calls = []
+failures = {}
+active = {"now": 0, "max": 0}
+
+def stub_node(name, step):
+    def run(state):
+        calls.append((name, state.get("ensemble_size")))
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        try:
+            time.sleep(0.01)
+            if failures.get(name):
+                failures[name] -= 1
+                raise RuntimeError(f"{name} failed")
+            if name == "government":
+                state["government_argument"] = "Feasible"
+            elif name == "court":
+                state["court_argument"] = "Unconstitutional"
+            elif name == "assess":
+                state["vulnerability_score"] = 0.5
+                state["court_challenge_probability"] = "50%"
+            state["debate_transcript"] = state["debate_transcript"] + [
+                {"speaker": name, "argument": name, "type": "position"}
+            ]
+            state["step"] = step
+            return state
+        finally:
+            active["now"] -= 1
+    return run
+
+def check(label, ok, failed):
+    print(f"{'✅' if ok else '❌'} {label}")
+    if not ok:
+        failed.append(label)
+
+def verify_debate_resume():
+    print("Verifying debate checkpoint resume...\n")
+    f1.government_position_node = stub_node("government", 1)
+    f1.court_position_node = stub_node("court", 2)
+    f1.vulnerability_assessment_node = stub_node("assess", 3)
+    f1.risk_mitigation_node = stub_node("mitigate", 4)
+    agent = f1.EnhancedDebateAgent()
+    failed = []
+
+    failures["assess"] = 1
+    result = agent.simulate_debate(356, ensemble_size=3, use_cache=False)
+    check("Failed assess node serves a partial debate", result["partial"] and result["completed_steps"] == ["government", "court"], failed)
+
+    calls.clear()
+    result = agent.simulate_debate(356, ensemble_size=5, use_cache=False)
+    check("Retry resumes at the assess node", [name for name, _ in calls] == ["assess", "mitigate"], failed)
+    check("Resumed run uses the current ensemble_size", all(size == 5 for _, size in calls), failed)
+    check("Resumed debate completes", not result["partial"], failed)
+
+    rows = sqlite3.connect(os.environ["DEBATE_CHECKPOINT_DB"]).execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+    check(f"Finished debate checkpoints are pruned ({rows} rows left)", rows == 0, failed)
+
+    calls.clear()
+    active["max"] = 0
+    threads = [threading.Thread(target=agent.simulate_debate, args=(172,), kwargs={"use_cache": False}) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    check("Identical concurrent debates run one at a time", active["max"] == 1 and len(calls) == 12, failed)
+
+    print(f"\n{'All checks passed' if not failed else f'{len(failed)} check(s) failed'}")
+    return not failed
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_debate_resume() else 1)
@@ -0,0 +1,57 @@
+"""
+Regression check for ensemble vulnerability scoring: every concurrent sample
+runs in the caller's context (so LLM usage records keep the request id), and
+the ensemble accounts for every call it submitted. Runs offline (the
+assessment call is stubbed).
+"""
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.append(os.getcwd())
+
+import features.f1_debate_agent as f1
+from llm_usage import current_request_id
+
+seen_request_ids = []
+seen_lock = threading.Lock()
+
+def stub_sample(llm, state):
+    time.sleep(random.uniform(0.001, 0.01))
+    with seen_lock:
+        seen_request_ids.append(current_request_id.get())
+    return random.gauss(0.7, 0.05)
+
+def check(label, ok, failed):
+    print(f"{'✅' if ok else '❌'} {label}")
+    if not ok:
+        failed.append(label)
+
+def verify_ensemble_context():
+    print("Verifying ensemble request context...\n")
+    f1._sample_vulnerability = stub_sample
+    random.seed(0)
+    failed = []
+
+    for request_id, size in (("req-a", 3), ("req-b", 12)):
+        seen_request_ids.clear()
+        token = current_request_id.set(request_id)
+        try:
+            summary = f1.run_vulnerability_ensemble(llm=None, state={"article": 356}, size=size)
+        finally:
+            current_request_id.reset(token)
+        time.sleep(0.05)  # Let discarded in-flight samples finish
+
+        check(f"{request_id}: every sample saw the request id ({len(seen_request_ids)} calls)",
+              seen_request_ids and all(seen == request_id for seen in seen_request_ids), failed)
+        accounted = summary["n"] + summary["failed"] + summary["discarded"]
+        check(f"{request_id}: submitted calls are all accounted for ({summary['submitted']} submitted)",
+              summary["submitted"] == accounted and summary["submitted"] <= size, failed)
+
+    print(f"\n{'All checks passed' if not failed else f'{len(failed)} check(s) failed'}")
+    return not failed
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_ensemble_context() else 1)
@@ -0,0 +1,48 @@
+"""
+Regression check for streamed Monte Carlo runs: results are identical for 1
+and N worker processes, for every sampling strategy, and a shard streamed in
+small chunks matches one streamed in large chunks (Halton/Sobol continue one
+sequence across chunks). Runs locally, no server needed.
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from features.f4_monte_carlo import monte_carlo_simulator, simulate_shard
+from features.sampling import SAMPLING_STRATEGIES
+
+def check(label, ok, failed):
+    print(f"{'✅' if ok else '❌'} {label}")
+    if not ok:
+        failed.append(label)
+
+def verify_monte_carlo_workers(trials: int = 1_200_000, workers: int = 3):
+    print(f"Verifying 1-vs-{workers} worker determinism ({trials} trials)...\n")
+    # Smaller shards so every run spans several shards (and every worker gets one)
+    monte_carlo_simulator.shard_trials = 250_000
+    runs = [(356, "baseline"), (83, "baseline"), (172, "stress")]
+    failed = []
+
+    for strategy in SAMPLING_STRATEGIES:
+        single = monte_carlo_simulator.run_scenario_grid(runs, trials, workers=1, strategy=strategy)
+        parallel = monte_carlo_simulator.run_scenario_grid(runs, trials, workers=workers, strategy=strategy)
+        check(f"{strategy}: {workers} workers match 1 worker", single == parallel, failed)
+        check(f"{strategy}: every trial is counted", all(r["trials"] == trials for r in single.values()), failed)
+
+    for strategy in ("halton", "sobol"):
+        small = simulate_shard(356, np.random.SeedSequence(7), 100_000, strategy, chunk_trials=4096)
+        large = simulate_shard(356, np.random.SeedSequence(7), 100_000, strategy, chunk_trials=1 << 16)
+        one_shot = monte_carlo_simulator.sample_risks(356, np.random.default_rng(np.random.SeedSequence(7)), 100_000, strategy)
+        check(f"{strategy}: chunk size does not change the shard",
+              np.array_equal(small.histogram.counts, large.histogram.counts)
+              and abs(small.moments.mean - large.moments.mean) < 1e-9, failed)
+        check(f"{strategy}: chunked shard matches a one-shot run", abs(large.moments.mean - one_shot.mean()) < 1e-9, failed)
+
+    print(f"\n{'All checks passed' if not failed else f'{len(failed)} check(s) failed'}")
+    return not failed
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_monte_carlo_workers() else 1)
@@ -0,0 +1,74 @@
+"""
+Regression check for the bulk precedent importer: malformed JSON Lines records,
+malformed JSON array elements and invalid cases are counted as rejected (with
+samples in meta.json) while valid cases around them are imported.
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(os.getcwd())
+
+from retrieval.precedent_store import MAX_REJECT_SAMPLES, PrecedentStore, import_precedents
+
+def check(label, ok, failed):
+    print(f"{'✅' if ok else '❌'} {label}")
+    if not ok:
+        failed.append(label)
+
+def verify_precedent_import():
+    print("Verifying precedent import rejects...\n")
+    work_dir = Path(tempfile.mkdtemp())
+    dump = work_dir / "judgments.jsonl"
+    lines = [
+        json.dumps({"case_name": "S.R. Bommai v. Union of India", "citation": "AIR 1994 SC 1918",
+                    "relevant_articles": ["Art. 356"], "impact_score": 5}),
+        "{\"case_name\": \"Broken record\", \"year\": 19",  # Malformed JSON
+        "",
+        json.dumps({"case_name": "No year v. Union of India", "relevant_articles": [356]}),  # Invalid case
+        "not json at all",
+        json.dumps({"case_name": "Rameshwar Prasad v. Union of India", "year": 2006, "relevant_articles": [174, 356]}),
+        "{\"case_name\": \"Truncated last line"
+    ]
+    dump.write_text("\n".join(lines), encoding="utf-8")
+    failed = []
+
+    try:
+        meta = import_precedents([dump], work_dir / "store")
+    except Exception as e:
+        check(f"Import completes despite malformed lines ({e})", False, failed)
+        return False
+
+    check(f"Valid cases are imported ({meta['n_cases']})", meta["n_cases"] == 2, failed)
+    check(f"Malformed and invalid records are rejected ({meta['n_rejected']})", meta["n_rejected"] == 4, failed)
+    malformed = [s for s in meta["reject_samples"] if "malformed JSON" in s]
+    check("Malformed lines are sampled with their line numbers",
+          [s.split(":")[1] for s in malformed] == ["2", "5", "7"], failed)
+    check("Reject samples are bounded", len(meta["reject_samples"]) <= MAX_REJECT_SAMPLES, failed)
+
+    store = PrecedentStore(work_dir / "store")
+    names = sorted(store.get(i)["case_name"] for i in range(len(store)))
+    check("Store holds the valid cases", names == ["Rameshwar Prasad v. Union of India", "S.R. Bommai v. Union of India"], failed)
+
+    # JSON array dump: a malformed element in the middle and a truncated last element
+    cases = [json.dumps({"case_name": f"Synthetic Case {i} v. Union of India", "year": 1990 + i % 30,
+                         "relevant_articles": [356], "summary": "x" * 400}) for i in range(200)]
+    cases[60] = '{"case_name": "Broken element", "year": 19x9}'
+    array_dump = work_dir / "judgments.json"
+    array_dump.write_text('{"cases": [' + ",\n".join(cases) + ",\n" + cases[1][:100], encoding="utf-8")
+    try:
+        meta = import_precedents([array_dump], work_dir / "array_store")
+    except Exception as e:
+        check(f"JSON array import completes despite malformed elements ({e})", False, failed)
+        return False
+    check(f"JSON array: valid elements are imported ({meta['n_cases']})", meta["n_cases"] == 199, failed)
+    check(f"JSON array: malformed and truncated elements are rejected ({meta['n_rejected']})",
+          meta["n_rejected"] == 2 and all("malformed JSON" in s for s in meta["reject_samples"]), failed)
+
+    print(f"\n{'All checks passed' if not failed else f'{len(failed)} check(s) failed'}")
+    return not failed
+
+if __name__ == "__main__":
+    sys.exit(0 if verify_precedent_import() else 1)
@@ -0,0 +1,114 @@
+"""
+Startup Warm-up
+Precomputes article analyses, admin dashboard defaults and the bottleneck
+analysis in a background thread so the first user request does not trigger
+every LLM debate. Progress is reported on /health and readiness on /ready;
+tasks that still fail after the first pass are retried in the background and
+reported as degraded.
+"""
+from typing import Callable, Dict, List, Tuple
+import os
+import threading
+import time
+
+from admin_risk_engine import admin_risk_engine
+from routes.admin import DashboardInput, get_default_dashboard
+from routes.articles import get_all_articles
+
+class WarmupManager:
+    def __init__(self, tasks: List[Tuple[str, Callable[[], object]]]):
+        self.tasks = tasks
+        self.enabled = os.getenv("WARMUP_ON_STARTUP", "1") != "0"
+        self.retries = int(os.getenv("WARMUP_RETRIES", "1"))
+        # Seconds between background retries of failed tasks (0 = give up after the first pass)
+        self.retry_interval = float(os.getenv("WARMUP_RETRY_INTERVAL", "300"))
+        self.task_status: Dict[str, Dict] = {
+            name: {"status": "pending", "duration_s": None, "error": None} for name, _ in tasks
+        }
+        self.started_at = None
+        self.finished_at = None
+        self._thread = None
+
+    def start(self):
+        """Launch warm-up in a daemon thread (LLM calls block, so keep them off the event loop)"""
+        if not self.enabled or self._thread is not None:
+            return
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="cache-warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        for name, task in self.tasks:
+            self._run_task(name, task)
+
+        self.finished_at = time.time()
+        print(f"Warm-up finished: {self.progress()['completed']}/{len(self.tasks)} caches warm")
+
+        # Keep retrying failed tasks (e.g. the LLM was briefly unreachable) until every cache is warm
+        while self.retry_interval > 0 and self.failed_tasks:
+            time.sleep(self.retry_interval)
+            for name, task in self.tasks:
+                if name in self.failed_tasks:
+                    self._run_task(name, task)
+
+    def _run_task(self, name: str, task: Callable[[], object]):
+        status = self.task_status[name]
+        status["status"] = "running"
+        started = time.perf_counter()
+
+        for attempt in range(self.retries + 1):
+            try:
+                task()
+                status["status"] = "done"
+                status["error"] = None
+                break
+            except Exception as e:
+                print(f"Warm-up task '{name}' failed (attempt {attempt + 1}): {e}")
+                status["status"] = "failed"
+                status["error"] = str(e)
+
+        status["duration_s"] = round(time.perf_counter() - started, 2)
+
+    @property
+    def failed_tasks(self) -> List[str]:
+        return [name for name, status in self.task_status.items() if status["status"] == "failed"]
+
+    @property
+    def ready(self) -> bool:
+        """True once the first warm-up pass is over (or warm-up is disabled); failed caches fill lazily"""
+        if not self.enabled:
+            return True
+        return self.finished_at is not None
+
+    def progress(self) -> Dict:
+        if not self.enabled:
+            state = "disabled"
+        elif self.started_at is None:
+            state = "pending"
+        elif self.finished_at is None:
+            state = "running"
+        else:
+            state = "degraded" if self.failed_tasks else "complete"
+
+        return {
+            "state": state,
+            "ready": self.ready,
+            "degraded": bool(self.failed_tasks),
+            "completed": sum(1 for status in self.task_status.values() if status["status"] == "done"),
+            "total": len(self.tasks),
+            "elapsed_s": round((self.finished_at or time.time()) - self.started_at, 2) if self.started_at else None,
+            "tasks": self.task_status
+        }
+
+def warm_bottlenecks():
+    """Warm the LLM bottleneck analysis; a rule-based fallback is not cached, so it counts as a failure"""
+    result = admin_risk_engine.analyze_bottlenecks(DashboardInput().dict())
+    if result.get("analysis_mode") != "LLM":
+        raise RuntimeError(f"bottleneck analysis fell back to {result.get('analysis_mode')} mode")
+
+# Singleton instance (bottlenecks before the dashboard, which reuses that analysis)
+warmup_manager = WarmupManager([
+    ("articles", get_all_articles),
+    ("bottlenecks", warm_bottlenecks),
+    ("admin_dashboard", get_default_dashboard),
+])